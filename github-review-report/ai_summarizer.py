@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Batched LLM summarization of review bodies for the review report generator.
+
+Many review bodies are sent per chat completion request to an
+OpenAI-compatible endpoint (OpenAI, DeepSeek, vLLM, Ollama or a local mock),
+with a bounded number of requests in flight. Each result is cached by a hash
+of the model, prompt version and review text, so re-runs and overlapping time
+windows never summarize the same text twice. `requests` is imported when a
+summarizer is created.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4o-mini"
+# Review bodies per chat completion request
+DEFAULT_BATCH_SIZE = 20
+# Requests in flight
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 120
+MAX_RETRIES = 3
+
+# Bump when the prompt changes so cached summaries are regenerated
+PROMPT_VERSION = "1"
+
+# Review text beyond this many characters is cut before sending
+MAX_REVIEW_CHARS = 4000
+
+SYSTEM_PROMPT = """你是代码review专家。用户会给出一个JSON数组, 每项是一条GitHub review: {"id": 编号, "review": 原始内容}。
+请为每条review:
+1. 提取核心问题点, 生成中文问题描述 (≤50字)
+2. 生成中文影响分析 (≤20字), 如果无明显影响, 填"无"
+
+只输出JSON对象, 格式:
+{"results": [{"id": 编号, "problem_description": "问题描述", "impact_analysis": "影响分析"}]}
+每条输入都必须有对应的结果, id保持不变。"""
+
+JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+
+
+class LLMError(Exception):
+    """An LLM request failed or returned an unusable answer."""
+
+
+def content_hash(model: str, body: str) -> str:
+    """Cache key of a review body's summary for model and the current prompt."""
+    return hashlib.sha256(f"{model}\0{PROMPT_VERSION}\0{body}".encode('utf-8')).hexdigest()
+
+
+class LLMSummarizer:
+    """Summarize review bodies into 问题描述/影响分析 pairs through an OpenAI-compatible API."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        api_key: Optional[str] = None,
+        model: str = DEFAULT_MODEL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT
+    ):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Content-Type'] = 'application/json'
+        if api_key:
+            self.session.headers['Authorization'] = f"Bearer {api_key}"
+        self.cached_count = 0
+        self.request_count = 0
+        self.failed_count = 0
+
+    @classmethod
+    def from_environment(
+        cls,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY
+    ) -> "LLMSummarizer":
+        """Endpoint, key and model from arguments, else OPENAI_BASE_URL/OPENAI_API_KEY/OPENAI_MODEL."""
+        return cls(
+            base_url=base_url or os.environ.get("OPENAI_BASE_URL") or DEFAULT_BASE_URL,
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            model=model or os.environ.get("OPENAI_MODEL") or DEFAULT_MODEL,
+            batch_size=batch_size,
+            concurrency=concurrency,
+        )
+
+    def summarize(self, bodies: Iterable[str], cache=None, cached_only: bool = False) -> Dict[str, Dict]:
+        """
+        Return review body -> {'problem_description', 'impact_analysis'}.
+
+        Identical bodies are summarized once; cached results (ReviewCache) are
+        reused and new ones stored. Bodies whose batch failed are left out so
+        the caller can fall back to its heuristics. With cached_only no request
+        is sent.
+        """
+        by_hash = {content_hash(self.model, body): body for body in bodies if body}
+        results: Dict[str, Dict] = {}
+        if cache:
+            for key, summary in cache.get_summaries(by_hash).items():
+                results[by_hash.pop(key)] = summary
+            self.cached_count += len(results)
+        if cached_only or not by_hash:
+            return results
+
+        pending = list(by_hash.items())
+        batches = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+        for batch, summaries in self._run_batches(batches):
+            summaries = summaries or {}
+            self.failed_count += len(batch) - len(summaries)
+            fresh = {}
+            for index, (key, body) in enumerate(batch):
+                if index in summaries:
+                    results[body] = fresh[key] = summaries[index]
+            if cache and fresh:
+                cache.store_summaries(self.model, fresh)
+        return results
+
+    def _run_batches(self, batches: List[List[tuple]]):
+        """Yield (batch, {index: summary} or None on failure), at most concurrency requests at once."""
+        if self.concurrency == 1 or len(batches) == 1:
+            for batch in batches:
+                yield batch, self._complete_safely(batch)
+            return
+
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(self._complete_safely, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _complete_safely(self, batch: List[tuple]) -> Optional[Dict[int, Dict]]:
+        try:
+            return self._complete(batch)
+        except LLMError as e:
+            print(f"   ⚠️ AI总结失败 ({len(batch)} 条review改用规则摘要): {e}")
+            return None
+
+    def _complete(self, batch: List[tuple]) -> Dict[int, Dict]:
+        """Send one batch; returns input index -> summary for the items the model answered."""
+        import requests
+
+        items = [{'id': index, 'review': body[:MAX_REVIEW_CHARS]} for index, (_, body) in enumerate(batch)]
+        payload = {
+            'model': self.model,
+            'temperature': 0,
+            'response_format': {'type': 'json_object'},
+            'messages': [
+                {'role': 'system', 'content': SYSTEM_PROMPT},
+                {'role': 'user', 'content': json.dumps(items, ensure_ascii=False)},
+            ],
+        }
+        url = f"{self.base_url}/chat/completions"
+
+        for attempt in range(MAX_RETRIES + 1):
+            self.request_count += 1
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                if attempt < MAX_RETRIES:
+                    time.sleep(2 ** attempt)
+                    continue
+                raise LLMError(str(e)) from e
+            # Rate limited or overloaded: honour Retry-After, else back off exponentially
+            if response.status_code in (429, 500, 502, 503, 504) and attempt < MAX_RETRIES:
+                time.sleep(float(response.headers.get('Retry-After') or 2 ** attempt))
+                continue
+            if response.status_code >= 400:
+                raise LLMError(f"HTTP {response.status_code}: {response.text[:200]}")
+            break
+
+        try:
+            content = response.json()['choices'][0]['message']['content']
+            # Some endpoints wrap the object in a ``` fence or add prose around it
+            answer = json.loads(JSON_OBJECT_PATTERN.search(content).group(0))
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            raise LLMError(f"unexpected response: {e}") from e
+
+        summaries = {}
+        for result in answer.get('results') or []:
+            try:
+                index = int(result['id'])
+                description = str(result['problem_description']).strip()
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 0 <= index < len(batch) and description:
+                impact = str(result.get('impact_analysis') or '').strip() or "无"
+                summaries[index] = {'problem_description': description, 'impact_analysis': impact}
+        return summaries
@@ -11,17 +11,25 @@ Usage:
 import argparse
 import fnmatch
 import os
-from datetime import datetime, timedelta
+import re
+from datetime import datetime, timedelta, timezone
 import json
 import subprocess
 import sys
-from typing import List, Dict, Optional
-
-try:
-    import pandas as pd
-except ImportError:
-    print("❌ pandas not installed. Run: pip install pandas openpyxl")
-    sys.exit(1)
+import time
+from typing import Dict, Iterator, List, Optional
+
+# Heavy dependencies (requests, openpyxl) are imported on first use so the CLI starts fast
+from ai_summarizer import DEFAULT_BATCH_SIZE as DEFAULT_AI_BATCH_SIZE, LLMSummarizer
+from github_client import GitHubAPIError, GitHubClient
+from rate_limiter import RateLimiter
+from report_pipeline import ReportCheckpoint, run_pipeline
+from report_writer import OUTPUT_FORMATS, PARTIAL_SUFFIX, TEMPLATE_PATH, open_report_writer, resolve_output_format
+from review_cache import DEFAULT_CACHE_PATH, ReviewCache
+from review_analytics import ReviewAnalytics, analytics_table
+from review_classifier import DEFAULT_RULES_PATH, ReviewClassification, ReviewClassifier
+from review_dedup import ReviewDeduplicator, same_text_key
+from review_export import ReviewExporter, resolve_export_format
 
 
 # Problem Type Categories (15 types)
@@ -58,48 +66,102 @@ CRITICAL_TYPES = {8, 12}  # 代码安全漏洞, 内存未释放
 
 # Valid AI reviewers (only these will be included)
 VALID_AI_REVIEWERS = {"sourcery-ai"}
+BOT_LOGIN_SUFFIX = "[bot]"
+
+# Fields requested from `gh pr list/view --json`
+PR_JSON_FIELDS = "number,title,author,createdAt,mergedAt,mergedBy,baseRefName,url,reviews,comments"
+PR_LIST_JSON_FIELDS = "number,title,createdAt,updatedAt"
+
+# GitHub search returns at most this many results per query
+SEARCH_RESULT_LIMIT = 1000
+# Target results per slice when splitting a capped range (headroom for uneven slices)
+SEARCH_SLICE_TARGET = 750
+SEARCH_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# PRs fetched per GraphQL request (one aliased pullRequest field per PR)
+DEFAULT_PAGE_SIZE = 50
+
+# Review/comment nodes per connection page (GitHub maximum is 100)
+CONNECTION_PAGE_SIZE = 100
+
+# Detail pages fetched in parallel
+DEFAULT_CONCURRENCY = 4
+
+# Most PRs the AI summarization stage holds back while gathering a window of reviews
+SUMMARY_WINDOW_PRS = 200
+
+# Drop-down lists for template columns whose validation is broken (#REF!)
+VALIDATION_LISTS = {
+    '问题来源': list(PROBLEM_SOURCES.values()),
+    '问题类型': list(PROBLEM_TYPES.values()),
+}
+
+# Hidden sheet recording what a workbook already holds, for --append: rows of
+# (kind, repo, value) with kinds last_run, sheet, pr and review
+APPEND_STATE_SHEET = "_append_state"
+# Per-repo summary sheet of multi-repo reports
+SUMMARY_SHEET = "汇总"
+# Latency and load statistics sheet (--analytics)
+ANALYTICS_SHEET = "统计"
+PR_URL_PATTERN = re.compile(r'^https://github\.com/([^/]+/[^/]+)/pull/(\d+)')
+
+# Characters Excel does not allow in sheet names, and its name length limit
+INVALID_SHEET_CHARS = str.maketrans({c: '_' for c in '[]:*?/\\'})
+MAX_SHEET_NAME_LENGTH = 31
+
+REVIEW_NODE_FIELDS = "id author { login } body state submittedAt"
+COMMENT_NODE_FIELDS = "id author { login } body createdAt url"
+
+# Inline review comment fields kept from the REST `pulls/comments` listing
+REVIEW_COMMENT_FIELDS = ("id", "in_reply_to_id", "body", "path", "line", "original_line",
+                         "start_line", "original_start_line", "created_at", "html_url")
+
+PR_DETAIL_FRAGMENT = f"""
+fragment PRDetail on PullRequest {{
+  number title url createdAt updatedAt mergedAt baseRefName
+  author {{ login }}
+  mergedBy {{ login }}
+  reviews(first: {CONNECTION_PAGE_SIZE}) {{
+    pageInfo {{ hasNextPage endCursor }}
+    nodes {{ {REVIEW_NODE_FIELDS} }}
+  }}
+  comments(first: {CONNECTION_PAGE_SIZE}) {{
+    pageInfo {{ hasNextPage endCursor }}
+    nodes {{ {COMMENT_NODE_FIELDS} }}
+  }}
+}}
+"""
+
+
+# Compiled review rules, loaded from DEFAULT_RULES_PATH on first use (see load_review_rules)
+_review_classifier: Optional[ReviewClassifier] = None
+
+
+def load_review_rules(rules_path: str = DEFAULT_RULES_PATH) -> ReviewClassifier:
+    """Compile the problem type / invalid review / impact rules file used for classification."""
+    global _review_classifier
+    try:
+        _review_classifier = ReviewClassifier.from_file(rules_path)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"❌ 无法加载review规则文件 {rules_path}: {e}")
+        sys.exit(1)
+    return _review_classifier
+
+
+def get_review_classifier() -> ReviewClassifier:
+    return _review_classifier or load_review_rules()
 
 
 def get_problem_type_from_suggestion(suggestion: str) -> int:
     """
     Map review suggestion to problem type category.
 
+    The highest-priority problem type rule whose keyword appears in the
+    suggestion wins (see review_rules.json).
+
     Returns problem type number (1-15).
     """
-    suggestion_lower = suggestion.lower()
-
-    # Direct keyword mapping
-    type_keywords = {
-        "安全": 8,
-        "安全漏洞": 8,
-        "漏洞": 8,
-        "内存泄漏": 12,
-        "内存": 12,
-        "释放": 12,
-        "注释": 10,
-        "日志": 2,
-        "编译": 11,
-        "警告": 11,
-        "头文件": 3,
-        "变量": 4,
-        "常量": 5,
-        "宏": 6,
-        "宏定义": 6,
-        "指针": 7,
-        "冗余": 9,
-        "提交": 13,
-        "需求": 14,
-        "不符合需求": 14,
-        "格式": 1,
-        "命名": 1,
-        "书写": 1,
-    }
-
-    for keyword, type_num in type_keywords.items():
-        if keyword in suggestion_lower:
-            return type_num
-
-    return 15  # Default: 其他
+    return get_review_classifier().classify(suggestion).problem_type
 
 
 def get_severity_from_problem_type(problem_type: int) -> str:
@@ -114,36 +176,29 @@ def get_severity_from_problem_type(problem_type: int) -> str:
     return SEVERITY_GENERAL
 
 
-def is_valid_person_review(review_body: str, review_state: str) -> bool:
+def is_valid_person_review(
+    review_body: str,
+    review_state: str,
+    classification: Optional[ReviewClassification] = None
+) -> bool:
     """
     Check if review is a valid person review (not automated).
 
     Invalid reviews:
     - Body is empty or only contains "approved", "lgtm", "merge", etc.
+      (the invalid_reviews rules of review_rules.json)
     - State is COMMENTED (just comment, not a proper review)
+
+    Pass classification when the body was already classified to skip a second scan.
     """
     if not review_body or review_body.strip() == "":
         return False
 
-    review_lower = review_body.lower().strip()
-
     # Check for common automated approval phrases
-    invalid_patterns = [
-        "approved",
-        "lgtm",
-        "looks good to me",
-        "merge",
-        "force merge",
-        "/merge",
-        "/forcemerge",
-        "mergeable",
-        "ready to merge",
-        "can merge",
-    ]
-
-    for pattern in invalid_patterns:
-        if pattern in review_lower:
-            return False
+    if classification is None:
+        classification = get_review_classifier().classify(review_body)
+    if classification.invalid_rule:
+        return False
 
     # Check if it's too short (likely just an approval)
     if len(review_body) < 10:
@@ -191,6 +246,11 @@ def parse_time_range(time_expr: str) -> tuple[datetime, datetime]:
         days = weeks * 7
         start_date = today - timedelta(days=days)
         end_date = today
+    elif ".." in time_expr:
+        # Explicit range, e.g. 2026-01-01..2026-12-31 (both ends inclusive)
+        start_str, end_str = (part.strip() for part in time_expr.split("..", 1))
+        start_date = datetime.strptime(start_str, "%Y-%m-%d")
+        end_date = datetime.strptime(end_str, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
     else:
         raise ValueError(f"Unknown time expression: {time_expr}")
 
@@ -209,30 +269,557 @@ def format_date_only(iso_date: str) -> str:
     return iso_date.split('T')[0] if 'T' in iso_date else iso_date
 
 
-def run_gh_command(args: List[str], json_output: bool = True) -> Dict | str:
-    """Run gh CLI command and return output."""
+# In-process API client, None means fall back to `gh` subprocesses
+_github_client = None
+# Shared by every worker and both transports so the whole run paces against one quota
+_rate_limiter = RateLimiter()
+
+
+def init_github_client(
+    use_api: bool = True,
+    pool_size: int = DEFAULT_CONCURRENCY,
+    http_cache: Optional[ReviewCache] = None
+) -> bool:
+    """Set up the pooled in-process client; returns False when falling back to gh."""
+    global _github_client
+    _github_client = None
+    if use_api:
+        try:
+            _github_client = GitHubClient.from_environment(
+                pool_size=pool_size, rate_limiter=_rate_limiter, http_cache=http_cache)
+        except ImportError:
+            # requests not installed: every call goes through the gh CLI
+            _github_client = None
+    return _github_client is not None
+
+
+# LLM summarizer for AI review bodies; None keeps the heuristic summaries
+_summarizer: Optional[LLMSummarizer] = None
+
+
+def init_summarizer(
+    enabled: bool = False,
+    base_url: Optional[str] = None,
+    model: Optional[str] = None,
+    batch_size: int = DEFAULT_AI_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> bool:
+    """Set up the batched LLM summarization stage; returns False when it stays disabled."""
+    global _summarizer
+    _summarizer = None
+    if enabled:
+        try:
+            _summarizer = LLMSummarizer.from_environment(
+                base_url=base_url, model=model, batch_size=batch_size, concurrency=concurrency)
+        except ImportError:
+            print("⚠️ 未安装 requests, AI总结不可用, 使用规则摘要")
+    return _summarizer is not None
+
+
+def run_gh_command(
+    args: List[str],
+    json_output: bool = True,
+    json_fields: Optional[str] = None,
+    resource: str = 'graphql'
+) -> Dict | str:
+    """
+    Run gh CLI command and return output.
+
+    resource is the quota the command spends: 'graphql' for `gh pr list`, `gh repo list`
+    and `gh api graphql`, 'core' for REST `gh api <path>` calls. Rate limits and transient
+    failures (5xx, network errors) are retried; a command that still fails raises GitHubAPIError.
+    """
     cmd = ["gh"] + args
     if json_output:
-        cmd.extend(["--json", "number,title,author,createdAt,mergedAt,mergedBy,baseRefName,url,reviews,comments"])
+        cmd.extend(["--json", json_fields or PR_JSON_FIELDS])
+
+    for attempt in range(_rate_limiter.max_retries + 1):
+        _rate_limiter.wait(resource)
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            if json_output:
+                return json.loads(result.stdout)
+            return result.stdout
+        except subprocess.CalledProcessError as e:
+            if RateLimiter.is_rate_limit_message(e.stderr) and attempt < _rate_limiter.max_retries:
+                delay = _rate_limiter.backoff_delay(attempt)
+                print(f"⏳ 触发GitHub速率限制, {delay:.0f}s 后重试 [{attempt + 1}/{_rate_limiter.max_retries}]")
+                _rate_limiter.pause(delay)
+                continue
+            if RateLimiter.is_transient_message(e.stderr) and attempt < _rate_limiter.max_retries:
+                delay = _rate_limiter.transient_delay(attempt)
+                print(f"⚠️ gh请求失败, {delay:.0f}s 后重试 [{attempt + 1}/{_rate_limiter.max_retries}]: "
+                      f"{e.stderr.strip()[:200]}")
+                time.sleep(delay)
+                continue
+            raise GitHubAPIError(f"gh command failed: {e}\nstderr: {e.stderr}") from e
+        except json.JSONDecodeError as e:
+            raise GitHubAPIError(f"Failed to parse gh JSON output: {e}") from e
+
+
+def run_gh_graphql(query: str, variables: Optional[Dict] = None) -> Dict:
+    """
+    Run a GraphQL query (in-process client, else `gh api graphql`) and return its data.
+
+    Raises GitHubAPIError when the request fails after its retries or returns no data.
+    """
+    for attempt in range(_rate_limiter.max_retries + 1):
+        if _github_client:
+            result = _github_client.graphql(query, variables)
+        else:
+            args = ["api", "graphql", "-f", f"query={query}"]
+            for key, value in (variables or {}).items():
+                # -F sends typed values (numbers), -f sends raw strings
+                flag = "-F" if isinstance(value, int) else "-f"
+                args.extend([flag, f"{key}={value}"])
+
+            output = run_gh_command(args, json_output=False)
+            try:
+                result = json.loads(output)
+            except json.JSONDecodeError as e:
+                raise GitHubAPIError(f"Failed to parse GraphQL response: {e}") from e
+
+        # An exhausted GraphQL quota comes back as HTTP 200 with a RATE_LIMITED error
+        rate_limited = any(error.get('type') == 'RATE_LIMITED' for error in result.get('errors', []))
+        if not rate_limited or attempt == _rate_limiter.max_retries:
+            break
+        quota = _rate_limiter.quota.get('graphql', {})
+        delay = _rate_limiter.backoff_delay(attempt, reset=quota.get('reset'),
+                                            remaining='0' if quota else None)
+        print(f"⏳ GraphQL配额已用完, {delay:.0f}s 后重试 [{attempt + 1}/{_rate_limiter.max_retries}]")
+        _rate_limiter.pause(delay)
+
+    for error in result.get('errors', []):
+        print(f"⚠️ GraphQL error: {error.get('message', error)}")
+    if result.get('data') is None:
+        raise GitHubAPIError("GraphQL query returned no data")
+    _rate_limiter.update_from_graphql(result['data'].get('rateLimit'))
+    return result['data']
+
+
+def search_merged_prs(
+    repo: str,
+    search_query: str,
+    limit: Optional[int] = None,
+    stop_if_capped: bool = False
+) -> tuple:
+    """
+    Run one merged-PR search.
 
+    Returns (prs, capped, total): prs as [{number, title, createdAt, updatedAt}] newest first,
+    capped when the query matches more than search can return, total the match count if known.
+    With stop_if_capped a capped query returns no PRs, after one request when the API reports
+    the count. A search that still fails after its retries is skipped with a warning.
+    """
+    max_items = limit or SEARCH_RESULT_LIMIT
+    if _github_client:
+        params = {'q': f"repo:{repo} is:pr is:merged {search_query}", 'sort': 'created',
+                  'order': 'desc', 'per_page': CONNECTION_PAGE_SIZE}
+        try:
+            first_page = _github_client.rest_get("search/issues", params)
+            total = first_page['total_count']
+            capped = total > SEARCH_RESULT_LIMIT
+            items = first_page['items']
+            if capped and stop_if_capped:
+                return [], True, total
+            if len(items) < min(total, max_items):
+                items += _github_client.rest_paginate(
+                    "search/issues", {**params, 'page': 2},
+                    max_items=max_items - len(items), items_key='items')
+        except GitHubAPIError as e:
+            print(f"⚠️ GitHub搜索失败, 跳过 {repo} {search_query}: {e}")
+            return [], False, 0
+        prs = [{'number': item['number'], 'title': item['title'],
+                'createdAt': item['created_at'], 'updatedAt': item['updated_at']}
+               for item in items[:max_items]]
+        return prs, capped, total
+
+    args = [
+        "pr", "list",
+        "--repo", repo,
+        "--state", "merged",
+        "--search", search_query,
+        # Without --limit gh stops at 30 results; search itself caps at 1000
+        "--limit", str(max_items),
+    ]
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        if json_output:
-            return json.loads(result.stdout)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"❌ gh command failed: {e}")
-        print(f"stderr: {e.stderr}")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        print(f"❌ Failed to parse JSON output: {e}")
-        print(f"stdout: {result.stdout}")
-        sys.exit(1)
+        prs = run_gh_command(args, json_output=True, json_fields=PR_LIST_JSON_FIELDS)
+    except GitHubAPIError as e:
+        print(f"⚠️ GitHub搜索失败, 跳过 {repo} {search_query}: {e}")
+        return [], False, 0
+    # gh does not report the total; a full page of results means search may have cut it off
+    capped = len(prs) >= SEARCH_RESULT_LIMIT
+    return ([] if capped and stop_if_capped else prs), capped, None
+
+
+def _merged_qualifier(
+    start: datetime,
+    end: datetime,
+    base_branch: Optional[str],
+    updated_since: Optional[str] = None
+) -> str:
+    query = f"merged:{start.strftime(SEARCH_TIME_FORMAT)}..{end.strftime(SEARCH_TIME_FORMAT)}"
+    if base_branch:
+        query += f" base:{base_branch}"
+    if updated_since:
+        query += f" updated:>={updated_since}"
+    return query
+
+
+def _split_time_range(start: datetime, end: datetime, parts: int) -> List[tuple]:
+    """Split the inclusive [start, end] second range into up to parts adjacent ranges."""
+    seconds = int((end - start).total_seconds()) + 1
+    parts = max(1, min(parts, seconds))
+    bounds = [start + timedelta(seconds=seconds * i // parts) for i in range(parts + 1)]
+    return [(bounds[i], bounds[i + 1] - timedelta(seconds=1)) for i in range(parts)]
+
+
+def list_merged_prs(
+    repo: str,
+    start_date: str,
+    end_date: str,
+    base_branch: Optional[str] = None,
+    limit: Optional[int] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    updated_since: Optional[str] = None
+) -> List[Dict]:
+    """
+    List PRs merged between start_date and end_date (YYYY-MM-DD, inclusive), newest first.
+
+    updated_since (SEARCH_TIME_FORMAT) keeps only PRs updated at or after it, e.g.
+    the ones with reviews submitted since the last run.
+
+    Search returns at most 1000 results per query. When the whole window hits that cap
+    it is split into time slices (sized from the reported total when known) that are
+    searched concurrently; slices that are still capped are bisected again. Results
+    are merged and de-duplicated by PR number.
+    """
+    search_query = f"merged:{start_date}..{end_date}"
+    if base_branch:
+        search_query += f" base:{base_branch}"
+    if updated_since:
+        search_query += f" updated:>={updated_since}"
+
+    # An explicit limit within the cap never needs slicing
+    if limit and limit <= SEARCH_RESULT_LIMIT:
+        return search_merged_prs(repo, search_query, limit)[0]
+
+    prs, capped, total = search_merged_prs(repo, search_query, stop_if_capped=True)
+    if not capped:
+        return prs
+
+    window_start = datetime.strptime(start_date, "%Y-%m-%d")
+    window_end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1, seconds=-1)
+    parts = -(-total // SEARCH_SLICE_TARGET) if total else 2
+    slices = _split_time_range(window_start, window_end, parts)
+    print(f"   搜索结果超过 {SEARCH_RESULT_LIMIT} 条上限"
+          f"{f' (共 {total} 条)' if total else ''}, 按时间切分为 {len(slices)} 段并发搜索...")
+
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    def search_slice(start: datetime, end: datetime) -> tuple:
+        return search_merged_prs(repo, _merged_qualifier(start, end, base_branch, updated_since), stop_if_capped=True)
+
+    found: Dict[int, Dict] = {}
+    searched = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        pending = {executor.submit(search_slice, *bounds): bounds for bounds in slices}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, end = pending.pop(future)
+                slice_prs, slice_capped, slice_total = future.result()
+                if slice_capped and end > start:
+                    # Still over the cap: bisect (or split by the reported count) and retry
+                    parts = max(2, -(-slice_total // SEARCH_SLICE_TARGET)) if slice_total else 2
+                    for bounds in _split_time_range(start, end, parts):
+                        pending[executor.submit(search_slice, *bounds)] = bounds
+                    continue
+                if slice_capped:
+                    print(f"   ⚠️ {start.strftime(SEARCH_TIME_FORMAT)} 内合并的PR超过搜索上限, 结果可能不完整")
+                    slice_prs = search_merged_prs(repo, _merged_qualifier(start, end, base_branch, updated_since))[0]
+                searched += 1
+                for pr in slice_prs:
+                    found[pr['number']] = pr
+
+    print(f"   {searched} 段搜索完成, 去重后 {len(found)} 个PR")
+    prs = sorted(found.values(), key=lambda pr: (pr.get('createdAt') or '', pr['number']), reverse=True)
+    return prs[:limit] if limit else prs
+
+
+def _normalize_pr_detail(node: Dict) -> Dict:
+    """Convert a GraphQL PullRequest node to the `gh pr view --json` shape."""
+    pr = {key: value for key, value in node.items() if key not in ('reviews', 'comments')}
+    pr['reviews'] = node.get('reviews', {}).get('nodes', [])
+    pr['comments'] = node.get('comments', {}).get('nodes', [])
+    return pr
+
+
+def _fetch_remaining_nodes(repo: str, number: int, connection: str, cursor: str) -> List[Dict]:
+    """Page through the rest of a PR's reviews or comments connection."""
+    owner, name = repo.split('/', 1)
+    node_fields = REVIEW_NODE_FIELDS if connection == 'reviews' else COMMENT_NODE_FIELDS
+    query = f"""
+query($owner: String!, $name: String!, $number: Int!, $cursor: String!) {{
+  repository(owner: $owner, name: $name) {{
+    pullRequest(number: $number) {{
+      {connection}(first: {CONNECTION_PAGE_SIZE}, after: $cursor) {{
+        pageInfo {{ hasNextPage endCursor }}
+        nodes {{ {node_fields} }}
+      }}
+    }}
+  }}
+}}
+"""
+    nodes = []
+    while cursor:
+        data = run_gh_graphql(query, {'owner': owner, 'name': name, 'number': number, 'cursor': cursor})
+        page = data['repository']['pullRequest'][connection]
+        nodes.extend(page['nodes'])
+        cursor = page['pageInfo']['endCursor'] if page['pageInfo']['hasNextPage'] else None
+    return nodes
+
+
+def fetch_pr_details_page(repo: str, numbers: List[int]) -> Dict[int, Dict]:
+    """Fetch details (reviews, comments, merge metadata) for several PRs in one GraphQL request."""
+    owner, name = repo.split('/', 1)
+    aliases = "\n".join(f"    pr{number}: pullRequest(number: {number}) {{ ...PRDetail }}" for number in numbers)
+    query = f"""
+query($owner: String!, $name: String!) {{
+  rateLimit {{ limit cost remaining resetAt }}
+  repository(owner: $owner, name: $name) {{
+{aliases}
+  }}
+}}
+{PR_DETAIL_FRAGMENT}"""
+    data = run_gh_graphql(query, {'owner': owner, 'name': name})
+
+    details = {}
+    for number in numbers:
+        node = (data.get('repository') or {}).get(f"pr{number}")
+        if not node:
+            continue
+        pr = _normalize_pr_detail(node)
+        try:
+            for connection in ('reviews', 'comments'):
+                page_info = node[connection]['pageInfo']
+                if page_info['hasNextPage']:
+                    pr[connection].extend(
+                        _fetch_remaining_nodes(repo, number, connection, page_info['endCursor']))
+        except GitHubAPIError as e:
+            # Incomplete reviews would be cached as complete: leave the PR out instead
+            print(f"⚠️ 获取 {repo}#{number} 的全部review失败, 跳过该PR: {e}")
+            continue
+        details[number] = pr
+    return details
+
+
+def list_review_comments(repo: str, since: str) -> Optional[Dict[int, List[Dict]]]:
+    """
+    Inline review comments of repo updated since `since` (ISO 8601), grouped by PR number,
+    or None when the listing failed after its retries.
+
+    One repo-wide paginated listing replaces a request per PR; comments of PRs
+    outside the report are simply not looked up.
+    """
+    path = f"repos/{repo}/pulls/comments"
+    params = {'since': since, 'sort': 'updated', 'direction': 'asc', 'per_page': 100}
+    try:
+        if _github_client:
+            items = _github_client.rest_paginate(path, params)
+        else:
+            args = ["api", path, "-X", "GET", "--paginate", "--jq", ".[]"]
+            for key, value in params.items():
+                args.extend(["-f", f"{key}={value}"])
+            # --jq prints one comment per line across all pages
+            output = run_gh_command(args, json_output=False, resource='core')
+            items = [json.loads(line) for line in output.splitlines() if line.strip()]
+    except GitHubAPIError as e:
+        print(f"⚠️ 获取 {repo} 的行内评论失败, 本次报告不含其行内评论: {e}")
+        return None
+
+    comments: Dict[int, List[Dict]] = {}
+    for item in items:
+        number = int(item['pull_request_url'].rstrip('/').rsplit('/', 1)[1])
+        comment = {key: item.get(key) for key in REVIEW_COMMENT_FIELDS}
+        # REST reports Apps as "<name>[bot]"; GraphQL, and so VALID_AI_REVIEWERS, uses the bare login
+        login = (item.get('user') or {}).get('login', '')
+        comment['author'] = {'login': login[:-len(BOT_LOGIN_SUFFIX)] if login.endswith(BOT_LOGIN_SUFFIX) else login}
+        comments.setdefault(number, []).append(comment)
+    return comments
+
+
+def iter_pr_details(
+    prs_by_repo: Dict[str, List[Dict]],
+    cache: Optional[ReviewCache],
+    offline: bool = False,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timings: Optional[Dict[str, float]] = None
+) -> Iterator[tuple]:
+    """
+    Yield (repo, pr, details) for the listed PRs in order; details is None when unavailable.
+
+    Only PRs the cache lacks are fetched (nothing when offline), page_size PRs per
+    GraphQL request. A pool of concurrency workers fetches pages ahead of the
+    consumer, at most 2 × concurrency pages past the PR being consumed, so a
+    slow consumer pauses fetching. Each repo's inline review comments are listed
+    once, and fetched pages are stored in the cache as they are consumed.
+    Request time per repo is added to timings when given.
+    """
+    if offline:
+        for repo, prs in prs_by_repo.items():
+            for pr in prs:
+                yield repo, pr, pr
+        return
+
+    # Merged PRs rarely change: only fetch PRs that are new or have a newer updatedAt
+    # (new review comments bump it), or were cached before inline comments were collected
+    stale = {repo: set(cache.find_stale(repo, prs, required_fields=('reviewComments',)) if cache
+                       else (pr['number'] for pr in prs))
+             for repo, prs in prs_by_repo.items()}
+    stale_total = sum(len(numbers) for numbers in stale.values())
+    if cache:
+        total = sum(len(prs) for prs in prs_by_repo.values())
+        print(f"   缓存命中 {total - stale_total} 个, 需要获取 {stale_total} 个")
+
+    concurrency = max(1, concurrency)
+    # Split small reports into at least one page per worker
+    page_size = max(1, min(page_size, -(-stale_total // concurrency)))
+    # Pages of stale PRs in report order, and the page each stale PR is fetched in
+    pages: List[tuple] = []
+    page_of: Dict[tuple, int] = {}
+    for repo, prs in prs_by_repo.items():
+        numbers = [pr['number'] for pr in prs if pr['number'] in stale[repo]]
+        for start in range(0, len(numbers), page_size):
+            page_of.update(((repo, number), len(pages)) for number in numbers[start:start + page_size])
+            pages.append((repo, numbers[start:start + page_size]))
+    # Comments are never older than their PR, so the oldest fetched PR bounds the listing
+    since_by_repo = {repo: min(pr.get('createdAt') or '' for pr in prs if pr['number'] in stale[repo])
+                     for repo, prs in prs_by_repo.items() if stale[repo]}
+    if pages:
+        print(f"   并发获取 {stale_total} 个PR详情 ({len(pages)} 个请求, 并发数 {concurrency})...")
+
+    def fetch_page(repo: str, page_numbers: List[int]) -> tuple:
+        started = time.monotonic()
+        try:
+            details = fetch_pr_details_page(repo, page_numbers)
+        except GitHubAPIError as e:
+            # One failed page must not end a long run: its PRs are reported without details
+            print(f"⚠️ 获取 {repo} 的 {len(page_numbers)} 个PR详情失败, 跳过该页: {e}")
+            details = {}
+        return details, time.monotonic() - started
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    futures: Dict[int, object] = {}
+    listings: Dict[str, object] = {}
+    submitted = 0
+    current, current_details = -1, {}
+    fetched = comment_total = 0
+    try:
+        for repo, prs in prs_by_repo.items():
+            cached: Dict[int, Dict] = {}
+            for position, pr in enumerate(prs):
+                while submitted < len(pages) and submitted <= current + 2 * concurrency:
+                    page_repo, page_numbers = pages[submitted]
+                    if page_repo not in listings:
+                        listings[page_repo] = executor.submit(
+                            list_review_comments, page_repo, since_by_repo[page_repo])
+                    futures[submitted] = executor.submit(fetch_page, page_repo, page_numbers)
+                    submitted += 1
+
+                number = pr['number']
+                index = page_of.get((repo, number))
+                if index is None:
+                    if number not in cached:
+                        # Cached details are read a page at a time as well
+                        upcoming = [upcoming_pr['number'] for upcoming_pr in prs[position:position + page_size]
+                                    if upcoming_pr['number'] not in stale[repo]]
+                        cached = cache.get_prs(repo, upcoming)
+                    yield repo, pr, cached.get(number)
+                    continue
+
+                if index != current:
+                    current_details, elapsed = futures.pop(index).result()
+                    current = index
+                    comments = listings[repo].result()
+                    for page_number, details in current_details.items():
+                        if comments is None:
+                            # Cached without reviewComments, so the next run fetches the PR again
+                            continue
+                        details['reviewComments'] = comments.get(page_number, [])
+                        comment_total += len(details['reviewComments'])
+                    if cache:
+                        cache.store_prs(repo, current_details)
+                    if timings is not None:
+                        timings[repo] = timings.get(repo, 0.0) + elapsed
+                    fetched += len(pages[index][1])
+                    print(f"   [{fetched}/{stale_total}] PR详情已获取")
+                yield repo, pr, current_details.get(number)
+            if repo in listings:
+                # Every page of the repo is consumed: drop its comment listing
+                listings[repo] = None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if listings:
+        print(f"   获取行内评论 {comment_total} 条 ({len(listings)} 个仓库)")
+
+
+def list_org_repos(
+    org: str,
+    name_filter: Optional[str] = None,
+    offline_cache: Optional[ReviewCache] = None
+) -> List[str]:
+    """List non-archived repos of org as owner/name, optionally filtered by an fnmatch pattern."""
+    if offline_cache:
+        repos = offline_cache.list_repos(org)
+    else:
+        # Nothing has been fetched yet, so there is no partial run to keep
+        try:
+            if _github_client:
+                items = _github_client.rest_paginate(f"orgs/{org}/repos", {'type': 'all'})
+                repos = [item['full_name'] for item in items if not item.get('archived')]
+            else:
+                args = ["repo", "list", org, "--no-archived", "--limit", str(SEARCH_RESULT_LIMIT)]
+                repos = [item['nameWithOwner'] for item in run_gh_command(args, json_fields="nameWithOwner")]
+        except GitHubAPIError as e:
+            print(f"❌ Failed to list repositories of {org}: {e}")
+            sys.exit(1)
+
+    if name_filter:
+        repos = [repo for repo in repos
+                 if fnmatch.fnmatch(repo.split('/', 1)[1].lower(), name_filter.lower())]
+    return sorted(repos)
+
+
+def resolve_repos(
+    repos: Optional[List[str]] = None,
+    repos_file: Optional[str] = None,
+    org: Optional[str] = None,
+    name_filter: Optional[str] = None,
+    offline_cache: Optional[ReviewCache] = None
+) -> List[str]:
+    """Collect owner/name repos from --repo values (comma separated allowed), a file and an org."""
+    resolved = []
+    for value in repos or []:
+        resolved.extend(part.strip() for part in value.split(',') if part.strip())
+    if repos_file:
+        with open(repos_file, encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    resolved.append(line)
+    if org:
+        resolved.extend(list_org_repos(org, name_filter, offline_cache))
+    # Keep the first occurrence of each repo
+    return list(dict.fromkeys(resolved))
 
 
 def should_include_reviewer(
@@ -291,20 +878,14 @@ def generate_ai_impact_analysis(problem_description: str) -> str:
     if not problem_description or len(problem_description.strip()) < 10:
         return "无"
 
-    # Simple heuristic: check for impact keywords
-    impact_keywords = [
-        "影响", "隐患", "风险", "问题", "修复", "改进", "建议", "注意",
-        "警告", "错误", "异常", "bug", "缺陷", "优化", "重构"
-    ]
-
-    for keyword in impact_keywords:
-        if keyword in problem_description:
-            # Extract 20 chars summary around impact keyword
-            idx = problem_description.find(keyword)
-            start = max(0, idx - 5)
-            end = min(len(problem_description), idx + 20)
-            summary = problem_description[start:end].strip()
-            return summary
+    # Simple heuristic: check for impact keywords (impact_keywords rules)
+    match = get_review_classifier().find_impact(problem_description)
+    if match:
+        # Extract 20 chars summary around impact keyword
+        start = max(0, match.position - 5)
+        end = min(len(problem_description), match.position + 20)
+        summary = problem_description[start:end].strip()
+        return summary
 
     # If no clear impact keyword found
     return "无"
@@ -364,7 +945,8 @@ def summarize_for_ai(review_body: str, max_length: int = 50) -> str:
 
 def extract_review_suggestions(
     pr_data: Dict,
-    target_reviewers: Optional[List[str]] = None
+    target_reviewers: Optional[List[str]] = None,
+    groups: Optional[ReviewDeduplicator] = None
 ) -> List[Dict]:
     """
     Extract valid review suggestions from PR reviews.
@@ -376,35 +958,625 @@ def extract_review_suggestions(
     - Non-valid AI reviewers (except sourcery-ai)
 
     Multiple valid reviewers per PR = multiple report rows for that PR.
+    Bodies of one group (see add_review_bodies) with the same text share one
+    classification; the others are classified on their own.
     """
     valid_reviews = []
 
     for review in pr_data.get('reviews', []):
-        author = review.get('author', {}).get('login', '')
-        body = review.get('body', '')
-        state = review.get('state', '')
+        author = (review.get('author') or {}).get('login', '')
+        candidate = _review_candidate(author, review.get('body', ''), review.get('state', ''), groups)
+        if candidate:
+            candidate['id'] = review.get('id')
+            candidate['review_time'] = review.get('submittedAt', '')
+            valid_reviews.append(candidate)
 
-        # Skip if no body or invalid automated review
-        if not body:
-            continue
+    return valid_reviews
+
+
+def _review_candidate(
+    author: str,
+    body: str,
+    state: str,
+    groups: Optional[ReviewDeduplicator] = None
+) -> Optional[Dict]:
+    """Classified review dict when body passes the review filters, else None."""
+    # Skip if no body or invalid automated review
+    if not body:
+        return None
+
+    # One scan of the body gives both the invalid-review check and the problem type. Within a
+    # group it is shared only by bodies with the same text: normalization drops URLs and
+    # numbers, and near-duplicates differ in words, either of which can hold the keyword
+    group = groups.group_of(body) if groups else None
+    if group is None:
+        classification = get_review_classifier().classify(body)
+    else:
+        classifications = group.results.setdefault('classification', {})
+        key = same_text_key(body)
+        classification = classifications.get(key)
+        if classification is None:
+            classification = classifications[key] = get_review_classifier().classify(body)
+    if not is_valid_person_review(body, state, classification):
+        return None
+
+    # Filter by reviewer
+    if not should_include_reviewer(author):
+        return None
+
+    problem_rule = classification.problem_rule
+    return {
+        'content': body,
+        'problem_type': classification.problem_type,
+        'rule': f"{problem_rule.rule}:{problem_rule.keyword}" if problem_rule else None,
+        'reviewer': author,
+        'group': group,
+    }
+
+
+def group_review_threads(comments: List[Dict]) -> List[Dict]:
+    """
+    Group inline review comments into threads: {'root': first comment, 'replies': [...]}.
+
+    GitHub points every reply's in_reply_to_id at the thread's first comment; a
+    reply whose first comment is missing starts the thread itself.
+    """
+    threads: Dict[int, Dict] = {}
+    for comment in sorted(comments, key=lambda c: c.get('created_at') or ''):
+        thread_id = comment.get('in_reply_to_id') or comment['id']
+        if thread_id in threads:
+            threads[thread_id]['replies'].append(comment)
+        else:
+            threads[thread_id] = {'root': comment, 'replies': []}
+    return list(threads.values())
+
+
+def format_comment_location(comment: Dict) -> str:
+    """path:line or path:start-end of an inline comment (outdated comments keep their original lines)."""
+    path = comment.get('path') or ''
+    line = comment.get('line') or comment.get('original_line')
+    start_line = comment.get('start_line') or comment.get('original_start_line')
+    if not line:
+        return path
+    if start_line and start_line != line:
+        return f"{path}:{start_line}-{line}"
+    return f"{path}:{line}"
+
+
+def extract_review_threads(pr_data: Dict, groups: Optional[ReviewDeduplicator] = None) -> List[Dict]:
+    """
+    Extract valid inline review threads (diff comments) from PR review comments.
+
+    Each thread is one candidate row, judged by its first comment with the same
+    filters and classification as review bodies; replies only add to the thread.
+    """
+    valid_threads = []
+
+    for thread in group_review_threads(pr_data.get('reviewComments') or []):
+        root = thread['root']
+        author = (root.get('author') or {}).get('login', '')
+        candidate = _review_candidate(author, root.get('body') or '', '', groups)
+        if candidate:
+            candidate.update({
+                'id': str(root['id']),
+                'review_time': root.get('created_at') or '',
+                'source': 'inline',
+                'location': format_comment_location(root),
+                'url': root.get('html_url'),
+                'replies': len(thread['replies']),
+            })
+            valid_threads.append(candidate)
+
+    return valid_threads
+
+
+def add_review_bodies(groups: ReviewDeduplicator, repo: str, pr: Dict):
+    """Add a PR's review bodies and inline thread roots to their duplicate groups."""
+    bodies = [review.get('body') for review in pr.get('reviews', [])]
+    bodies += [thread['root'].get('body') for thread in group_review_threads(pr.get('reviewComments') or [])]
+    for body in bodies:
+        if body:
+            groups.add(body, (repo, pr['number']))
+
+
+def first_review_time(pr: Dict) -> Optional[str]:
+    """When someone other than the author first reviewed pr (a review or an inline comment), or None."""
+    author = (pr.get('author') or {}).get('login')
+    times = [review.get('submittedAt') for review in pr.get('reviews', [])
+             if (review.get('author') or {}).get('login') != author]
+    times += [comment.get('created_at') for comment in pr.get('reviewComments') or []
+              if (comment.get('author') or {}).get('login') != author]
+    return min(filter(None, times), default=None)
 
-        if not is_valid_person_review(body, state):
-            continue
 
-        # Filter by reviewer
-        if not should_include_reviewer(author):
+def classify_pr_reviews(
+    items: Iterator[tuple],
+    groups: Optional[ReviewDeduplicator] = None,
+    pr_counts: Optional[Dict[str, int]] = None
+) -> Iterator[tuple]:
+    """
+    Pipeline stage: (repo, pr, details) -> (repo, pr, reviews), the PR's valid, classified reviews.
+
+    The yielded pr is the PR's details without their review payloads, plus
+    firstReviewAt (see first_review_time). Bodies join
+    their duplicate groups as they arrive, so the first occurrence in report order
+    represents each group. pr_counts (repo -> PR count) turns on per-PR output.
+    """
+    positions: Dict[str, int] = {}
+    for repo, pr, details in items:
+        if pr_counts:
+            positions[repo] = positions.get(repo, 0) + 1
+            print(f"   [{positions[repo]}/{pr_counts[repo]}] PR #{pr['number']}: {pr['title'][:40]}...")
+        if not details:
+            print(f"      ⚠️ PR #{pr['number']} 无法获取PR详情")
+            yield repo, pr, []
             continue
 
-        problem_type = get_problem_type_from_suggestion(body)
+        if groups is not None:
+            add_review_bodies(groups, repo, details)
+        # Valid reviews and inline review threads (filters out automated approvals
+        # and invalid AI reviewers)
+        reviews = extract_review_suggestions(details, groups=groups) + extract_review_threads(details, groups)
+        if pr_counts:
+            if not reviews:
+                print(f"      ⚠️ 无有效review")
+            for review in reviews:
+                print(f"      🏷️ {review['reviewer']}: {PROBLEM_TYPES.get(review['problem_type'], '其他')} "
+                      f"(规则: {review.get('rule') or '默认'})")
+        pr_meta = {key: value for key, value in details.items()
+                   if key not in ('reviews', 'comments', 'reviewComments')}
+        pr_meta['firstReviewAt'] = first_review_time(details)
+        yield repo, pr_meta, reviews
+
+
+def summarize_pr_reviews(
+    items: Iterator[tuple],
+    cache: Optional[ReviewCache],
+    offline: bool = False
+) -> Iterator[tuple]:
+    """
+    Pipeline stage: attach LLM summaries (review['summary']) to the AI reviews of each PR.
 
-        valid_reviews.append({
-            'content': body,
-            'problem_type': problem_type,
-            'reviewer': author,
-            'review_time': review.get('submittedAt', ''),
-        })
+    PRs are held until batch_size × concurrency distinct AI bodies (or
+    SUMMARY_WINDOW_PRS PRs) have gathered, which are then summarized together;
+    PRs leave in order. Only one body per duplicate group is sent. Offline runs
+    only use summaries already cached.
+    """
+    summarizer = _summarizer
+    window = summarizer.batch_size * summarizer.concurrency
+    print(f"🤖 AI总结 ({summarizer.model}, 每批 {summarizer.batch_size} 条, 并发 {summarizer.concurrency})...")
+    # Representative body -> summary, or None when it could not be summarized
+    summaries: Dict[str, Optional[Dict]] = {}
+    pending = set()
+    held: List[tuple] = []
+
+    def representative(review: Dict) -> str:
+        return review['group'].representative if review['group'] else review['content']
+
+    def release() -> Iterator[tuple]:
+        if pending:
+            results = summarizer.summarize(pending, cache=cache, cached_only=offline)
+            summaries.update((body, results.get(body)) for body in pending)
+            pending.clear()
+        for item in held:
+            for review in item[2]:
+                if review['reviewer'].lower() in VALID_AI_REVIEWERS:
+                    review['summary'] = summaries[representative(review)]
+        yield from held
+        held.clear()
+
+    for item in items:
+        pending.update(body for body in (representative(review) for review in item[2]
+                                         if review['reviewer'].lower() in VALID_AI_REVIEWERS)
+                       if body not in summaries)
+        held.append(item)
+        if not pending or len(pending) >= window or len(held) >= SUMMARY_WINDOW_PRS:
+            yield from release()
+    yield from release()
+    print(f"   AI总结 {len(summaries)} 条review: 缓存命中 {summarizer.cached_count} 条, "
+          f"请求 {summarizer.request_count} 次, 失败 {summarizer.failed_count} 条")
+
+
+def build_review_row(repo: str, module_name: str, pr: Dict, review: Dict) -> Dict:
+    """
+    Report row for one valid review of pr; 序号 is assigned by the writer.
 
-    return valid_reviews
+    AI reviews use their LLM summary (see summarize_pr_reviews) when they have
+    one and the heuristic summary otherwise.
+    """
+    problem_type = review['problem_type']
+    severity = get_severity_from_problem_type(problem_type)
+    reviewer = review['reviewer']
+
+    # Determine summarization method and impact analysis
+    is_ai_reviewer = reviewer.lower() in VALID_AI_REVIEWERS
+
+    summary = review.get('summary') if is_ai_reviewer else None
+    if summary:
+        # AI review summarized by the LLM stage
+        chinese_summary = summary['problem_description']
+        impact_analysis = summary['impact_analysis']
+    elif is_ai_reviewer:
+        # AI review: summarize to 50 chars
+        chinese_summary = summarize_for_ai(review['content'], max_length=50)
+        impact_analysis = generate_ai_impact_analysis(chinese_summary)
+    else:
+        # Person review: copy original text
+        chinese_summary = summarize_for_person(review['content'])
+        impact_analysis = chinese_summary
+
+    is_inline = review.get('source') == 'inline'
+    if is_inline and review['location']:
+        # Inline threads carry the diff position they comment on
+        chinese_summary = f"[{review['location']}] {chinese_summary}"
+
+    created_at = pr.get('createdAt', '')
+    merged_at = pr.get('mergedAt', '')
+    review_time = review['review_time']
+
+    author = (pr.get('author') or {}).get('login', '')
+    merged_by = (pr.get('mergedBy') or {}).get('login', '')
+
+    # Format dates to YYYY-MM-DD only (no time)
+    created_date_only = format_date_only(created_at)
+    merged_date_only = format_date_only(merged_at)
+    review_date_only = format_date_only(review_time)
+
+    problem_status = "关闭" if merged_at else "解决中"
+
+    return {
+        # Numbered per sheet by the writer
+        '序号': 0,
+        '包名': module_name,
+        '仓库地址': f"https://github.com/{repo}",
+        '代码提交地址': review.get('url') or pr.get('url', ''),
+        # Reviews come from comments, inline threads from the code itself
+        '问题来源': PROBLEM_SOURCES[2] if is_inline else PROBLEM_SOURCES.get(3, '注释'),
+        '问题描述': chinese_summary,
+        '严重程度': severity,
+        '影响分析': impact_analysis,
+        '问题类型': PROBLEM_TYPES.get(problem_type, '其他'),
+        '提出人': reviewer,
+        '提出时间': review_date_only,
+        '解决人': merged_by,
+        '计划解决时间': merged_date_only,
+        '实际解决时间': merged_date_only,
+        '提出人确认是否验收通过': "是",
+        '问题状态': problem_status,
+    }
+
+
+def build_export_record(repo: str, pr: Dict, review: Dict, row: Dict) -> Dict:
+    """Export record (see review_export) for a report row: the row plus the raw PR and review fields."""
+    record = {name: value for name, value in row.items() if name != '序号'}
+    record.update({
+        'repo': repo,
+        'pr_number': pr['number'],
+        'pr_title': pr.get('title'),
+        'pr_url': pr.get('url'),
+        'pr_author': (pr.get('author') or {}).get('login'),
+        'base_branch': pr.get('baseRefName'),
+        'merged_by': (pr.get('mergedBy') or {}).get('login'),
+        'pr_created_at': pr.get('createdAt'),
+        'pr_merged_at': pr.get('mergedAt'),
+        'review_id': review.get('id'),
+        'review_source': review.get('source', 'review'),
+        'reviewer': review['reviewer'],
+        'review_submitted_at': review['review_time'],
+        'problem_type_id': review['problem_type'],
+        'classification_rule': review.get('rule'),
+        'location': review.get('location'),
+        'replies': review.get('replies'),
+    })
+    return record
+
+
+def open_analytics(enabled: bool) -> Optional[ReviewAnalytics]:
+    """Analytics collector for --analytics, or None when disabled or numpy is missing."""
+    if not enabled:
+        return None
+    try:
+        import numpy  # noqa: F401  (used by ReviewAnalytics.compute)
+    except ImportError:
+        print("⚠️ 未安装 numpy, 跳过统计分析")
+        return None
+    return ReviewAnalytics()
+
+
+def write_analytics(writer, analytics: ReviewAnalytics, json_path: Optional[str], used_names: set, meta: Dict):
+    """Compute the statistics, add the 统计 sheet (or sidecar file) and write them as JSON to json_path."""
+    started = time.monotonic()
+    result = analytics.compute()
+    writer.append_table(unique_sheet_name(ANALYTICS_SHEET, used_names), analytics_table(result))
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({**meta, **result}, f, ensure_ascii=False, indent=2)
+
+    overall = result['overall']
+    first_review = overall['time_to_first_review_hours']['p50']
+    merge = overall['time_to_merge_hours']['p50']
+    print(f"📈 统计: {overall['reviewed_prs']}/{overall['prs']} 个PR有review, "
+          f"首次review中位数 {first_review if first_review is not None else '-'} 小时, "
+          f"合并中位数 {merge if merge is not None else '-'} 小时 ({time.monotonic() - started:.2f}s)")
+    if json_path:
+        print(f"   统计JSON: {json_path}")
+
+
+def open_exporter(export_path: Optional[str]) -> Optional[ReviewExporter]:
+    """Exporter for --export, or None without one; exits when pyarrow is needed but missing."""
+    if not export_path:
+        return None
+    try:
+        return ReviewExporter(export_path)
+    except ImportError:
+        print(f"❌ 导出 {resolve_export_format(export_path)} 需要安装 pyarrow (pip install pyarrow)")
+        sys.exit(1)
+
+
+def new_report_state() -> Dict:
+    """
+    Progress of a report being written, saved with its checkpoints.
+
+    done lists the written PRs per repo, reviews the written reviews as [repo, ID];
+    started is when the run began (the next --append run looks for updates from
+    then on) and since the last run's start when appending.
+    """
+    return {'done': {}, 'row_counts': {}, 'timings': {}, 'sheets': {}, 'reviewers': [], 'reviews': [],
+            'prs': {}, 'started': datetime.now(timezone.utc).strftime(SEARCH_TIME_FORMAT), 'since': None}
+
+
+def open_report(
+    output_file: str,
+    output_format: str,
+    template_path: Optional[str],
+    key: Dict,
+    resume: bool = False,
+    append: bool = False
+) -> tuple:
+    """
+    Open the report writer with its checkpoint; returns (writer, checkpoint, state).
+
+    With resume, the writer continues from the checkpoint saved for the same
+    report (key), and state lists the PRs already written. Otherwise, or when
+    there is nothing to resume, the report starts empty. With append and an
+    existing workbook, rows are added to it instead: state holds what it already
+    contains (see read_append_state) and there is no checkpoint.
+    """
+    if append and os.path.exists(output_file):
+        writer = open_report_writer(output_file, output_format, template_path, VALIDATION_LISTS, append=True)
+        state = read_append_state(writer)
+        # Statistics cover the rows of one run; after appending they would be stale
+        if writer.drop_table(ANALYTICS_SHEET):
+            print(f"   ⚠️ 已删除过期的 {ANALYTICS_SHEET} 工作表, 可去掉 --append 重新生成统计")
+        print(f"   追加到已有报告: {sum(state['row_counts'].values())} 条记录, "
+              + (f"获取 {state['since']} 之后更新的PR" if state['since'] else "报告中没有更新记录, 跳过已有的PR"))
+        return writer, None, state
+
+    checkpoint = ReportCheckpoint(output_file, key)
+    writer = open_report_writer(output_file, output_format, template_path, VALIDATION_LISTS,
+                                partial_path=output_file + PARTIAL_SUFFIX)
+    state = checkpoint.load() if resume else None
+    if state and writer.resume(state['writer']):
+        print(f"   继续上次的进度: 已完成 {sum(len(numbers) for numbers in state['done'].values())} 个PR, "
+              f"{writer.row_count} 条记录")
+        return writer, checkpoint, {**new_report_state(), **state}
+    if resume:
+        print("   ⚠️ 没有可继续的进度, 重新生成报告")
+    return writer, checkpoint, new_report_state()
+
+
+def read_append_state(writer) -> Dict:
+    """
+    State of an existing workbook for --append.
+
+    The hidden APPEND_STATE_SHEET gives the last run's start (since), each repo's
+    sheet, the PRs covered and the IDs of the reviews written. A workbook without
+    it is judged by its rows: PRs that have rows count as done, and the whole
+    time range is searched again for the others.
+    """
+    state = new_report_state()
+    tracked = writer.read_table(APPEND_STATE_SHEET)
+    for entry in tracked:
+        kind, repo, value = entry.get('kind'), entry.get('repo'), str(entry.get('value'))
+        if kind == 'last_run':
+            state['since'] = value
+        elif kind == 'sheet':
+            state['sheets'][repo] = value
+        elif kind == 'pr':
+            state['prs'].setdefault(repo, []).append(int(value))
+        elif kind == 'review':
+            state['reviews'].append([repo, value])
+
+    for title in writer.data_sheets:
+        for row in writer.read_table(title):
+            match = PR_URL_PATTERN.match(row.get('代码提交地址') or '')
+            if not match:
+                continue
+            repo, number = match.group(1), int(match.group(2))
+            state['row_counts'][repo] = state['row_counts'].get(repo, 0) + 1
+            if not tracked:
+                state['sheets'].setdefault(repo, title)
+                if number not in state['done'].setdefault(repo, []):
+                    state['done'][repo].append(number)
+
+    for item in writer.read_table(SUMMARY_SHEET):
+        if item.get('仓库'):
+            state['timings'][item['仓库']] = float(item.get('耗时(秒)') or 0)
+    return state
+
+
+def updated_since(state: Dict, repo: str) -> Optional[str]:
+    """When appending, where the search for repo's PRs starts: the last run, unless repo is new to the report."""
+    return state['since'] if repo in state['prs'] else None
+
+
+def report_prs(state: Dict) -> Dict[str, set]:
+    """PR numbers per repo covered by the report: those of earlier runs and the ones written now."""
+    prs = {repo: set(numbers) for repo, numbers in state['prs'].items()}
+    for repo, numbers in state['done'].items():
+        prs.setdefault(repo, set()).update(numbers)
+    return prs
+
+
+def append_state_rows(state: Dict) -> List[Dict]:
+    """APPEND_STATE_SHEET rows recording a report written from state, read back by read_append_state."""
+    rows = [{'kind': 'last_run', 'repo': '', 'value': state['started']}]
+    rows += [{'kind': 'sheet', 'repo': repo, 'value': title} for repo, title in state['sheets'].items()]
+    for repo, numbers in report_prs(state).items():
+        rows += [{'kind': 'pr', 'repo': repo, 'value': number} for number in sorted(numbers)]
+    rows += [{'kind': 'review', 'repo': repo, 'value': review_id} for repo, review_id in state['reviews']]
+    return rows
+
+
+def write_review_rows(
+    writer,
+    checkpoint: Optional[ReportCheckpoint],
+    state: Dict,
+    prs_by_repo: Dict[str, List[Dict]],
+    module_names: Dict[str, str],
+    cache: Optional[ReviewCache],
+    sheet_layout: Optional[str] = None,
+    offline: bool = False,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    verbose: bool = True,
+    dedup: bool = True,
+    collapse_duplicates: bool = False,
+    exporter: Optional[ReviewExporter] = None,
+    analytics: Optional[ReviewAnalytics] = None
+):
+    """
+    Stream the report's rows: fetch → classify → summarize stages feeding the writer.
+
+    Rows are written in PR order while later PRs are still being fetched; the
+    stages are connected by bounded queues, so memory stays bounded however
+    many PRs there are. PRs that state lists as done are skipped, and so are
+    reviews whose IDs it lists. After every checkpoint.interval written PRs, and
+    on failure or interrupt, the writer is flushed and state saved so the run
+    can be resumed (without a checkpoint nothing is saved). sheet_layout None
+    writes every row to the default sheet.
+
+    With collapse_duplicates, reviews of one duplicate group become one row per
+    repo at their first PR, noting how many of the repo's PRs contain them; a
+    repo's rows are then held until the repo is done.
+
+    exporter also receives every written row with its raw fields, and is closed
+    when the rows are done (or fail). analytics collects every PR and written row.
+    """
+    done = state['done']
+    sheets = state['sheets']
+    row_counts = state['row_counts']
+    reviewers = set(state['reviewers'])
+    written_reviews = state['reviews']
+    known_reviews = {tuple(review) for review in written_reviews}
+    todo = {}
+    for repo, prs in prs_by_repo.items():
+        written = set(done.get(repo, ()))
+        todo[repo] = [pr for pr in prs if pr['number'] not in written]
+
+    groups = ReviewDeduplicator() if dedup else None
+    source = iter_pr_details(todo, cache, offline=offline, page_size=page_size, concurrency=concurrency,
+                             timings=state['timings'])
+    pr_counts = {repo: len(prs) for repo, prs in todo.items()} if verbose else None
+    stages = [lambda items: classify_pr_reviews(items, groups, pr_counts)]
+    if _summarizer:
+        stages.append(lambda items: summarize_pr_reviews(items, cache, offline))
+
+    def sheet_of(repo: str) -> Optional[str]:
+        if sheet_layout and repo not in sheets:
+            used = {title.lower() for title in sheets.values()}
+            if sheet_layout == "combined":
+                sheets[repo] = next(iter(sheets.values()), None) or unique_sheet_name(writer.default_sheet, used)
+            else:
+                sheets[repo] = unique_sheet_name(module_names[repo], used)
+        return sheets.get(repo)
+
+    def write(repo: str, pr: Dict, review: Dict, row: Dict):
+        writer.append(row, sheet_of(repo))
+        row_counts[repo] = row_counts.get(repo, 0) + 1
+        reviewers.add(row['提出人'])
+        if review['id']:
+            written_reviews.append([repo, review['id']])
+        if exporter:
+            exporter.append(build_export_record(repo, pr, review, row))
+        if analytics:
+            analytics.add_review(repo, pr['number'], review['reviewer'], row['问题类型'], review['review_time'])
+
+    def save():
+        if checkpoint is None:
+            return
+        state['writer'] = writer.checkpoint()
+        state['reviewers'] = sorted(reviewers)
+        checkpoint.save(state)
+
+    # Collapsed rows of the current repo: [(pr, review, row, group)], and the PRs they came from
+    held: List[tuple] = []
+    held_prs: List[int] = []
+    collapsed = set()
+
+    def release_held(repo: str):
+        for pr, review, row, group in held:
+            duplicate_prs = sum(1 for source in group.sources if source[0] == repo) if group else 0
+            if duplicate_prs > 1:
+                row['问题描述'] = f"{row['问题描述']} (同类问题共{duplicate_prs}个PR)"
+            write(repo, pr, review, row)
+        done.setdefault(repo, []).extend(held_prs)
+        held.clear()
+        held_prs.clear()
+        collapsed.clear()
+
+    current_repo = None
+    # False while a PR's rows are half written: the writer is not at a checkpointable position
+    consistent = True
+    try:
+        for repo, pr, reviews in run_pipeline(source, stages):
+            reviews = [review for review in reviews if (repo, review['id']) not in known_reviews]
+            if analytics:
+                analytics.add_pr(repo, pr['number'], pr.get('createdAt'), pr.get('firstReviewAt'), pr.get('mergedAt'))
+            if collapse_duplicates:
+                if repo != current_repo and current_repo is not None:
+                    consistent = False
+                    release_held(current_repo)
+                    consistent = True
+                    save()
+                current_repo = repo
+                for review in reviews:
+                    group = review['group']
+                    if group is not None:
+                        if id(group) in collapsed:
+                            continue
+                        collapsed.add(id(group))
+                    held.append((pr, review, build_review_row(repo, module_names[repo], pr, review), group))
+                held_prs.append(pr['number'])
+                continue
+
+            consistent = False
+            for review in reviews:
+                write(repo, pr, review, build_review_row(repo, module_names[repo], pr, review))
+            done.setdefault(repo, []).append(pr['number'])
+            consistent = True
+            if checkpoint and checkpoint.tick():
+                save()
+        if collapse_duplicates and current_repo is not None:
+            consistent = False
+            release_held(current_repo)
+            consistent = True
+    except BaseException:
+        if exporter:
+            exporter.close()
+        if consistent and checkpoint:
+            save()
+            print(f"⚠️ 报告未完成, 已保存进度 ({writer.row_count} 条记录), 使用 --resume 继续: {checkpoint.path}")
+        raise
+
+    if groups is not None:
+        stats = groups.stats()
+        if stats['reviews'] > stats['groups']:
+            print(f"🧬 去重: {stats['reviews']} 条review → {stats['groups']} 组 "
+                  f"(近似重复 {stats['near_duplicates']} 条)")
+    if exporter:
+        print(f"📤 导出 {exporter.close()} 条记录: {exporter.path}")
+    state['reviewers'] = sorted(reviewers)
 
 
 def generate_review_report(
@@ -416,11 +1588,33 @@ def generate_review_report(
     exclude_patterns: Optional[List[str]] = None,
     base_branch: Optional[str] = None,
     limit: Optional[int] = None,
-    output_file: Optional[str] = None
+    output_file: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    use_api: bool = True,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+    offline: bool = False,
+    template_path: Optional[str] = TEMPLATE_PATH,
+    output_format: Optional[str] = None,
+    dedup: bool = True,
+    collapse_duplicates: bool = False,
+    resume: bool = False,
+    append: bool = False,
+    export_path: Optional[str] = None,
+    analytics: bool = False,
+    analytics_json: Optional[str] = None
 ) -> str:
     """
     Generate Chinese-format Excel review report.
 
+    Rows are streamed to the output as PRs are fetched; with resume an
+    interrupted run of the same report continues from its last checkpoint.
+    With append, an existing workbook gets the rows of the reviews it does not
+    hold yet, searching only PRs updated since its last run. export_path also
+    writes the rows with their raw fields for BI tools (see review_export).
+    analytics adds a 统计 sheet of latency and load statistics (see
+    review_analytics), also written as JSON to analytics_json.
+
     Returns:
         Path to generated Excel file
     """
@@ -433,25 +1627,42 @@ def generate_review_report(
     print(f"   时间范围: {start_date_str} to {end_date_str}")
     print(f"   仓库: {repo}")
     print(f"   Reviewer: {reviewer}")
+    if offline and not cache_path:
+        print("❌ --offline 需要本地缓存, 不能与 --no-cache 同时使用")
+        sys.exit(1)
+    cache = ReviewCache(cache_path) if cache_path else None
+
+    if offline:
+        print("   GitHub API: 离线模式 (仅使用本地缓存)")
+    elif init_github_client(use_api, pool_size=concurrency, http_cache=cache):
+        print(f"   GitHub API: 进程内客户端 ({_github_client.api_url})")
+    else:
+        print("   GitHub API: gh CLI")
+    if cache_path:
+        print(f"   缓存: {cache_path}")
     print()
 
-    search_query = f"merged:{start_date_str}..{end_date_str}"
-    if base_branch:
-        search_query += f" base:{base_branch}"
+    yyyymmdd = datetime.now().strftime("%Y%m%d")
+    output_format = resolve_output_format(output_file, output_format)
+    output_file = output_file or f"{module_name}-代码走查报告-{yyyymmdd}.{output_format}"
+    key = report_key([repo], start_date_str, end_date_str, base_branch, limit, output_format,
+                     module_name, None, dedup, collapse_duplicates)
+    writer, checkpoint, state = open_report(output_file, output_format, template_path, key, resume, append)
+    exporter = open_exporter(export_path)
+    collector = open_analytics(analytics or bool(analytics_json))
+    since = updated_since(state, repo)
 
     print("🔍 获取PR数据...")
-    args = [
-        "pr", "list",
-        "--repo", repo,
-        "--state", "merged",
-        "--search", search_query,
-    ]
-
-    if limit:
-        args.extend(["--limit", str(limit)])
-
-    prs = run_gh_command(args, json_output=True)
+    if offline:
+        prs = cache.list_merged_prs(repo, start_date_str, end_date_str, base_branch, limit)
+        if since:
+            prs = [pr for pr in prs if (pr.get('updatedAt') or '') >= since]
+    else:
+        prs = list_merged_prs(repo, start_date_str, end_date_str, base_branch, limit, concurrency, since)
 
+    if not prs and since:
+        print(f"✅ {since} 之后没有更新的PR, 报告无需更新: {output_file}")
+        return output_file
     if not prs:
         print(f"⚠️ 未找到时间范围 {start_date_str} to {end_date_str} 内的PR")
         print("建议:")
@@ -463,99 +1674,240 @@ def generate_review_report(
     print(f"   找到 {len(prs)} 个PR")
     print()
 
-    print("📝 处理PR并提取有效review...")
-    rows = []
-    serial_number = 0
+    print(f"📥 获取PR详情并提取有效review, 写入{output_format}报告...")
+    write_review_rows(writer, checkpoint, state, {repo: prs}, {repo: module_name}, cache,
+                      offline=offline, page_size=page_size, concurrency=concurrency,
+                      dedup=dedup, collapse_duplicates=collapse_duplicates,
+                      exporter=exporter, analytics=collector)
+    close_cache(cache)
+    print()
 
-    for i, pr in enumerate(prs, 1):
-        print(f"   [{i}/{len(prs)}] PR #{pr['number']}: {pr['title'][:40]}...")
+    if collector and writer.row_count:
+        write_analytics(writer, collector, analytics_json, {writer.default_sheet.lower()},
+                        {'repos': [repo], 'range': [start_date_str, end_date_str]})
+    # Record what the workbook holds, so it can be appended to later (checkpoint is None when appending)
+    if output_format == "xlsx" and (writer.row_count or checkpoint is None):
+        writer.append_table(APPEND_STATE_SHEET, append_state_rows(state), hidden=True)
+    written = writer.close()
+    if checkpoint:
+        checkpoint.remove()
+    if not written:
+        print(f"⚠️ 没有找到有效review记录")
+        sys.exit(0)
 
-        pr_detail = run_gh_command(
-            ["pr", "view", str(pr['number']), "--repo", repo],
-            json_output=True
-        )
+    print()
+    print("✅ 报告生成成功!")
+    print(f"   文件: {output_file}")
+    print(f"   模块名: {module_name}")
+    print(f"   时间范围: {start_date_str} to {end_date_str}")
+    if checkpoint is None:
+        print(f"   新增记录数: {writer.row_count}")
+        print(f"   Review记录数: {sum(state['row_counts'].values())}")
+    else:
+        print(f"   Review记录数: {writer.row_count}")
+    print(f"   Reviewer总数: {len(state['reviewers'])}")
 
-        # Extract valid reviews (filters out automated approvals and invalid AI reviewers)
-        valid_reviews = extract_review_suggestions(pr_detail)
+    return output_file
 
-        if not valid_reviews:
-            print(f"      ⚠️ 无有效review")
-            continue
 
-        # Create one row per valid reviewer
-        for review in valid_reviews:
-            serial_number += 1
+def report_key(
+    repos: List[str],
+    start_date: str,
+    end_date: str,
+    base_branch: Optional[str],
+    limit: Optional[int],
+    output_format: str,
+    report_name: str,
+    sheet_layout: Optional[str],
+    dedup: bool,
+    collapse_duplicates: bool
+) -> Dict:
+    """What identifies a report for resuming: a checkpoint of any other report is ignored."""
+    return {
+        'repos': repos,
+        'range': [start_date, end_date],
+        'base': base_branch,
+        'limit': limit,
+        'format': output_format,
+        'name': report_name,
+        'sheet_layout': sheet_layout,
+        'dedup': dedup,
+        'collapse_duplicates': collapse_duplicates,
+        'ai_model': _summarizer.model if _summarizer else None,
+    }
 
-            problem_type = review['problem_type']
-            severity = get_severity_from_problem_type(problem_type)
-            reviewer = review['reviewer']
 
-            # Determine summarization method and impact analysis
-            is_ai_reviewer = reviewer.lower() in VALID_AI_REVIEWERS
+def close_cache(cache: Optional[ReviewCache]):
+    """Report conditional request savings and close the cache after fetching."""
+    if _github_client and _github_client.not_modified_count:
+        print(f"   {_github_client.not_modified_count} 个REST请求未修改 (304), 已使用缓存")
+    if cache:
+        if _github_client:
+            _github_client.http_cache = None
+        cache.close()
 
-            if is_ai_reviewer:
-                # AI review: summarize to 50 chars
-                chinese_summary = summarize_for_ai(review['content'], max_length=50)
-                impact_analysis = generate_ai_impact_analysis(chinese_summary)
-            else:
-                # Person review: copy original text
-                chinese_summary = summarize_for_person(review['content'])
-                impact_analysis = chinese_summary
-
-            created_at = pr.get('createdAt', '')
-            merged_at = pr.get('mergedAt', '')
-            review_time = review['review_time']
-
-            author = pr.get('author', {}).get('login', '')
-            merged_by = pr.get('mergedBy', {}).get('login', '')
-
-            # Format dates to YYYY-MM-DD only (no time)
-            created_date_only = format_date_only(created_at)
-            merged_date_only = format_date_only(merged_at)
-            review_date_only = format_date_only(review_time)
-
-            problem_status = "关闭" if merged_at else "解决中"
-
-            rows.append({
-                '序号': serial_number,
-                '包名': module_name,
-                '仓库地址': f"https://github.com/{repo}",
-                '代码提交地址': pr.get('url', ''),
-                '问题来源': PROBLEM_SOURCES.get(3, '注释'),  # Reviews come from comments
-                '问题描述': chinese_summary,
-                '严重程度': severity,
-                '影响分析': impact_analysis,
-                '问题类型': PROBLEM_TYPES.get(problem_type, '其他'),
-                '提出人': reviewer,
-                '提出时间': review_date_only,
-                '解决人': merged_by,
-                '计划解决时间': merged_date_only,
-                '实际解决时间': merged_date_only,
-                '提出人确认是否验收通过': "是",
-                '问题状态': problem_status,
-            })
 
-    print()
+def unique_sheet_name(name: str, used: set) -> str:
+    """Excel-safe sheet name (no []:*?/\\, at most 31 chars) not in used."""
+    base = name.translate(INVALID_SHEET_CHARS)[:MAX_SHEET_NAME_LENGTH] or "Sheet"
+    candidate, index = base, 2
+    while candidate.lower() in used:
+        suffix = f"_{index}"
+        candidate = base[:MAX_SHEET_NAME_LENGTH - len(suffix)] + suffix
+        index += 1
+    used.add(candidate.lower())
+    return candidate
 
-    if not rows:
-        print(f"⚠️ 没有找到有效review记录")
-        sys.exit(0)
 
-    df = pd.DataFrame(rows)
+def generate_multi_repo_report(
+    repos: List[str],
+    time_expr: str,
+    report_name: str,
+    sheet_layout: str = "per-module",
+    base_branch: Optional[str] = None,
+    limit: Optional[int] = None,
+    output_file: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    use_api: bool = True,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+    offline: bool = False,
+    template_path: Optional[str] = TEMPLATE_PATH,
+    output_format: Optional[str] = None,
+    dedup: bool = True,
+    collapse_duplicates: bool = False,
+    resume: bool = False,
+    append: bool = False,
+    export_path: Optional[str] = None,
+    analytics: bool = False,
+    analytics_json: Optional[str] = None
+) -> str:
+    """
+    Generate one workbook covering several repositories.
+
+    Searches and detail pages of all repos share one rate-limited worker pool. The
+    module name of each repo is its name without the owner. sheet_layout "per-module"
+    writes one sheet per repo, "combined" one sheet with continuous 序号; both add a
+    汇总 sheet with per-repo PR count, row count and fetch time. Rows are streamed,
+    resumable, appendable, exportable and analyzed as in generate_review_report.
+
+    Returns:
+        Path to generated Excel file
+    """
+    start_date, end_date = parse_time_range(time_expr)
+    start_date_str = start_date.strftime("%Y-%m-%d")
+    end_date_str = end_date.strftime("%Y-%m-%d")
+
+    print(f"📊 生成多仓库代码走查报告")
+    print(f"   报告名: {report_name}")
+    print(f"   时间范围: {start_date_str} to {end_date_str}")
+    print(f"   仓库数: {len(repos)}")
+    print(f"   Sheet布局: {sheet_layout}")
+    if offline and not cache_path:
+        print("❌ --offline 需要本地缓存, 不能与 --no-cache 同时使用")
+        sys.exit(1)
+    cache = ReviewCache(cache_path) if cache_path else None
+
+    if offline:
+        print("   GitHub API: 离线模式 (仅使用本地缓存)")
+    elif init_github_client(use_api, pool_size=concurrency, http_cache=cache):
+        print(f"   GitHub API: 进程内客户端 ({_github_client.api_url})")
+    else:
+        print("   GitHub API: gh CLI")
+    if cache_path:
+        print(f"   缓存: {cache_path}")
+    print()
 
     yyyymmdd = datetime.now().strftime("%Y%m%d")
-    output_file = output_file or f"{module_name}-代码走查报告-{yyyymmdd}.xlsx"
+    output_format = resolve_output_format(output_file, output_format)
+    output_file = output_file or f"{report_name}-代码走查报告-{yyyymmdd}.{output_format}"
+    key = report_key(repos, start_date_str, end_date_str, base_branch, limit, output_format,
+                     report_name, sheet_layout, dedup, collapse_duplicates)
+    writer, checkpoint, state = open_report(output_file, output_format, template_path, key, resume, append)
+    exporter = open_exporter(export_path)
+    collector = open_analytics(analytics or bool(analytics_json))
+    timings: Dict[str, float] = state['timings']
+    prs_by_repo: Dict[str, List[Dict]] = {}
 
-    print("💾 生成Excel报告...")
-    df.to_excel(output_file, index=False, engine='openpyxl')
+    print("🔍 获取PR数据...")
+    if offline:
+        for repo in repos:
+            prs = cache.list_merged_prs(repo, start_date_str, end_date_str, base_branch, limit)
+            since = updated_since(state, repo)
+            prs_by_repo[repo] = [pr for pr in prs if (pr.get('updatedAt') or '') >= since] if since else prs
+    else:
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        def search(repo: str) -> tuple:
+            started = time.monotonic()
+            # Repos are already searched in parallel, so slices of one repo run one at a time
+            prs = list_merged_prs(repo, start_date_str, end_date_str, base_branch, limit, concurrency=1,
+                                  updated_since=updated_since(state, repo))
+            return prs, time.monotonic() - started
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            futures = {executor.submit(search, repo): repo for repo in repos}
+            for future in as_completed(futures):
+                repo = futures[future]
+                prs_by_repo[repo], elapsed = future.result()
+                timings[repo] = timings.get(repo, 0.0) + elapsed
+                print(f"   {repo}: {len(prs_by_repo[repo])} 个PR")
+    total_prs = sum(len(prs) for prs in prs_by_repo.values())
+    print(f"   共找到 {total_prs} 个PR")
+    print()
+
+    print(f"📥 获取PR详情并提取有效review, 写入{output_format}报告...")
+    # Repos in the order given, each with its own module name
+    prs_by_repo = {repo: prs_by_repo[repo] for repo in repos}
+    write_review_rows(writer, checkpoint, state, prs_by_repo, {repo: repo.split('/', 1)[1] for repo in repos},
+                      cache, sheet_layout=sheet_layout, offline=offline, page_size=page_size,
+                      concurrency=concurrency, verbose=False, dedup=dedup,
+                      collapse_duplicates=collapse_duplicates, exporter=exporter, analytics=collector)
+    close_cache(cache)
+    print()
+
+    # checkpoint is None when appending: the workbook is updated even without new rows
+    if not writer.row_count and checkpoint:
+        writer.close()
+        checkpoint.remove()
+        print(f"⚠️ 没有找到有效review记录")
+        sys.exit(0)
+
+    covered_prs = report_prs(state)
+    summary = [{
+        '仓库': repo,
+        '模块名': repo.split('/', 1)[1],
+        'PR数': len(covered_prs.get(repo, ())),
+        '记录数': state['row_counts'].get(repo, 0),
+        '耗时(秒)': round(timings.get(repo, 0.0), 2),
+    } for repo in repos]
+    used_names = {title.lower() for title in state['sheets'].values()}
+    writer.append_table(unique_sheet_name(SUMMARY_SHEET, used_names), summary)
+    if collector:
+        write_analytics(writer, collector, analytics_json, used_names,
+                        {'repos': repos, 'range': [start_date_str, end_date_str]})
+    if output_format == "xlsx":
+        writer.append_table(APPEND_STATE_SHEET, append_state_rows(state), hidden=True)
+    writer.close()
+    if checkpoint:
+        checkpoint.remove()
+    print()
+    print("📋 仓库汇总:")
+    width = max(len(repo) for repo in repos)
+    for item in sorted(summary, key=lambda item: item['耗时(秒)'], reverse=True):
+        print(f"   {item['仓库']:<{width}}  PR {item['PR数']:>5}  记录 {item['记录数']:>5}  "
+              f"{item['耗时(秒)']:>7.2f}s")
 
     print()
     print("✅ 报告生成成功!")
     print(f"   文件: {output_file}")
-    print(f"   模块名: {module_name}")
     print(f"   时间范围: {start_date_str} to {end_date_str}")
-    print(f"   Review记录数: {len(rows)}")
-    print(f"   Reviewer总数: {len(set(row['提出人'] for row in rows))}")
+    print(f"   仓库数: {len(repos)}")
+    if checkpoint is None:
+        print(f"   新增记录数: {writer.row_count}")
+        print(f"   Review记录数: {sum(state['row_counts'].values())}")
+    else:
+        print(f"   Review记录数: {writer.row_count}")
 
     return output_file
 
@@ -574,13 +1926,41 @@ def main():
 
   # 指定reviewer过滤
   python generator.py --repo linuxdeepin/dde-cooperation --since "last 15 days" --module-name dde-cooperation --reviewer liuzheng --include "sourcery-*" --exclude "*-bot"
+
+  # 多仓库报告 (每个模块一个sheet)
+  python generator.py --repo linuxdeepin/dde-cooperation,linuxdeepin/dde-file-manager --since "last month"
+
+  # 组织内所有 dde-* 仓库, 合并到一个sheet
+  python generator.py --org linuxdeepin --repo-filter "dde-*" --since "last month" --sheet-layout combined
         """
     )
 
     parser.add_argument(
         '--repo',
-        required=True,
-        help='GitHub仓库 (例如: linuxdeepin/dde-cooperation)'
+        action='append',
+        help='GitHub仓库 (例如: linuxdeepin/dde-cooperation), 可多次使用或用逗号分隔'
+    )
+
+    parser.add_argument(
+        '--repos-file',
+        help='仓库列表文件, 每行一个 owner/name (# 开头为注释)'
+    )
+
+    parser.add_argument(
+        '--org',
+        help='GitHub组织, 包含该组织下所有未归档仓库'
+    )
+
+    parser.add_argument(
+        '--repo-filter',
+        help='与 --org 一起使用的仓库名过滤 (fnmatch风格, 例如: "dde-*")'
+    )
+
+    parser.add_argument(
+        '--sheet-layout',
+        choices=['per-module', 'combined'],
+        default='per-module',
+        help='多仓库报告布局: 每个模块一个sheet, 或合并到一个sheet (默认: per-module)'
     )
 
     parser.add_argument(
@@ -591,26 +1971,24 @@ def main():
 
     parser.add_argument(
         '--module-name',
-        required=True,
-        help='模块名(项目名),用于生成文件名和包名列'
+        help='模块名(项目名),用于生成文件名和包名列 (单仓库时必需; 多仓库时作为报告名)'
     )
 
     parser.add_argument(
         '--reviewer',
-        default='liuzheng',
-        help='Reviewer用户名 (默认: liuzheng)'
+        help='Reviewer用户名 (默认: liuzheng, 仅单仓库)'
     )
 
     parser.add_argument(
         '--include',
         action='append',
-        help='包含reviewer模式 (fnmatch风格, 可多次使用)'
+        help='包含reviewer模式 (fnmatch风格, 可多次使用, 仅单仓库)'
     )
 
     parser.add_argument(
         '--exclude',
         action='append',
-        help='排除reviewer模式 (fnmatch风格, 可多次使用)'
+        help='排除reviewer模式 (fnmatch风格, 可多次使用, 仅单仓库)'
     )
 
     parser.add_argument(
@@ -626,21 +2004,222 @@ def main():
 
     parser.add_argument(
         '--output',
-        help='输出Excel文件名'
+        help='输出文件名 (.xlsx, .csv 或 .jsonl)'
+    )
+
+    parser.add_argument(
+        '--format',
+        choices=OUTPUT_FORMATS,
+        help='输出格式 (默认: 按 --output 扩展名, 否则 xlsx)'
+    )
+
+    parser.add_argument(
+        '--template',
+        default=TEMPLATE_PATH,
+        help='Excel报告模板, 沿用其表头、列宽、样式和数据验证 (默认: resources/模块名-代码走查报告-template.xlsx)'
+    )
+
+    parser.add_argument(
+        '--ai-summary',
+        action='store_true',
+        help='用OpenAI兼容接口批量生成AI review的问题描述和影响分析 (结果按内容哈希缓存)'
+    )
+
+    parser.add_argument(
+        '--ai-base-url',
+        help='OpenAI兼容接口地址 (默认: $OPENAI_BASE_URL 或 https://api.openai.com/v1), 密钥取自 $OPENAI_API_KEY'
+    )
+
+    parser.add_argument(
+        '--ai-model',
+        help='AI总结使用的模型 (默认: $OPENAI_MODEL 或 gpt-4o-mini)'
+    )
+
+    parser.add_argument(
+        '--ai-batch-size',
+        type=int,
+        default=DEFAULT_AI_BATCH_SIZE,
+        help=f'每个AI请求包含的review条数 (默认: {DEFAULT_AI_BATCH_SIZE})'
+    )
+
+    parser.add_argument(
+        '--ai-concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'同时进行的AI请求数 (默认: {DEFAULT_CONCURRENCY})'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='从上次中断的进度继续生成同一报告 (进度定期保存在 <输出文件>.progress.json)'
+    )
+
+    parser.add_argument(
+        '--append',
+        action='store_true',
+        help='追加到 --output 指定的已有xlsx报告: 只获取上次生成之后更新的PR, 跳过报告中已有的review, 序号接续 (报告不存在时正常生成)'
+    )
+
+    parser.add_argument(
+        '--export',
+        help='同时导出review数据 (报告列 + 仓库/PR/时间戳/分类规则等原始字段) 供BI导入: '
+             '.parquet 或 .arrow (需要pyarrow), .jsonl, .csv'
+    )
+
+    parser.add_argument(
+        '--analytics',
+        action='store_true',
+        help='增加"统计" sheet: 按仓库/Reviewer/问题类型统计首次review、合并和review延迟的P50/P90/P95及工作量 (需要numpy)'
+    )
+
+    parser.add_argument(
+        '--analytics-json',
+        help='同时把统计结果写入该JSON文件 (隐含 --analytics)'
+    )
+
+    parser.add_argument(
+        '--no-dedup',
+        action='store_true',
+        help='不合并重复/近似重复的review, 每条review单独分类和AI总结'
+    )
+
+    parser.add_argument(
+        '--collapse-duplicates',
+        action='store_true',
+        help='同一仓库内重复的review只输出一行, 并在问题描述中注明涉及的PR数'
+    )
+
+    parser.add_argument(
+        '--rules',
+        default=DEFAULT_RULES_PATH,
+        help='review分类规则文件: 问题类型/无效review/影响分析关键词及优先级 (默认: review_rules.json)'
+    )
+
+    parser.add_argument(
+        '--page-size',
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f'每个GraphQL请求获取的PR数量 (默认: {DEFAULT_PAGE_SIZE})'
+    )
+
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'并发的PR详情请求数 (默认: {DEFAULT_CONCURRENCY})'
+    )
+
+    parser.add_argument(
+        '--no-api',
+        action='store_true',
+        help='不使用进程内GitHub API客户端, 所有请求通过gh命令执行'
+    )
+
+    parser.add_argument(
+        '--cache',
+        default=DEFAULT_CACHE_PATH,
+        help=f'PR详情本地缓存文件 (默认: {DEFAULT_CACHE_PATH})'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='不读写本地缓存, 每次重新获取所有PR详情'
+    )
+
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='离线模式: 仅使用本地缓存生成报告, 不访问GitHub'
     )
 
     args = parser.parse_args()
 
-    generate_review_report(
-        repo=args.repo,
-        time_expr=args.since,
-        module_name=args.module_name,
-        reviewer=args.reviewer,
-        include_patterns=args.include,
-        exclude_patterns=args.exclude,
+    if not (args.repo or args.repos_file or args.org):
+        parser.error('需要 --repo, --repos-file 或 --org')
+    if args.repo_filter and not args.org:
+        parser.error('--repo-filter 需要与 --org 一起使用')
+    single_repo = bool(args.repo) and len(args.repo) == 1 and ',' not in args.repo[0] and not (args.repos_file or args.org)
+    # The multi-repo report has no per-reviewer filtering to pass these to
+    if not single_repo and (args.reviewer or args.include or args.exclude):
+        parser.error('--reviewer, --include 和 --exclude 仅支持单仓库报告')
+    if args.collapse_duplicates and args.no_dedup:
+        parser.error('--collapse-duplicates 不能与 --no-dedup 一起使用')
+    if args.export:
+        if not resolve_export_format(args.export):
+            parser.error('--export 文件扩展名需为 .parquet, .arrow, .jsonl 或 .csv')
+        if args.resume:
+            parser.error('--export 不能与 --resume 一起使用')
+        if args.output and os.path.abspath(args.export) == os.path.abspath(args.output):
+            parser.error('--export 不能与 --output 是同一个文件')
+    if (args.analytics or args.analytics_json) and (args.resume or args.append):
+        parser.error('--analytics 统计整个报告, 不能与 --resume 或 --append 一起使用')
+    if args.append:
+        if not args.output:
+            parser.error('--append 需要用 --output 指定要追加的报告')
+        if resolve_output_format(args.output, args.format) != 'xlsx':
+            parser.error('--append 仅支持xlsx报告')
+        if args.resume or args.collapse_duplicates:
+            parser.error('--append 不能与 --resume 或 --collapse-duplicates 一起使用')
+
+    load_review_rules(args.rules)
+    init_summarizer(args.ai_summary, args.ai_base_url, args.ai_model, args.ai_batch_size, args.ai_concurrency)
+
+    common = dict(
         base_branch=args.base,
         limit=args.limit,
-        output_file=args.output
+        output_file=args.output,
+        page_size=args.page_size,
+        use_api=not args.no_api,
+        concurrency=args.concurrency,
+        cache_path=None if args.no_cache else args.cache,
+        offline=args.offline,
+        template_path=args.template,
+        output_format=args.format,
+        dedup=not args.no_dedup,
+        collapse_duplicates=args.collapse_duplicates,
+        resume=args.resume,
+        append=args.append,
+        export_path=args.export,
+        analytics=args.analytics,
+        analytics_json=args.analytics_json
+    )
+
+    if single_repo:
+        if not args.module_name:
+            parser.error('单仓库报告需要 --module-name')
+        generate_review_report(
+            repo=args.repo[0],
+            time_expr=args.since,
+            module_name=args.module_name,
+            reviewer=args.reviewer or 'liuzheng',
+            include_patterns=args.include,
+            exclude_patterns=args.exclude,
+            **common
+        )
+        return
+
+    offline_cache = None
+    if args.org:
+        if args.offline and not args.no_cache:
+            offline_cache = ReviewCache(args.cache)
+        elif not args.offline:
+            # Listing org repos goes through the same client as the report
+            init_github_client(not args.no_api, pool_size=args.concurrency)
+    repos = resolve_repos(args.repo, args.repos_file, args.org, args.repo_filter, offline_cache)
+    if offline_cache:
+        offline_cache.close()
+    if not repos:
+        print("❌ 没有匹配的仓库")
+        sys.exit(1)
+
+    generate_multi_repo_report(
+        repos=repos,
+        time_expr=args.since,
+        report_name=args.module_name or args.org or "多仓库",
+        sheet_layout=args.sheet_layout,
+        **common
     )
 
 
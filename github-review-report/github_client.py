@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+In-process GitHub API client for the review report generator.
+
+Reuses the `gh` CLI's auth token and keeps one pooled keep-alive session for
+REST and GraphQL requests, so each call costs a round trip instead of a
+`gh` process start plus a fresh TLS handshake. With an HTTP cache attached,
+REST GETs are sent with If-None-Match/If-Modified-Since and 304 responses
+are answered from the cache.
+
+requests is imported when the first client is created, so importing this
+module stays cheap and a missing requests surfaces as ImportError there.
+"""
+
+import json
+import os
+import re
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+from rate_limiter import TRANSIENT_STATUS_CODES, RateLimiter
+
+
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30
+
+# Link: <https://api.github.com/...&page=2>; rel="next"
+LINK_NEXT_PATTERN = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+
+class GitHubAPIError(Exception):
+    """Raised when the GitHub API returns an error response."""
+
+    def __init__(self, message: str, status_code: int = 0):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def get_gh_token(hostname: Optional[str] = None) -> Optional[str]:
+    """Return the token `gh` would use: GH_TOKEN/GITHUB_TOKEN, else `gh auth token`."""
+    for env_name in ("GH_TOKEN", "GITHUB_TOKEN"):
+        if os.environ.get(env_name):
+            return os.environ[env_name]
+
+    cmd = ["gh", "auth", "token"]
+    if hostname:
+        cmd.extend(["--hostname", hostname])
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class GitHubClient:
+    """Pooled REST/GraphQL client returning decoded JSON."""
+
+    def __init__(self, token: str, api_url: str = DEFAULT_API_URL,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: int = DEFAULT_TIMEOUT,
+                 rate_limiter: Optional[RateLimiter] = None, http_cache=None):
+        self.api_url = api_url.rstrip('/')
+        # GitHub Enterprise serves REST at /api/v3 and GraphQL at /api/graphql
+        if self.api_url.endswith('/v3'):
+            self.graphql_url = self.api_url[:-len('/v3')] + '/graphql'
+        else:
+            self.graphql_url = self.api_url + '/graphql'
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # Any object with get_response/store_response (review_cache.ReviewCache)
+        self.http_cache = http_cache
+        self.not_modified_count = 0
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f"bearer {token}",
+            'Accept': 'application/vnd.github+json',
+            'X-GitHub-Api-Version': '2022-11-28',
+            'User-Agent': 'deepin-github-review-report',
+        })
+
+    @classmethod
+    def from_environment(cls, pool_size: int = DEFAULT_POOL_SIZE,
+                         rate_limiter: Optional[RateLimiter] = None,
+                         http_cache=None) -> Optional['GitHubClient']:
+        """Build a client from the gh auth token; None if no token is available."""
+        api_url = os.environ.get("GITHUB_API_URL", DEFAULT_API_URL)
+        hostname = os.environ.get("GH_HOST")
+        token = get_gh_token(hostname)
+        if not token:
+            return None
+        return cls(token, api_url=api_url, pool_size=pool_size, rate_limiter=rate_limiter,
+                   http_cache=http_cache)
+
+    def _resource_for(self, url: str) -> str:
+        if url == self.graphql_url:
+            return 'graphql'
+        return 'search' if '/search/' in url else 'core'
+
+    def _request(self, method: str, url: str, **kwargs) -> 'requests.Response':
+        import requests
+
+        limiter = self.rate_limiter
+        resource = self._resource_for(url)
+        for attempt in range(limiter.max_retries + 1):
+            limiter.wait(resource)
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                if attempt == limiter.max_retries:
+                    raise GitHubAPIError(f"Request failed: {e}") from e
+                delay = limiter.transient_delay(attempt)
+                print(f"⚠️ 请求失败 ({resource}), {delay:.0f}s 后重试 [{attempt + 1}/{limiter.max_retries}]: {e}")
+                time.sleep(delay)
+                continue
+            limiter.update_from_headers(response.headers, resource)
+
+            # Primary limits answer 403/429 with remaining 0, secondary limits with Retry-After or a message
+            is_rate_limited = response.status_code in (403, 429) and (
+                response.headers.get('X-RateLimit-Remaining') == '0'
+                or 'Retry-After' in response.headers
+                or RateLimiter.is_rate_limit_message(response.text))
+            is_transient = response.status_code in TRANSIENT_STATUS_CODES
+            if not (is_rate_limited or is_transient) or attempt == limiter.max_retries:
+                break
+            if is_transient:
+                # Only this request failed: back off in this worker, the others carry on
+                delay = limiter.transient_delay(attempt, retry_after=response.headers.get('Retry-After'))
+                print(f"⚠️ GitHub服务端错误 {response.status_code} ({resource}), {delay:.0f}s 后重试 "
+                      f"[{attempt + 1}/{limiter.max_retries}]")
+                time.sleep(delay)
+                continue
+            delay = limiter.backoff_delay(
+                attempt,
+                retry_after=response.headers.get('Retry-After'),
+                reset=response.headers.get('X-RateLimit-Reset'),
+                remaining=response.headers.get('X-RateLimit-Remaining'))
+            print(f"⏳ 触发GitHub速率限制 ({resource}), {delay:.0f}s 后重试 "
+                  f"[{attempt + 1}/{limiter.max_retries}]")
+            limiter.pause(delay)
+
+        if response.status_code >= 400:
+            raise GitHubAPIError(
+                f"{method} {url} failed: {response.status_code} - {response.text[:500]}",
+                status_code=response.status_code)
+        return response
+
+    def graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """Run a GraphQL query and return the full response body (data and errors)."""
+        response = self._request('POST', self.graphql_url,
+                                 json={'query': query, 'variables': variables or {}})
+        return response.json()
+
+    def _get(self, url: str, params: Optional[Dict] = None) -> tuple:
+        """GET url, conditionally when a cached copy exists; returns (body, Link header)."""
+        if self.http_cache is None:
+            response = self._request('GET', url, params=params)
+            return response.json(), response.headers.get('Link', '')
+
+        import requests
+
+        # Key the cache on the full URL, query string included
+        url = requests.Request('GET', url, params=params).prepare().url
+        cached = self.http_cache.get_response(url)
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self._request('GET', url, headers=headers)
+        if response.status_code == 304:
+            # Not modified: served from the cache and not counted against the quota
+            self.not_modified_count += 1
+            return json.loads(cached['body']), cached['link']
+
+        link = response.headers.get('Link', '')
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self.http_cache.store_response(url, etag, last_modified, link, response.text)
+        return response.json(), link
+
+    def rest_get(self, path: str, params: Optional[Dict] = None) -> Dict | List:
+        url = path if path.startswith('http') else f"{self.api_url}/{path.lstrip('/')}"
+        return self._get(url, params)[0]
+
+    def rest_paginate(self, path: str, params: Optional[Dict] = None,
+                      max_items: Optional[int] = None, items_key: Optional[str] = None) -> List:
+        """Follow Link rel="next" pages; items_key selects the list in object responses (e.g. search)."""
+        url = path if path.startswith('http') else f"{self.api_url}/{path.lstrip('/')}"
+        params = dict(params or {})
+        params.setdefault('per_page', 100)
+
+        items: List = []
+        while url:
+            body, link = self._get(url, params)
+            items.extend(body[items_key] if items_key else body)
+            if max_items is not None and len(items) >= max_items:
+                return items[:max_items]
+            match = LINK_NEXT_PATTERN.search(link)
+            url = match.group(1) if match else None
+            # The next link already carries the query string
+            params = None
+        return items
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+GitHub rate-limit scheduler for the review report generator.
+
+Tracks the remaining quota and reset time per rate-limit resource (core,
+search, graphql) from `X-RateLimit-*` response headers or the GraphQL
+`rateLimit` object, paces requests once quota runs low, and computes how long
+to back off after primary or secondary rate-limit responses so a long run
+waits and resumes instead of exiting. Transient failures (5xx responses,
+dropped connections) are retried with a shorter exponential backoff.
+"""
+
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Mapping, Optional
+
+
+# Requests kept in hand per resource, never spent by pacing
+DEFAULT_RESERVE = 5
+# Start spreading requests over the reset window below this fraction of the limit
+PACE_THRESHOLD = 0.1
+DEFAULT_MAX_RETRIES = 6
+
+# GitHub asks to wait at least a minute after a secondary limit, then back off exponentially
+SECONDARY_BACKOFF = 60
+MAX_BACKOFF = 15 * 60
+# First wait after a transient server or network error, doubled per retry
+TRANSIENT_BACKOFF = 2
+TRANSIENT_STATUS_CODES = (500, 502, 503, 504)
+
+RATE_LIMIT_MESSAGE_PATTERN = re.compile(r'rate limit|abuse detection', re.IGNORECASE)
+# gh reports server errors as "HTTP 502: ..." and network failures in Go's wording
+TRANSIENT_MESSAGE_PATTERN = re.compile(
+    r'\bHTTP 5\d\d\b|timeout|timed out|connection reset|connection refused|unexpected EOF', re.IGNORECASE)
+
+
+class RateLimiter:
+    """Thread-safe quota tracker shared by all workers of a run."""
+
+    def __init__(self, reserve: int = DEFAULT_RESERVE, max_retries: int = DEFAULT_MAX_RETRIES,
+                 transient_backoff: float = TRANSIENT_BACKOFF):
+        self.reserve = reserve
+        self.max_retries = max_retries
+        self.transient_backoff = transient_backoff
+        # resource -> {'limit', 'remaining', 'reset'} (reset as epoch seconds)
+        self.quota: Dict[str, Dict[str, float]] = {}
+        self.next_slot: Dict[str, float] = {}
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _set_quota(self, resource: str, limit: float, remaining: float, reset: float):
+        with self.lock:
+            self.quota[resource] = {'limit': limit, 'remaining': remaining, 'reset': reset}
+
+    def update_from_headers(self, headers: Mapping[str, str], default_resource: str = 'core'):
+        """Record quota from X-RateLimit-* response headers."""
+        if 'X-RateLimit-Remaining' not in headers:
+            return
+        self._set_quota(
+            headers.get('X-RateLimit-Resource', default_resource),
+            float(headers.get('X-RateLimit-Limit', 0)),
+            float(headers['X-RateLimit-Remaining']),
+            float(headers.get('X-RateLimit-Reset', 0)),
+        )
+
+    def update_from_graphql(self, rate_limit: Optional[Dict]):
+        """Record quota from a GraphQL `rateLimit { limit remaining resetAt }` object."""
+        if not rate_limit or rate_limit.get('remaining') is None:
+            return
+        reset = datetime.fromisoformat(rate_limit['resetAt'].replace('Z', '+00:00')).timestamp()
+        self._set_quota('graphql', float(rate_limit.get('limit') or 0),
+                        float(rate_limit['remaining']), reset)
+
+    def wait(self, resource: str = 'core'):
+        """Block until a request against resource fits the known quota."""
+        with self.lock:
+            now = time.time()
+            start = max(now, self.paused_until, self.next_slot.get(resource, 0.0))
+            quota = self.quota.get(resource)
+            if quota and quota['reset'] > start:
+                window = quota['reset'] - start
+                spendable = quota['remaining'] - self.reserve
+                if spendable <= 0:
+                    # Exhausted: wait for the window to reset (plus a second of clock skew)
+                    start = quota['reset'] + 1
+                elif quota['remaining'] < quota['limit'] * PACE_THRESHOLD:
+                    # Running low: spread what is left evenly over the window
+                    self.next_slot[resource] = start + window / spendable
+                # Count the request now so concurrent workers see the reduced quota
+                quota['remaining'] -= 1
+            delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Hold every worker for seconds (secondary limits apply to the whole token)."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.time() + seconds)
+
+    def backoff_delay(
+        self,
+        attempt: int,
+        retry_after: Optional[str] = None,
+        reset: Optional[str] = None,
+        remaining: Optional[str] = None
+    ) -> float:
+        """Seconds to wait before retry number attempt (0-based) after a rate-limit response."""
+        if retry_after:
+            return float(retry_after)
+        if remaining == '0' and reset:
+            return max(0.0, float(reset) - time.time()) + 1
+        return min(SECONDARY_BACKOFF * 2 ** attempt, MAX_BACKOFF)
+
+    def transient_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry number attempt (0-based) after a 5xx response or network error."""
+        if retry_after:
+            return float(retry_after)
+        return min(self.transient_backoff * 2 ** attempt, MAX_BACKOFF)
+
+    @staticmethod
+    def is_rate_limit_message(message: str) -> bool:
+        return bool(RATE_LIMIT_MESSAGE_PATTERN.search(message or ''))
+
+    @staticmethod
+    def is_transient_message(message: str) -> bool:
+        return bool(TRANSIENT_MESSAGE_PATTERN.search(message or ''))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Bounded-queue stage pipeline and resume checkpoints for the review report generator.
+
+A report is built by a chain of stages (fetch → classify → summarize → write).
+Each stage is a generator function over the items of the stage before it;
+run_pipeline runs every stage in its own thread, connected by bounded queues,
+so a slow stage holds back the ones before it instead of letting their results
+pile up in memory. An exception in any stage stops the pipeline and is raised
+to the consumer.
+
+ReportCheckpoint saves, next to the output file, which PRs are fully written
+together with the writer's position, so an interrupted run can continue where
+the last checkpoint left off.
+"""
+
+import json
+import os
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+# Items waiting between two stages
+DEFAULT_QUEUE_SIZE = 8
+# Seconds a blocked stage waits before checking whether the pipeline was stopped
+POLL_INTERVAL = 0.1
+
+# Fully written PRs between two checkpoints
+DEFAULT_CHECKPOINT_INTERVAL = 50
+CHECKPOINT_SUFFIX = ".progress.json"
+
+_DONE = object()
+
+
+class _Failure:
+    """An exception raised in a stage, passed downstream in place of the next item."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def run_pipeline(
+    source: Iterable,
+    stages: List[Callable[[Iterator], Iterator]],
+    queue_size: int = DEFAULT_QUEUE_SIZE
+) -> Iterator:
+    """
+    Iterate the items of the last stage, each stage consuming the items of the one before it.
+
+    source and every stage run in their own daemon thread, with at most
+    queue_size items waiting between two of them. Closing the returned
+    generator (or an exception in the consumer) stops every thread.
+    """
+    stop = threading.Event()
+    inbox = _start(lambda: source, stop, queue_size)
+    for stage in stages:
+        inbox = _start(lambda stage=stage, inbox=inbox: stage(_drain(inbox, stop)), stop, queue_size)
+    try:
+        yield from _drain(inbox, stop)
+    finally:
+        stop.set()
+
+
+def _start(make_items: Callable[[], Iterable], stop: threading.Event, queue_size: int) -> queue.Queue:
+    outbox = queue.Queue(queue_size)
+    threading.Thread(target=_feed, args=(make_items, outbox, stop), daemon=True).start()
+    return outbox
+
+
+def _feed(make_items: Callable[[], Iterable], outbox: queue.Queue, stop: threading.Event):
+    iterator = None
+    try:
+        iterator = iter(make_items())
+        for item in iterator:
+            if not _put(outbox, item, stop):
+                break
+        else:
+            _put(outbox, _DONE, stop)
+    except BaseException as e:
+        _put(outbox, _Failure(e), stop)
+    finally:
+        # A stopped stage still runs its cleanup (e.g. shutting down its worker pool)
+        close = getattr(iterator, 'close', None)
+        if close:
+            close()
+
+
+def _put(outbox: queue.Queue, item, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            outbox.put(item, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _drain(inbox: queue.Queue, stop: threading.Event) -> Iterator:
+    while True:
+        try:
+            item = inbox.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if stop.is_set():
+                return
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, _Failure):
+            raise item.error
+        yield item
+
+
+class ReportCheckpoint:
+    """
+    Progress of one report, saved as JSON next to its output file.
+
+    key identifies the report (repos, time range, options): a checkpoint saved
+    for a different key is never resumed. state is whatever the caller needs
+    to continue, such as the written PRs and the writer's position.
+    """
+
+    def __init__(self, output_file: str, key: Dict, interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        self.path = output_file + CHECKPOINT_SUFFIX
+        # Round-trip through JSON so the key compares equal to a loaded one
+        self.key = json.loads(json.dumps(key, ensure_ascii=False))
+        self.interval = max(1, interval)
+        self.pending = 0
+
+    def load(self) -> Optional[Dict]:
+        """Saved state of this report, or None when there is none (or it belongs to another report)."""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return saved.get('state') if saved.get('key') == self.key else None
+
+    def tick(self) -> bool:
+        """Count one written PR; True when a checkpoint is due."""
+        self.pending += 1
+        return self.pending >= self.interval
+
+    def save(self, state: Dict):
+        """Replace the saved state atomically."""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': self.key, 'state': state}, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        self.pending = 0
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
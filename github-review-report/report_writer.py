@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Streaming report writers for review reports (xlsx, csv, jsonl).
+
+Rows are written as they are produced, so memory stays flat however large the
+report gets. Excel output goes through openpyxl's write-only mode and each
+sheet is laid out like the bundled template
+(resources/模块名-代码走查报告-template.xlsx): same header, column widths,
+header/data cell styles, data validations and autofilter. openpyxl is only
+imported for xlsx output.
+
+Writers can be checkpointed and resumed: csv/jsonl output is reopened and cut
+back to the checkpoint, while a workbook (which cannot be reopened in
+write-only mode) is rebuilt from a log of the rows written before it.
+AppendingReportWriter instead adds rows to the sheets of an existing workbook.
+"""
+
+import csv
+import json
+import os
+from copy import copy
+from typing import Dict, List, Optional
+
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "resources", "模块名-代码走查报告-template.xlsx")
+
+REPORT_COLUMNS = [
+    '序号', '包名', '仓库地址', '代码提交地址', '问题来源', '问题描述', '严重程度', '影响分析',
+    '问题类型', '提出人', '提出时间', '解决人', '计划解决时间', '实际解决时间',
+    '提出人确认是否验收通过', '问题状态',
+]
+DEFAULT_SHEET_TITLE = "问题管理"
+SERIAL_COLUMN = "序号"
+
+OUTPUT_FORMATS = ("xlsx", "csv", "jsonl")
+
+# Log of the rows written to a workbook, kept until it is saved
+PARTIAL_SUFFIX = ".partial.jsonl"
+
+
+class ReportTemplate:
+    """Layout of the template's first sheet: header, styles, widths and validations."""
+
+    def __init__(self, template_path: Optional[str] = TEMPLATE_PATH,
+                 columns: Optional[List[str]] = None):
+        self.sheet_title = DEFAULT_SHEET_TITLE
+        self.columns = list(columns or REPORT_COLUMNS)
+        self.header_styles: List[Dict] = []
+        self.data_styles: List[Dict] = []
+        self.column_widths: Dict[str, float] = {}
+        self.header_height = None
+        self.validations: List = []
+
+        if template_path and os.path.exists(template_path):
+            self._load(template_path)
+        if not self.header_styles:
+            from openpyxl.styles import Font
+
+            self.header_styles = [{'font': Font(bold=True)} for _ in self.columns]
+            self.data_styles = [{} for _ in self.columns]
+
+    def _load(self, template_path: str):
+        from openpyxl import load_workbook
+
+        ws = load_workbook(template_path).worksheets[0]
+        self.sheet_title = ws.title
+        positions = {cell.value: cell.column for cell in ws[1] if cell.value is not None}
+        for name in self.columns:
+            column = positions.get(name)
+            self.header_styles.append(_cell_style(ws.cell(1, column)) if column else {})
+            self.data_styles.append(_cell_style(ws.cell(2, column)) if column else {})
+        self.column_widths = {key: dim.width for key, dim in ws.column_dimensions.items() if dim.width}
+        self.header_height = ws.row_dimensions[1].height
+        for validation in ws.data_validations.dataValidation:
+            # Lists pointing at a deleted sheet (#REF!) are useless in the output
+            if validation.formula1 and '#REF!' in validation.formula1:
+                continue
+            self.validations.append(copy(validation))
+
+
+def _cell_style(cell) -> Dict:
+    return {
+        'font': copy(cell.font),
+        'fill': copy(cell.fill),
+        'border': copy(cell.border),
+        'alignment': copy(cell.alignment),
+        'number_format': cell.number_format,
+    }
+
+
+class StreamingReportWriter:
+    """
+    Append report rows to one or more template-styled sheets in constant memory.
+
+    The workbook is created on the first append, so a run without rows leaves no file.
+    序号 is assigned per sheet in append order. With partial_path every row is also
+    logged there until the workbook is saved, so checkpoint()/resume() work.
+    """
+
+    def __init__(self, output_file: str, template: Optional[ReportTemplate] = None,
+                 validation_lists: Optional[Dict[str, List[str]]] = None,
+                 partial_path: Optional[str] = None):
+        self.output_file = output_file
+        self.template = template or ReportTemplate()
+        self.default_sheet = self.template.sheet_title
+        # Column name -> allowed values, for columns whose template validation was broken
+        self.validation_lists = validation_lists or {}
+        self.workbook = None
+        self.sheets: Dict[str, Dict] = {}
+        self.row_count = 0
+        self.partial_path = partial_path
+        self.partial = None
+
+    def _create_sheet(self, title: str):
+        if self.workbook is None:
+            from openpyxl import Workbook
+
+            self.workbook = Workbook(write_only=True)
+        return self.workbook.create_sheet(title)
+
+    def _open_sheet(self, title: str) -> Dict:
+        ws = self._create_sheet(title)
+        template = self.template
+
+        for key, width in template.column_widths.items():
+            ws.column_dimensions[key].width = width
+        if template.header_height:
+            ws.row_dimensions[1].height = template.header_height
+        ws.append([self._styled_cell(ws, name, style)
+                   for name, style in zip(template.columns, template.header_styles)])
+
+        # Write-only cells cannot share style objects cheaply: style one cell per column and reuse its style ids.
+        # Cell._style (the StyleArray of workbook style ids) is private openpyxl API, but the public
+        # font/fill/border setters re-register every style per cell, several times slower per row;
+        # it has been stable since openpyxl 2.4 (checked up to 3.1)
+        data_style_ids = []
+        for style in template.data_styles:
+            cell = self._styled_cell(ws, None, style)
+            data_style_ids.append(cell._style)
+
+        sheet = {'ws': ws, 'rows': 0, 'columns': template.columns, 'style_ids': data_style_ids}
+        self.sheets[title] = sheet
+        return sheet
+
+    @staticmethod
+    def _styled_cell(ws, value, style: Dict):
+        from openpyxl.cell import WriteOnlyCell
+
+        cell = WriteOnlyCell(ws, value=value)
+        for attr, attr_value in style.items():
+            setattr(cell, attr, attr_value)
+        return cell
+
+    def append(self, row: Dict, sheet_title: Optional[str] = None):
+        """Append one row (column name -> value) to sheet_title (the template's sheet by default)."""
+        title = sheet_title or self.default_sheet
+        self._write_row(row, title)
+        if self.partial_path:
+            if self.partial is None:
+                self.partial = open(self.partial_path, 'wb')
+            self.partial.write(json.dumps([title, row], ensure_ascii=False).encode('utf-8') + b'\n')
+
+    def _write_row(self, row: Dict, title: str):
+        from openpyxl.cell import WriteOnlyCell
+
+        sheet = self.sheets.get(title) or self._open_sheet(title)
+        sheet['rows'] += 1
+        self.row_count += 1
+        if SERIAL_COLUMN in row:
+            row = {**row, SERIAL_COLUMN: sheet['rows']}
+
+        ws = sheet['ws']
+        cells = []
+        for name, style_id in zip(sheet['columns'], sheet['style_ids']):
+            cell = WriteOnlyCell(ws, value=row.get(name))
+            # Private StyleArray of the column's data style, see _open_sheet
+            cell._style = copy(style_id)
+            cells.append(cell)
+        ws.append(cells)
+
+    def append_table(self, title: str, rows: List[Dict], hidden: bool = False):
+        """Write a small plain table (e.g. a summary) with bold headers to its own (optionally hidden) sheet."""
+        from openpyxl.styles import Font
+
+        if not rows:
+            return
+        ws = self._create_sheet(title)
+        if hidden:
+            ws.sheet_state = 'hidden'
+        columns = list(rows[0])
+        ws.append([self._styled_cell(ws, name, {'font': Font(bold=True)}) for name in columns])
+        for row in rows:
+            ws.append([row.get(name) for name in columns])
+
+    def _finish_sheet(self, sheet: Dict):
+        from openpyxl.utils import get_column_letter
+        from openpyxl.worksheet.datavalidation import DataValidation
+
+        ws = sheet['ws']
+        last_row = sheet['rows'] + 1
+        last_column = get_column_letter(len(self.template.columns))
+        ws.auto_filter.ref = f"A1:{last_column}{last_row}"
+
+        for validation in self.template.validations:
+            ws.data_validations.append(copy(validation))
+        for name, values in self.validation_lists.items():
+            if name not in self.template.columns:
+                continue
+            index = self.template.columns.index(name) + 1
+            if any(cell_range.min_col <= index <= cell_range.max_col
+                   for validation in self.template.validations for cell_range in validation.sqref.ranges):
+                continue
+            column = get_column_letter(index)
+            validation = DataValidation(type="list", formula1='"' + ",".join(values) + '"', allow_blank=True)
+            validation.add(f"{column}2:{column}1048576")
+            ws.data_validations.append(validation)
+
+    def checkpoint(self) -> Dict:
+        """Flush the row log and return the position resume() continues from."""
+        if self.partial is None:
+            return {'offset': 0}
+        self.partial.flush()
+        return {'offset': self.partial.tell()}
+
+    def resume(self, state: Dict) -> bool:
+        """Replay the rows logged up to a checkpoint; False when the log is missing or too short."""
+        offset = state.get('offset', 0)
+        if not offset:
+            return True
+        if not self.partial_path or not os.path.exists(self.partial_path):
+            return False
+        partial = open(self.partial_path, 'r+b')
+        logged = partial.read(offset)
+        if len(logged) < offset:
+            partial.close()
+            return False
+        for line in logged.splitlines():
+            title, row = json.loads(line)
+            self._write_row(row, title)
+        # Rows logged after the checkpoint belong to PRs that are written again
+        partial.truncate(offset)
+        self.partial = partial
+        return True
+
+    def close(self) -> bool:
+        """Save the workbook and drop the row log; returns False when nothing was written."""
+        if self.partial:
+            self.partial.close()
+            os.remove(self.partial_path)
+            self.partial = None
+        if self.workbook is None:
+            return False
+        for sheet in self.sheets.values():
+            self._finish_sheet(sheet)
+        self.workbook.save(self.output_file)
+        return True
+
+
+class AppendingReportWriter(StreamingReportWriter):
+    """
+    Append report rows to the sheets of an existing workbook, keeping everything else in it.
+
+    The workbook is loaded in normal mode. Rows go after each sheet's last data
+    row, placed by its header and styled like the template's data row, and 序号
+    continues from the sheet's highest one. Sheets that do not exist yet are laid
+    out like the template and placed after the existing data sheets;
+    append_table() replaces a table sheet of the same title in place and
+    drop_table() removes one.
+    """
+
+    def __init__(self, output_file: str, template: Optional[ReportTemplate] = None,
+                 validation_lists: Optional[Dict[str, List[str]]] = None):
+        from openpyxl import load_workbook
+
+        super().__init__(output_file, template, validation_lists)
+        self.workbook = load_workbook(output_file)
+        # Report sheets: those whose header has a 序号 column
+        self.data_sheets = [ws.title for ws in self.workbook.worksheets
+                            if SERIAL_COLUMN in self._header(ws)]
+        self._data_sheet_end = max((self.workbook.sheetnames.index(title) + 1 for title in self.data_sheets),
+                                   default=0)
+
+    @staticmethod
+    def _header(ws) -> List:
+        return [cell.value for cell in next(ws.iter_rows(max_row=1), ())]
+
+    def read_table(self, title: str) -> List[Dict]:
+        """Rows of sheet title as header -> value dicts, skipping empty rows ([] when there is no such sheet)."""
+        if title not in self.workbook.sheetnames:
+            return []
+        rows = self.workbook[title].iter_rows(values_only=True)
+        header = next(rows, ())
+        return [{name: value for name, value in zip(header, row) if name is not None}
+                for row in rows if any(value is not None for value in row)]
+
+    def drop_table(self, title: str) -> bool:
+        """Remove sheet title from the workbook; False when there is no such sheet."""
+        if title not in self.workbook.sheetnames:
+            return False
+        del self.workbook[title]
+        return True
+
+    def _create_sheet(self, title: str):
+        index = None
+        if title in self.workbook.sheetnames:
+            index = self.workbook.sheetnames.index(title)
+            del self.workbook[title]
+        return self.workbook.create_sheet(title, index)
+
+    def _open_sheet(self, title: str) -> Dict:
+        if title not in self.workbook.sheetnames:
+            sheet = super()._open_sheet(title)
+            # Keep new report sheets ahead of the summary and other table sheets
+            self.workbook.move_sheet(sheet['ws'], self._data_sheet_end - self.workbook.index(sheet['ws']))
+            self._data_sheet_end += 1
+            return sheet
+
+        ws = self.workbook[title]
+        columns = self._header(ws)
+        serial_index = columns.index(SERIAL_COLUMN) if SERIAL_COLUMN in columns else None
+        last_row, last_serial = 1, 0
+        for row_index, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+            if any(value is not None for value in row):
+                last_row = row_index
+                if serial_index is not None and isinstance(row[serial_index], (int, float)):
+                    last_serial = max(last_serial, int(row[serial_index]))
+        # Append right after the data, not after empty rows that only carry formatting.
+        # Worksheet.append() continues after the private _current_row, which has no public setter
+        ws._current_row = last_row
+
+        styles = dict(zip(self.template.columns, self.template.data_styles))
+        style_ids = [self._styled_cell(ws, None, styles.get(name, {}))._style for name in columns]
+        sheet = {'ws': ws, 'rows': last_serial, 'columns': columns, 'style_ids': style_ids, 'existing': True}
+        self.sheets[title] = sheet
+        return sheet
+
+    def _finish_sheet(self, sheet: Dict):
+        if not sheet.get('existing'):
+            super()._finish_sheet(sheet)
+            return
+        # Existing validations cover whole columns; only the autofilter has to grow
+        from openpyxl.utils import get_column_letter
+
+        ws = sheet['ws']
+        if ws.auto_filter.ref:
+            ws.auto_filter.ref = f"A1:{get_column_letter(len(sheet['columns']))}{ws._current_row}"
+
+    def close(self) -> bool:
+        """Save the workbook in place (atomically)."""
+        for sheet in self.sheets.values():
+            self._finish_sheet(sheet)
+        stem, ext = os.path.splitext(self.output_file)
+        temp_path = f"{stem}.tmp{ext}"
+        self.workbook.save(temp_path)
+        os.replace(temp_path, self.output_file)
+        return True
+
+
+class FlatReportWriter:
+    """
+    Stream rows to a single csv or jsonl file with the same interface as StreamingReportWriter.
+
+    Sheets do not exist in flat files: 序号 still restarts per sheet title, and
+    append_table() writes a sidecar file named <output>-<title>.<ext>.
+    """
+
+    def __init__(self, output_file: str, output_format: str, columns: Optional[List[str]] = None):
+        self.output_file = output_file
+        self.output_format = output_format
+        self.columns = list(columns or REPORT_COLUMNS)
+        self.default_sheet = DEFAULT_SHEET_TITLE
+        self.file = None
+        self.csv_writer = None
+        self.serials: Dict[str, int] = {}
+        self.row_count = 0
+
+    def _open(self):
+        # utf-8-sig so Excel opens Chinese csv content correctly
+        encoding = 'utf-8-sig' if self.output_format == 'csv' else 'utf-8'
+        self.file = open(self.output_file, 'w', encoding=encoding, newline='')
+        if self.output_format == 'csv':
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=self.columns, extrasaction='ignore')
+            self.csv_writer.writeheader()
+
+    def append(self, row: Dict, sheet_title: Optional[str] = None):
+        if self.file is None:
+            self._open()
+        title = sheet_title or self.default_sheet
+        self.serials[title] = self.serials.get(title, 0) + 1
+        self.row_count += 1
+        if SERIAL_COLUMN in row:
+            row = {**row, SERIAL_COLUMN: self.serials[title]}
+
+        if self.csv_writer:
+            self.csv_writer.writerow(row)
+        else:
+            self.file.write(json.dumps({name: row.get(name) for name in self.columns}, ensure_ascii=False))
+            self.file.write('\n')
+
+    def checkpoint(self) -> Dict:
+        """Flush the output and return the position resume() continues from."""
+        if self.file is None:
+            return {'offset': 0, 'serials': {}, 'row_count': 0}
+        self.file.flush()
+        return {'offset': self.file.tell(), 'serials': dict(self.serials), 'row_count': self.row_count}
+
+    def resume(self, state: Dict) -> bool:
+        """Reopen the output at a checkpoint, cutting off anything written after it."""
+        offset = state.get('offset', 0)
+        if not offset:
+            return True
+        if not os.path.exists(self.output_file):
+            return False
+        encoding = 'utf-8-sig' if self.output_format == 'csv' else 'utf-8'
+        file = open(self.output_file, 'r+', encoding=encoding, newline='')
+        if file.seek(0, os.SEEK_END) < offset:
+            file.close()
+            return False
+        file.seek(offset)
+        file.truncate()
+        self.file = file
+        if self.output_format == 'csv':
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=self.columns, extrasaction='ignore')
+        self.serials = dict(state.get('serials') or {})
+        self.row_count = state.get('row_count', 0)
+        return True
+
+    def append_table(self, title: str, rows: List[Dict], hidden: bool = False):
+        # Flat output has no place for hidden tables
+        if not rows or hidden:
+            return
+        stem, ext = os.path.splitext(self.output_file)
+        table = FlatReportWriter(f"{stem}-{title}{ext}", self.output_format, columns=list(rows[0]))
+        for row in rows:
+            table.append(row)
+        table.close()
+
+    def close(self) -> bool:
+        if self.file is None:
+            return False
+        self.file.close()
+        return True
+
+
+def resolve_output_format(output_file: Optional[str], output_format: Optional[str] = None) -> str:
+    """Explicit format, else the output file's extension, else xlsx."""
+    if output_format:
+        return output_format
+    ext = os.path.splitext(output_file or "")[1].lstrip('.').lower()
+    return ext if ext in OUTPUT_FORMATS else "xlsx"
+
+
+def open_report_writer(
+    output_file: str,
+    output_format: str = "xlsx",
+    template_path: Optional[str] = TEMPLATE_PATH,
+    validation_lists: Optional[Dict[str, List[str]]] = None,
+    partial_path: Optional[str] = None,
+    append: bool = False
+):
+    """
+    Create the streaming writer for output_format (xlsx uses the template layout).
+
+    partial_path is where an xlsx writer logs its rows to be resumable; flat
+    files are resumable by themselves. append adds to an existing workbook
+    (xlsx only).
+    """
+    if append:
+        if output_format != "xlsx":
+            raise ValueError(f"Appending is only supported for xlsx reports, not {output_format}")
+        return AppendingReportWriter(output_file, ReportTemplate(template_path), validation_lists)
+    if output_format == "xlsx":
+        return StreamingReportWriter(output_file, ReportTemplate(template_path), validation_lists, partial_path)
+    if output_format in OUTPUT_FORMATS:
+        return FlatReportWriter(output_file, output_format)
+    raise ValueError(f"Unsupported output format: {output_format}")
+
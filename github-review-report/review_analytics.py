@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Reviewer and PR latency analytics for the review report generator.
+
+ReviewAnalytics collects one entry per PR and per report row while the report
+streams, as compact columns (category codes and ISO time strings). compute()
+then derives every statistic with numpy array operations, never a Python loop
+over rows:
+
+- time from PR creation to its first review, and to merge (per repo);
+- review latency, from PR creation to each reported review (per repo,
+  reviewer and problem type), and each reviewer's load in reviews and PRs;
+- the problem type distribution per repo.
+
+Latencies are in hours, summarized by count and PERCENTILES. numpy is only
+imported by compute().
+"""
+
+from array import array
+from typing import Dict, List, Optional
+
+
+PERCENTILES = (50, 90, 95)
+
+
+class ReviewAnalytics:
+    """Columns of PRs and report rows, and the statistics computed over them."""
+
+    def __init__(self):
+        # Category name -> code, in first-seen order
+        self.repos: Dict[str, int] = {}
+        self.reviewers: Dict[str, int] = {}
+        self.problem_types: Dict[str, int] = {}
+        self._prs: Dict[tuple, int] = {}
+        self.pr_repo = array('l')
+        self.pr_created: List[str] = []
+        self.pr_first_review: List[str] = []
+        self.pr_merged: List[str] = []
+        self.review_pr = array('l')
+        self.review_reviewer = array('l')
+        self.review_type = array('l')
+        self.review_time: List[str] = []
+
+    @staticmethod
+    def _code(codes: Dict[str, int], name: str) -> int:
+        code = codes.get(name)
+        if code is None:
+            code = codes[name] = len(codes)
+        return code
+
+    def add_pr(self, repo: str, number: int, created_at: Optional[str],
+               first_review_at: Optional[str], merged_at: Optional[str]):
+        """Record a PR of the report with its ISO 8601 creation, first review and merge times."""
+        self._prs[(repo, number)] = len(self.pr_created)
+        self.pr_repo.append(self._code(self.repos, repo))
+        self.pr_created.append(created_at or '')
+        self.pr_first_review.append(first_review_at or '')
+        self.pr_merged.append(merged_at or '')
+
+    def add_review(self, repo: str, number: int, reviewer: str, problem_type: str, submitted_at: Optional[str]):
+        """Record a report row: a review of a PR added with add_pr."""
+        self.review_pr.append(self._prs[(repo, number)])
+        self.review_reviewer.append(self._code(self.reviewers, reviewer))
+        self.review_type.append(self._code(self.problem_types, problem_type))
+        self.review_time.append(submitted_at or '')
+
+    def compute(self) -> Dict:
+        """
+        All statistics as a JSON-ready dict: overall, by_repo, by_reviewer and by_problem_type.
+
+        Latency entries are {'count', 'p50', 'p90', 'p95'} in hours (None without data).
+        """
+        import numpy as np
+
+        pr_repo = np.frombuffer(self.pr_repo, dtype=self.pr_repo.typecode)
+        created = _hours(self.pr_created)
+        to_first_review = _hours(self.pr_first_review) - created
+        to_merge = _hours(self.pr_merged) - created
+
+        review_pr = np.frombuffer(self.review_pr, dtype=self.review_pr.typecode)
+        review_repo = pr_repo[review_pr]
+        reviewer = np.frombuffer(self.review_reviewer, dtype=self.review_reviewer.typecode)
+        problem_type = np.frombuffer(self.review_type, dtype=self.review_type.typecode)
+        latency = _hours(self.review_time) - created[review_pr]
+
+        n_repos, n_reviewers, n_types = len(self.repos), len(self.reviewers), len(self.problem_types)
+        repo_prs = np.bincount(pr_repo, minlength=n_repos)
+        repo_reviews = np.bincount(review_repo, minlength=n_repos)
+        repo_first_review = _group_latency(pr_repo, to_first_review, n_repos)
+        repo_merge = _group_latency(pr_repo, to_merge, n_repos)
+        repo_latency = _group_latency(review_repo, latency, n_repos)
+        repo_types = np.bincount(review_repo * n_types + problem_type,
+                                 minlength=n_repos * n_types).reshape(n_repos, n_types)
+
+        reviewer_reviews = np.bincount(reviewer, minlength=n_reviewers)
+        reviewer_prs = _distinct_per_group(reviewer, review_pr, n_reviewers)
+        reviewer_repos = _distinct_per_group(reviewer, review_repo, n_reviewers)
+        reviewer_latency = _group_latency(reviewer, latency, n_reviewers)
+
+        type_reviews = np.bincount(problem_type, minlength=n_types)
+        type_prs = _distinct_per_group(problem_type, review_pr, n_types)
+        type_latency = _group_latency(problem_type, latency, n_types)
+
+        no_group = np.zeros(len(created), dtype=np.int64)
+        type_names = list(self.problem_types)
+        total_reviews = len(self.review_time)
+        return {
+            'percentiles': list(PERCENTILES),
+            'overall': {
+                'prs': len(created),
+                'reviewed_prs': int(np.count_nonzero(~np.isnan(to_first_review))),
+                'reviews': total_reviews,
+                'reviewers': n_reviewers,
+                'time_to_first_review_hours': _group_latency(no_group, to_first_review, 1)[0],
+                'time_to_merge_hours': _group_latency(no_group, to_merge, 1)[0],
+                'review_latency_hours': _group_latency(np.zeros(total_reviews, dtype=np.int64), latency, 1)[0],
+            },
+            'by_repo': {
+                repo: {
+                    'prs': int(repo_prs[code]),
+                    'reviews': int(repo_reviews[code]),
+                    'time_to_first_review_hours': repo_first_review[code],
+                    'time_to_merge_hours': repo_merge[code],
+                    'review_latency_hours': repo_latency[code],
+                    'problem_types': {type_names[t]: int(count)
+                                      for t, count in enumerate(repo_types[code]) if count},
+                }
+                for repo, code in self.repos.items()
+            },
+            'by_reviewer': {
+                name: {
+                    'reviews': int(reviewer_reviews[code]),
+                    'prs': int(reviewer_prs[code]),
+                    'repos': int(reviewer_repos[code]),
+                    'review_latency_hours': reviewer_latency[code],
+                }
+                for name, code in self.reviewers.items()
+            },
+            'by_problem_type': {
+                name: {
+                    'reviews': int(type_reviews[code]),
+                    'share': round(float(type_reviews[code]) / total_reviews, 4),
+                    'prs': int(type_prs[code]),
+                    'review_latency_hours': type_latency[code],
+                }
+                for name, code in self.problem_types.items()
+            },
+        }
+
+
+def _hours(times: List[str]):
+    """ISO 8601 UTC times as float hours since the epoch, NaN where missing."""
+    import numpy as np
+
+    # GitHub times are YYYY-MM-DDTHH:MM:SSZ: the 19-character field drops the Z
+    values = np.array(times, dtype='U19')
+    values[values == ''] = 'NaT'
+    stamps = values.astype('datetime64[s]')
+    hours = stamps.astype('float64') / 3600
+    hours[np.isnat(stamps)] = np.nan
+    return hours
+
+
+def _distinct_per_group(groups, values, n_groups: int):
+    """Number of distinct values per group code."""
+    import numpy as np
+
+    # One int64 key per (group, value) pair
+    span = int(values.max()) + 1 if len(values) else 1
+    pairs = np.unique(groups.astype(np.int64) * span + values)
+    return np.bincount(pairs // span, minlength=n_groups)
+
+
+def _group_latency(groups, values, n_groups: int) -> List[Dict]:
+    """
+    Count and PERCENTILES of values per group code, ignoring NaN.
+
+    One sort orders values within their groups; each percentile is then read
+    for every group at once, interpolating linearly like numpy.percentile.
+    """
+    import numpy as np
+
+    valid = ~np.isnan(values)
+    groups, values = groups[valid], values[valid]
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    present = counts > 0
+
+    table = np.full((n_groups, len(PERCENTILES)), np.nan)
+    for column, percentile in enumerate(PERCENTILES):
+        position = (starts + (counts - 1) * percentile / 100)[present]
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        table[present, column] = values[low] + (values[high] - values[low]) * (position - low)
+
+    return [
+        {'count': int(count),
+         **{f"p{percentile}": None if np.isnan(value) else round(float(value), 2)
+            for percentile, value in zip(PERCENTILES, row)}}
+        for count, row in zip(counts, table)
+    ]
+
+
+def analytics_table(result: Dict) -> List[Dict]:
+    """Rows of the report's 统计 sheet: one per repo, reviewer and problem type, then the type distribution per repo."""
+    metrics = [('首次Review', 'time_to_first_review_hours'), ('合并', 'time_to_merge_hours'),
+               ('Review延迟', 'review_latency_hours')]
+
+    def row(dimension: str, name: str, item: Dict, share: Optional[float] = None) -> Dict:
+        entry = {'维度': dimension, '名称': name, 'Review数': item.get('reviews'), 'PR数': item.get('prs'),
+                 '占比': share}
+        for label, key in metrics:
+            for percentile in PERCENTILES:
+                entry[f"{label}P{percentile}(小时)"] = (item.get(key) or {}).get(f"p{percentile}")
+        return entry
+
+    rows = [row('全部', '全部', result['overall'])]
+    rows += [row('仓库', repo, item) for repo, item in result['by_repo'].items()]
+    rows += [row('Reviewer', name, item) for name, item in
+             sorted(result['by_reviewer'].items(), key=lambda entry: entry[1]['reviews'], reverse=True)]
+    rows += [row('问题类型', name, item, item['share']) for name, item in
+             sorted(result['by_problem_type'].items(), key=lambda entry: entry[1]['reviews'], reverse=True)]
+    for repo, item in result['by_repo'].items():
+        for name, count in sorted(item['problem_types'].items(), key=lambda entry: entry[1], reverse=True):
+            rows.append(row('仓库问题类型', f"{repo} / {name}", {'reviews': count},
+                            round(count / item['reviews'], 4)))
+    return rows
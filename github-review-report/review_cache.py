@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Local SQLite cache of PR details for the review report generator.
+
+Stores each fetched PR (reviews and comments included) keyed by (repo, number)
+together with its `updatedAt`, so repeated or overlapping reports only fetch
+PRs that are new or changed, and `--offline` runs can build reports without
+touching GitHub. REST responses are kept with their ETag/Last-Modified
+validators so repeat requests can be sent conditionally, and LLM summaries
+are kept by content hash so the same review text is never summarized twice.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "github-review-report",
+    "reviews.sqlite3",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pull_requests (
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    updated_at TEXT,
+    created_at TEXT,
+    merged_at TEXT,
+    base_ref TEXT,
+    payload TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (repo, number)
+);
+CREATE INDEX IF NOT EXISTS pull_requests_merged ON pull_requests (repo, merged_at);
+CREATE TABLE IF NOT EXISTS http_cache (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    link TEXT,
+    body TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summaries (
+    content_hash TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    problem_description TEXT NOT NULL,
+    impact_analysis TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+# SQLite limits bound parameters per statement
+QUERY_CHUNK_SIZE = 500
+
+
+class ReviewCache:
+    """PR detail payloads keyed by (repo, number)."""
+
+    def __init__(self, cache_path: str = DEFAULT_CACHE_PATH):
+        self.cache_path = cache_path
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Used from API client workers and report pipeline stages: every statement holds the lock
+        self.conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def close(self):
+        self.conn.close()
+
+    def get_prs(self, repo: str, numbers: Iterable[int]) -> Dict[int, Dict]:
+        """Return cached PR details for the given numbers (missing ones are omitted)."""
+        numbers = list(numbers)
+        result = {}
+        for start in range(0, len(numbers), QUERY_CHUNK_SIZE):
+            chunk = numbers[start:start + QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT number, payload FROM pull_requests WHERE repo = ? AND number IN ({placeholders})",
+                    [repo, *chunk]).fetchall()
+            for number, payload in rows:
+                result[number] = json.loads(payload)
+        return result
+
+    def store_prs(self, repo: str, details: Dict[int, Dict]):
+        """Insert or replace PR details fetched from GitHub."""
+        synced_at = datetime.now(timezone.utc).isoformat()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pull_requests "
+                "(repo, number, updated_at, created_at, merged_at, base_ref, payload, synced_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(repo, number, pr.get('updatedAt'), pr.get('createdAt'), pr.get('mergedAt'),
+                  pr.get('baseRefName'), json.dumps(pr, ensure_ascii=False), synced_at)
+                 for number, pr in details.items()])
+
+    def find_stale(self, repo: str, prs: List[Dict], required_fields: Iterable[str] = ()) -> List[int]:
+        """
+        Return numbers of listed PRs that are not cached or whose updatedAt changed.
+
+        PRs whose cached payload lacks one of required_fields (stored by an older
+        version) are stale as well.
+        """
+        cached = {}
+        complete = "".join(f" AND json_type(payload, '$.{field}') IS NOT NULL" for field in required_fields)
+        numbers = [pr['number'] for pr in prs]
+        for start in range(0, len(numbers), QUERY_CHUNK_SIZE):
+            chunk = numbers[start:start + QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT number, updated_at FROM pull_requests "
+                    f"WHERE repo = ? AND number IN ({placeholders}){complete}",
+                    [repo, *chunk]).fetchall()
+            cached.update(rows)
+        return [pr['number'] for pr in prs
+                if pr['number'] not in cached or cached[pr['number']] != pr.get('updatedAt')]
+
+    def list_merged_prs(
+        self,
+        repo: str,
+        start_date: str,
+        end_date: str,
+        base_branch: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """Cached PRs merged between start_date and end_date (inclusive), newest first like search."""
+        sql = ("SELECT number, payload FROM pull_requests "
+               "WHERE repo = ? AND substr(merged_at, 1, 10) BETWEEN ? AND ?")
+        params: List = [repo, start_date, end_date]
+        if base_branch:
+            sql += " AND base_ref = ?"
+            params.append(base_branch)
+        sql += " ORDER BY created_at DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(payload) for _, payload in rows]
+
+    def list_repos(self, owner: str) -> List[str]:
+        """Repos of owner that have cached PRs (offline org listing)."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT repo FROM pull_requests WHERE repo LIKE ? ORDER BY repo", (f"{owner}/%",)).fetchall()
+        return [repo for (repo,) in rows]
+
+    def get_response(self, url: str) -> Optional[Dict]:
+        """Cached REST response for url: {etag, last_modified, link, body}, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, link, body FROM http_cache WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'link': row[2], 'body': row[3]}
+
+    def store_response(self, url: str, etag: Optional[str], last_modified: Optional[str],
+                       link: str, body: str):
+        """Remember a REST response body with its validators."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, link, body, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, link, body, datetime.now(timezone.utc).isoformat()))
+
+    def get_summaries(self, content_hashes: Iterable[str]) -> Dict[str, Dict]:
+        """Cached LLM summaries for the given content hashes (missing ones are omitted)."""
+        content_hashes = list(content_hashes)
+        result = {}
+        for start in range(0, len(content_hashes), QUERY_CHUNK_SIZE):
+            chunk = content_hashes[start:start + QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            with self.lock:
+                rows = self.conn.execute(
+                    f"SELECT content_hash, problem_description, impact_analysis FROM summaries "
+                    f"WHERE content_hash IN ({placeholders})", chunk).fetchall()
+            for content_hash, description, impact in rows:
+                result[content_hash] = {'problem_description': description, 'impact_analysis': impact}
+        return result
+
+    def store_summaries(self, model: str, summaries: Dict[str, Dict]):
+        """Remember LLM summaries keyed by content hash."""
+        created_at = datetime.now(timezone.utc).isoformat()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO summaries "
+                "(content_hash, model, problem_description, impact_analysis, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(content_hash, model, summary['problem_description'], summary['impact_analysis'], created_at)
+                 for content_hash, summary in summaries.items()])
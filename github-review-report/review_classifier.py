@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Rule-driven review classifier for the review report generator.
+
+Problem-type keywords, invalid-review phrases and impact keywords are read
+from a rules file (review_rules.json by default) in which every rule has an
+explicit priority. All keywords are compiled into one trie-shaped
+alternation regex per matcher, so a review body is classified in a single scan
+rather than one substring search per keyword, and the rule that fired is
+reported with the result.
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "review_rules.json")
+
+# 其他: problem type used when no rule fires
+DEFAULT_PROBLEM_TYPE = 15
+
+
+class RuleMatch(NamedTuple):
+    """The rule that fired for a text and where its keyword first occurs."""
+    rule: str
+    keyword: str
+    value: Optional[int]
+    position: int
+
+
+class ReviewClassification(NamedTuple):
+    problem_type: int
+    problem_rule: Optional[RuleMatch]
+    invalid_rule: Optional[RuleMatch]
+
+
+class KeywordMatcher:
+    """
+    Find the highest-priority keyword of each category in one scan of a text.
+
+    The keywords are compiled into a single trie-shaped alternation, which
+    matches the longest keyword at each position; every keyword that is a
+    prefix of that match is a hit as well. Keywords that could start inside a
+    match (and would change the result) are looked up directly, so overlapping
+    keywords are not missed. Ties resolve to the keyword listed first in the
+    rules, at its first occurrence.
+    """
+
+    def __init__(self, categories: Dict[str, List[Dict]], ignore_case: bool = True):
+        self.ignore_case = ignore_case
+        # keyword -> (category, rank, rule name, value); higher rank wins
+        entries: Dict[str, tuple] = {}
+        for category, rules in categories.items():
+            order = 0
+            for rule in rules:
+                for keyword in rule['keywords']:
+                    key = keyword.lower() if ignore_case else keyword
+                    if not key:
+                        raise ValueError(f"rule {rule['name']!r} has an empty keyword")
+                    if key in entries:
+                        raise ValueError(f"keyword {keyword!r} appears in more than one rule")
+                    order += 1
+                    entries[key] = (category, (rule['priority'], -order), rule['name'], rule.get('problem_type'))
+
+        # Longest match -> [(category, (rank, rule, value, keyword))] for the best keyword per
+        # category among the keywords it starts with
+        self.hits: Dict[str, List[tuple]] = {key: list(self._best_prefixes(entries, key).items())
+                                             for key in entries}
+        # Match -> keywords that can start inside it and would change the result; the
+        # non-overlapping scan skips those positions, so they are checked separately
+        self.hidden: Dict[str, List[str]] = {}
+        for key in entries:
+            hidden = self._hidden_keywords(entries, key)
+            if hidden:
+                self.hidden[key] = hidden
+        # Case-insensitive regexes lose sre's first-character prefilter, so texts are lowered instead
+        self.pattern = re.compile(_trie_pattern(entries)) if entries else None
+
+    @staticmethod
+    def _best_prefixes(entries: Dict[str, tuple], key: str) -> Dict[str, tuple]:
+        best: Dict[str, tuple] = {}
+        for prefix, (category, rank, rule, value) in entries.items():
+            if key.startswith(prefix) and (category not in best or rank > best[category][0]):
+                best[category] = (rank, rule, value, prefix)
+        return best
+
+    def _hidden_keywords(self, entries: Dict[str, tuple], key: str) -> List[str]:
+        best = self._best_prefixes(entries, key)
+        hidden = []
+        for other, (category, rank, _, _) in entries.items():
+            starts_inside = any(other.startswith(key[i:]) or key[i:].startswith(other)
+                                for i in range(1, len(key)))
+            # Only keywords not covered by key's own hits, or outranking them, matter
+            if starts_inside and (category not in best or rank > best[category][0]):
+                hidden.append(other)
+        return hidden
+
+    def scan(self, text: str) -> Dict[str, RuleMatch]:
+        """Return category -> best RuleMatch for the categories that matched text."""
+        if not text or self.pattern is None:
+            return {}
+        if self.ignore_case:
+            text = text.lower()
+        found = set(self.pattern.findall(text))
+        if not found:
+            return {}
+        if not self.hidden.keys().isdisjoint(found):
+            found.update([other for key in found for other in self.hidden.get(key, ()) if other in text])
+
+        hits = self.hits
+        best: Dict[str, tuple] = {}
+        for key in found:
+            for category, hit in hits[key]:
+                current = best.get(category)
+                if current is None or hit[0] > current[0]:
+                    best[category] = hit
+        # Positions are only needed for the winners: the first occurrence of their keyword
+        return {category: RuleMatch(rule, keyword, value, text.find(keyword))
+                for category, (_, rule, value, keyword) in best.items()}
+
+
+def _trie_pattern(keywords) -> str:
+    """Regex matching the longest of keywords at a position, factored by common prefixes."""
+    root: Dict[str, Dict] = {}
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A keyword ends here: the longer continuations are optional (and greedy)
+        return f'(?:{body})?' if '' in node else body
+
+    return build(root)
+
+
+class ReviewClassifier:
+    """Problem type, invalid-review and impact rules compiled from one rules file."""
+
+    def __init__(self, rules: Dict):
+        self.review_matcher = KeywordMatcher({
+            'problem_type': rules.get('problem_types', []),
+            'invalid': rules.get('invalid_reviews', []),
+        })
+        # Impact keywords are matched case-sensitively, as before
+        self.impact_matcher = KeywordMatcher({'impact': rules.get('impact_keywords', [])},
+                                             ignore_case=False)
+
+    @classmethod
+    def from_file(cls, rules_path: str = DEFAULT_RULES_PATH) -> "ReviewClassifier":
+        with open(rules_path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def classify(self, body: str) -> ReviewClassification:
+        """Classify a review body: problem type (and its rule) plus any invalid-review rule."""
+        hits = self.review_matcher.scan(body)
+        problem_rule = hits.get('problem_type')
+        return ReviewClassification(
+            problem_rule.value if problem_rule else DEFAULT_PROBLEM_TYPE,
+            problem_rule,
+            hits.get('invalid'),
+        )
+
+    def find_impact(self, text: str) -> Optional[RuleMatch]:
+        """Highest-priority impact keyword in text, or None."""
+        return self.impact_matcher.scan(text).get('impact')
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Duplicate and near-duplicate review detection for the review report generator.
+
+Bot reviews and templated comments repeat almost word for word across many
+PRs. Review bodies are normalized (case, whitespace, numbers, commit hashes,
+URLs) and grouped by the hash of the normalized text; bodies that differ in a
+few words are joined to an existing group by a 64-bit SimHash within a small
+Hamming distance. Summarization then runs once per group; classification once
+per distinct text in it (see same_text_key).
+"""
+
+import hashlib
+import re
+from typing import Dict, Hashable, List, Optional, Set
+
+
+# Bodies within this many differing SimHash bits are near-duplicates
+DEFAULT_MAX_DISTANCE = 6
+# SimHash is unreliable for very short texts: below this many shingles only exact matches count
+MIN_SHINGLES = 8
+
+FINGERPRINT_BITS = 64
+# _BIT_OF[bit]: byte translation table mapping every byte value to its bit `bit` (0 or 1)
+_BIT_OF = [bytes(value >> bit & 1 for value in range(256)) for bit in range(8)]
+
+URL_PATTERN = re.compile(r'https?://\S+')
+COMMIT_HASH_PATTERN = re.compile(r'\b[0-9a-f]{7,40}\b')
+NUMBER_PATTERN = re.compile(r'\d+')
+# ASCII words, or single CJK characters (Chinese text has no spaces between words)
+TOKEN_PATTERN = re.compile(r'[a-z0-9_<>]+|[^\W\d_a-z]', re.UNICODE)
+
+
+def normalize_review(body: str) -> str:
+    """Lowercase body with URLs, commit hashes and numbers replaced and whitespace collapsed."""
+    text = URL_PATTERN.sub('<url>', body.lower())
+    text = COMMIT_HASH_PATTERN.sub('<sha>', text)
+    text = NUMBER_PATTERN.sub('0', text)
+    return ' '.join(text.split())
+
+
+def same_text_key(body: str) -> str:
+    """
+    Key under which bodies are the same text to the keyword rules: lowercased and stripped.
+
+    Unlike normalize_review, URLs and numbers are kept (they can hold a keyword),
+    and so is inner whitespace (multi-word keywords such as "force merge" only
+    match a single space).
+    """
+    return body.strip().lower()
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash over token bigrams of normalized text, or None when text is too short."""
+    tokens = TOKEN_PATTERN.findall(text)
+    shingles = set(map(' '.join, zip(tokens, tokens[1:])))
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    digests = b''.join([hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles])
+    # Per-bit majority vote, counted column-wise: byte i of every digest, then each of its bits
+    half = len(shingles) // 2
+    fingerprint = 0
+    for i in range(8):
+        column = digests[i::8]
+        for bit in range(8):
+            if column.translate(_BIT_OF[bit]).count(1) > half:
+                fingerprint |= 1 << (8 * i + bit)
+    return fingerprint
+
+
+class ReviewGroup:
+    """Review bodies that are the same review: the first body seen represents them all."""
+
+    def __init__(self, representative: str, fingerprint: Optional[int]):
+        self.representative = representative
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.near_duplicates = 0
+        # Keys (e.g. (repo, PR number)) of the places the review occurs
+        self.sources: Set[Hashable] = set()
+        # Results computed once for the group (classification, ...)
+        self.results: Dict[str, object] = {}
+
+
+class ReviewDeduplicator:
+    """Assign review bodies to groups of exact (normalized) and near (SimHash) duplicates."""
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.groups: List[ReviewGroup] = []
+        self._by_body: Dict[str, ReviewGroup] = {}
+        self._by_normalized: Dict[str, ReviewGroup] = {}
+        # Pigeonhole: fingerprints within max_distance bits agree on at least one of
+        # max_distance + 1 bands, so only groups sharing a band are compared
+        bands = max_distance + 1
+        self._band_ranges = [(FINGERPRINT_BITS * band // bands, FINGERPRINT_BITS * (band + 1) // bands)
+                             for band in range(bands)]
+        self._bands: List[Dict[int, List[ReviewGroup]]] = [{} for _ in range(bands)]
+
+    def add(self, body: str, source: Hashable = None) -> ReviewGroup:
+        """Record one occurrence of body (at source) and return its group."""
+        group = self._by_body.get(body)
+        if group is None:
+            group = self._assign(body)
+            self._by_body[body] = group
+        group.count += 1
+        if source is not None:
+            group.sources.add(source)
+        return group
+
+    def group_of(self, body: str) -> Optional[ReviewGroup]:
+        return self._by_body.get(body)
+
+    def representative(self, body: str) -> str:
+        """The body standing in for body's group (body itself when it was never added)."""
+        group = self._by_body.get(body)
+        return group.representative if group else body
+
+    def _assign(self, body: str) -> ReviewGroup:
+        normalized = normalize_review(body)
+        key = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+        group = self._by_normalized.get(key)
+        if group:
+            return group
+
+        fingerprint = simhash(normalized)
+        if fingerprint is not None:
+            group = self._find_near(fingerprint)
+            if group:
+                group.near_duplicates += 1
+                self._by_normalized[key] = group
+                return group
+
+        group = ReviewGroup(body, fingerprint)
+        self.groups.append(group)
+        self._by_normalized[key] = group
+        if fingerprint is not None:
+            for band, index in zip(self._band_keys(fingerprint), self._bands):
+                index.setdefault(band, []).append(group)
+        return group
+
+    def _find_near(self, fingerprint: int) -> Optional[ReviewGroup]:
+        best, best_distance = None, self.max_distance + 1
+        for band, index in zip(self._band_keys(fingerprint), self._bands):
+            for group in index.get(band, ()):
+                distance = (group.fingerprint ^ fingerprint).bit_count()
+                if distance < best_distance:
+                    best, best_distance = group, distance
+        return best
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        return [fingerprint >> start & ((1 << (end - start)) - 1) for start, end in self._band_ranges]
+
+    def stats(self) -> Dict[str, int]:
+        """Occurrence, distinct body, group and near-duplicate counts."""
+        return {
+            'reviews': sum(group.count for group in self.groups),
+            'bodies': len(self._by_body),
+            'groups': len(self.groups),
+            'near_duplicates': sum(group.near_duplicates for group in self.groups),
+        }
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Columnar export of review report data for BI ingestion (Parquet, Arrow, JSONL, csv).
+
+Each exported record is a report row (same column names, without the per-sheet
+序号) plus raw fields the report flattens away: repo, PR number and metadata,
+review ID and source, reviewer, full timestamps and the classification.
+Records are buffered and written one row group at a time while the report
+streams, so memory stays bounded. pyarrow is only imported for Parquet and
+Arrow output.
+"""
+
+import csv
+import json
+import os
+from typing import Dict, List, Optional
+
+from report_writer import REPORT_COLUMNS, SERIAL_COLUMN
+
+
+EXPORT_FORMATS = ("parquet", "arrow", "jsonl", "csv")
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+# Records per row group (Parquet/Arrow) or per buffered write (jsonl/csv)
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+# Raw fields after the report columns: name -> type ("string", "int" or "timestamp").
+# Timestamps are ISO 8601 strings in jsonl/csv and UTC timestamps in Parquet/Arrow.
+RAW_FIELDS = {
+    'repo': 'string',
+    'pr_number': 'int',
+    'pr_title': 'string',
+    'pr_url': 'string',
+    'pr_author': 'string',
+    'base_branch': 'string',
+    'merged_by': 'string',
+    'pr_created_at': 'timestamp',
+    'pr_merged_at': 'timestamp',
+    'review_id': 'string',
+    'review_source': 'string',
+    'reviewer': 'string',
+    'review_submitted_at': 'timestamp',
+    'problem_type_id': 'int',
+    'classification_rule': 'string',
+    'location': 'string',
+    'replies': 'int',
+}
+
+EXPORT_COLUMNS = [name for name in REPORT_COLUMNS if name != SERIAL_COLUMN] + list(RAW_FIELDS)
+
+
+def resolve_export_format(path: str) -> Optional[str]:
+    """Export format from path's extension, or None when it is not one of EXPORT_FORMATS."""
+    ext = os.path.splitext(path)[1].lstrip('.').lower()
+    return ext if ext in EXPORT_FORMATS else None
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    types = {'string': pa.string(), 'int': pa.int64(), 'timestamp': pa.timestamp('ms', tz='UTC')}
+    return pa.schema([(name, types[RAW_FIELDS.get(name, 'string')]) for name in EXPORT_COLUMNS])
+
+
+class ReviewExporter:
+    """
+    Stream export records (see EXPORT_COLUMNS) to a Parquet, Arrow IPC, jsonl or csv file.
+
+    The file is written even when no record is appended, so consumers always
+    find the schema. Creating a Parquet or Arrow exporter raises ImportError
+    when pyarrow is not installed.
+    """
+
+    def __init__(self, path: str, export_format: Optional[str] = None,
+                 row_group_size: int = DEFAULT_ROW_GROUP_SIZE):
+        self.path = path
+        self.export_format = export_format or resolve_export_format(path)
+        if self.export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {path}")
+        self.row_group_size = max(1, row_group_size)
+        self.schema = _arrow_schema() if self.export_format in COLUMNAR_FORMATS else None
+        self.buffer: List[Dict] = []
+        self.record_count = 0
+        self.file = None
+        self.writer = None
+        self.closed = False
+
+    def append(self, record: Dict):
+        self.buffer.append(record)
+        self.record_count += 1
+        if len(self.buffer) >= self.row_group_size:
+            self._flush()
+
+    def _open(self):
+        if self.export_format == "parquet":
+            import pyarrow.parquet as pq
+
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        elif self.export_format == "arrow":
+            import pyarrow as pa
+
+            self.file = pa.OSFile(self.path, 'wb')
+            self.writer = pa.ipc.new_file(self.file, self.schema)
+        else:
+            # utf-8-sig so Excel opens Chinese csv content correctly, as for csv reports
+            encoding = 'utf-8-sig' if self.export_format == 'csv' else 'utf-8'
+            self.file = open(self.path, 'w', encoding=encoding, newline='')
+            if self.export_format == 'csv':
+                self.writer = csv.DictWriter(self.file, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+                self.writer.writeheader()
+
+    def _flush(self):
+        if self.file is None and self.writer is None:
+            self._open()
+        if not self.buffer:
+            return
+        if self.schema is not None:
+            self.writer.write_table(self._to_table(self.buffer))
+        elif self.writer:
+            self.writer.writerows(self.buffer)
+        else:
+            self.file.write(''.join(
+                json.dumps({name: record.get(name) for name in EXPORT_COLUMNS}, ensure_ascii=False) + '\n'
+                for record in self.buffer))
+        self.buffer = []
+
+    def _to_table(self, records: List[Dict]):
+        """One row group: columns built from the records, ISO timestamps parsed by Arrow in one cast per column."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        columns = []
+        for field in self.schema:
+            values = [record.get(field.name) for record in records]
+            if pa.types.is_timestamp(field.type):
+                # Missing times are '' in the report data
+                columns.append(pc.cast(pa.array([value or None for value in values], pa.string()), field.type))
+            else:
+                columns.append(pa.array(values, field.type))
+        return pa.Table.from_arrays(columns, schema=self.schema)
+
+    def close(self) -> int:
+        """Write the last row group and finish the file; returns the number of records exported."""
+        # A second _flush() would reopen the path and truncate the finished export
+        if self.closed:
+            return self.record_count
+        self.closed = True
+        self._flush()
+        if self.schema is not None:
+            self.writer.close()
+        if self.file is not None:
+            self.file.close()
+        self.file = self.writer = None
+        return self.record_count
@@ -0,0 +1,6 @@
+"""Shared setup: the skill's modules are imported as top-level modules, like generator.py does."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
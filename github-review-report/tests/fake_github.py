@@ -0,0 +1,124 @@
+"""
+Local fake GitHub API server for the tests (stdlib http.server, no network).
+
+Serves canned REST list pages with Link headers and ETags (answering
+If-None-Match with 304), GraphQL answers from a callable, and injected
+failure responses (rate limits, 5xx) ahead of the normal answer for a path.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeGitHub:
+    """GitHub API stand-in on 127.0.0.1; use as a context manager."""
+
+    def __init__(self):
+        # REST path -> list of pages (each a JSON-serializable body)
+        self.pages: Dict[str, List] = {}
+        # (query, variables) -> GraphQL response body
+        self.graphql_handler: Optional[Callable[[str, Dict], Dict]] = None
+        # path -> queued (status, headers, body) answers served before the normal one
+        self.failures: Dict[str, List[tuple]] = {}
+        # (method, path with query, headers) of every request received
+        self.requests: List[tuple] = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05},
+                                       daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self) -> 'FakeGitHub':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def fail(self, path: str, status: int, headers: Optional[Dict] = None, body: str = '', times: int = 1):
+        """Answer the next `times` requests for path with status instead of the normal response."""
+        self.failures.setdefault(path, []).extend([(status, headers or {}, body)] * times)
+
+    def rate_limit(self, path: str, times: int = 1):
+        """Answer the next requests for path with a primary rate-limit 403 that may be retried at once."""
+        self.fail(path, 403, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time())),
+                              'Retry-After': '0'},
+                  '{"message": "API rate limit exceeded"}', times)
+
+    def requested(self, method: str, path: str) -> List[tuple]:
+        return [request for request in self.requests
+                if request[0] == method and urlsplit(request[1]).path == path]
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: str = '', headers: Optional[Dict] = None):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.send_header('X-RateLimit-Limit', '5000')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _injected_failure(self, path: str) -> bool:
+                with fake.lock:
+                    fake.requests.append((self.command, self.path, dict(self.headers)))
+                    queued = fake.failures.get(path)
+                    failure = queued.pop(0) if queued else None
+                if failure:
+                    self._send(failure[0], failure[2], failure[1])
+                return failure is not None
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if self._injected_failure(parts.path):
+                    return
+                pages = fake.pages.get(parts.path)
+                if pages is None:
+                    self._send(404, '{"message": "Not Found"}')
+                    return
+                query = parse_qs(parts.query)
+                page = int(query.get('page', ['1'])[0])
+                body = json.dumps(pages[page - 1])
+                etag = '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"'
+                headers = {'ETag': etag, 'X-RateLimit-Remaining': '4999', 'X-RateLimit-Resource': 'core',
+                           'X-RateLimit-Reset': str(int(time.time()) + 3600)}
+                if page < len(pages):
+                    query['page'] = [str(page + 1)]
+                    next_query = '&'.join(f"{key}={values[0]}" for key, values in sorted(query.items()))
+                    headers['Link'] = f'<{fake.url}{parts.path}?{next_query}>; rel="next"'
+                if self.headers.get('If-None-Match') == etag:
+                    self._send(304, '', headers)
+                else:
+                    self._send(200, body, headers)
+
+            def do_POST(self):
+                parts = urlsplit(self.path)
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if self._injected_failure(parts.path):
+                    return
+                if parts.path != '/graphql' or fake.graphql_handler is None:
+                    self._send(404, '{"message": "Not Found"}')
+                    return
+                body = fake.graphql_handler(payload.get('query', ''), payload.get('variables') or {})
+                self._send(200, json.dumps(body), {'X-RateLimit-Remaining': '4999',
+                                                   'X-RateLimit-Resource': 'graphql',
+                                                   'X-RateLimit-Reset': str(int(time.time()) + 3600)})
+
+        return Handler
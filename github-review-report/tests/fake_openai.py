@@ -0,0 +1,99 @@
+"""
+Local mock of an OpenAI-compatible chat completions endpoint for the tests.
+
+Answers each review of a batch with a canned summary, tracks how many
+requests are in flight at once, and returns a malformed answer for batches
+containing MALFORMED_MARKER. Injected failure statuses are served first.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+MALFORMED_MARKER = "MALFORMED"
+
+
+class FakeOpenAI:
+    """Chat completions stand-in on 127.0.0.1; use as a context manager."""
+
+    def __init__(self, delay: float = 0.0):
+        # Seconds each request takes, so concurrent requests overlap
+        self.delay = delay
+        # Review count of every batch received
+        self.batch_sizes: List[int] = []
+        self.models: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # Queued (status, Retry-After) answers served before the normal ones
+        self.failures: List[tuple] = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05},
+                                       daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def __enter__(self) -> 'FakeOpenAI':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @staticmethod
+    def summary_of(review: str) -> str:
+        return f"摘要:{review}"
+
+    def _answer(self, payload: dict) -> str:
+        items = json.loads(payload['messages'][-1]['content'])
+        with self.lock:
+            self.batch_sizes.append(len(items))
+            self.models.append(payload.get('model'))
+        if any(MALFORMED_MARKER in item['review'] for item in items):
+            return "抱歉, 我无法处理这些内容"
+        results = [{'id': item['id'], 'problem_description': self.summary_of(item['review']),
+                    'impact_analysis': "影响"} for item in items]
+        # Wrapped in a fence, as some endpoints do
+        return "```json\n" + json.dumps({'results': results}, ensure_ascii=False) + "\n```"
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: dict = None):
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                with fake.lock:
+                    failure = fake.failures.pop(0) if fake.failures else None
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    time.sleep(fake.delay)
+                    if failure:
+                        self._send(failure[0], {'error': {'message': 'overloaded'}},
+                                   {'Retry-After': str(failure[1])})
+                        return
+                    content = fake._answer(payload)
+                    self._send(200, {'choices': [{'message': {'role': 'assistant', 'content': content}}]})
+                finally:
+                    with fake.lock:
+                        fake.in_flight -= 1
+
+        return Handler
@@ -0,0 +1,109 @@
+"""LLM summarization against a local mock OpenAI-compatible endpoint."""
+
+import pytest
+
+import generator
+from ai_summarizer import LLMSummarizer
+from fake_openai import MALFORMED_MARKER, FakeOpenAI
+from review_cache import ReviewCache
+
+
+@pytest.fixture
+def llm():
+    with FakeOpenAI(delay=0.05) as fake:
+        yield fake
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ReviewCache(str(tmp_path / 'cache.sqlite3'))
+    yield cache
+    cache.close()
+
+
+def bodies(count, prefix="review"):
+    return [f"{prefix} {i}: the buffer allocated in init() is never freed" for i in range(count)]
+
+
+def test_batches_within_concurrency(llm):
+    summarizer = LLMSummarizer(base_url=llm.base_url, model='m', batch_size=10, concurrency=2)
+
+    results = summarizer.summarize(bodies(45) + bodies(5))
+
+    assert len(results) == 45
+    assert all(summary['problem_description'] == FakeOpenAI.summary_of(body) for body, summary in results.items())
+    # Duplicates are sent once, in batches of at most batch_size, never more than concurrency at once
+    assert sorted(llm.batch_sizes) == [5, 10, 10, 10, 10]
+    assert llm.max_in_flight == 2
+    assert summarizer.request_count == 5
+
+
+def test_cache_hit_on_content_hash(llm, cache):
+    LLMSummarizer(base_url=llm.base_url, model='m', batch_size=10).summarize(bodies(3), cache=cache)
+    assert llm.batch_sizes == [3]
+
+    again = LLMSummarizer(base_url=llm.base_url, model='m', batch_size=10)
+    results = again.summarize(bodies(4), cache=cache)
+    assert len(results) == 4
+    assert again.cached_count == 3
+    # Only the new body was sent
+    assert llm.batch_sizes == [3, 1]
+
+    # The hash covers the model: another model summarizes again
+    other = LLMSummarizer(base_url=llm.base_url, model='other', batch_size=10)
+    other.summarize(bodies(3), cache=cache)
+    assert other.cached_count == 0
+    assert llm.batch_sizes == [3, 1, 3]
+
+
+def test_offline_uses_cache_only(llm, cache):
+    LLMSummarizer(base_url=llm.base_url, model='m').summarize(bodies(2), cache=cache)
+
+    results = LLMSummarizer(base_url=llm.base_url, model='m').summarize(bodies(3), cache=cache, cached_only=True)
+
+    assert len(results) == 2
+    assert llm.batch_sizes == [2]
+
+
+def test_malformed_response_falls_back(llm, cache):
+    malformed = bodies(3, prefix=MALFORMED_MARKER)
+    summarizer = LLMSummarizer(base_url=llm.base_url, model='m', batch_size=3, concurrency=2)
+
+    results = summarizer.summarize(bodies(3) + malformed, cache=cache)
+
+    # The malformed batch is left out for the heuristic summaries and not cached
+    assert set(results) == set(bodies(3))
+    assert summarizer.failed_count == 3
+    assert LLMSummarizer(base_url=llm.base_url, model='m').summarize(malformed, cache=cache, cached_only=True) == {}
+
+
+def test_overloaded_endpoint_retried(llm):
+    llm.failures.append((503, 0))
+    summarizer = LLMSummarizer(base_url=llm.base_url, model='m')
+
+    assert len(summarizer.summarize(bodies(2))) == 2
+    assert summarizer.request_count == 2
+
+
+def ai_review(body):
+    return {'content': body, 'problem_type': 12, 'rule': None, 'reviewer': 'sourcery-ai', 'group': None,
+            'review_time': '2025-03-02T10:00:00Z', 'source': 'review', 'location': '', 'url': None}
+
+
+def test_summarize_stage(llm, cache, monkeypatch):
+    monkeypatch.setattr(generator, '_summarizer',
+                        LLMSummarizer(base_url=llm.base_url, model='m', batch_size=1, concurrency=2))
+    good, bad = bodies(1)[0], bodies(1, prefix=MALFORMED_MARKER)[0]
+    pr = {'number': 7, 'url': 'https://github.com/o/r/pull/7', 'createdAt': '2025-03-01T00:00:00Z',
+          'mergedAt': '2025-03-03T00:00:00Z', 'author': {'login': 'dev'}}
+    items = [('o/r', dict(pr, number=number), [ai_review(body)]) for number, body in ((1, good), (2, bad))]
+
+    released = list(generator.summarize_pr_reviews(iter(items), cache))
+
+    assert [item[1]['number'] for item in released] == [1, 2]
+    rows = [generator.build_review_row('o/r', 'm', item[1], item[2][0]) for item in released]
+    assert rows[0]['问题描述'] == FakeOpenAI.summary_of(good)
+    assert rows[0]['影响分析'] == "影响"
+    # No summary for the malformed answer: the heuristic 50-character summary is used
+    assert released[1][2][0]['summary'] is None
+    assert rows[1]['问题描述'] == generator.summarize_for_ai(bad, max_length=50)
@@ -0,0 +1,68 @@
+"""Requests that keep failing are skipped with a warning instead of ending the run."""
+
+import re
+
+import pytest
+
+import generator
+from fake_github import FakeGitHub
+from github_client import GitHubClient
+from rate_limiter import RateLimiter
+
+MAX_RETRIES = 1
+PRS = [{'number': number, 'title': f"PR {number}", 'createdAt': '2025-03-01T00:00:00Z'} for number in (1, 2)]
+
+
+def pr_node(number):
+    empty = {'pageInfo': {'hasNextPage': False, 'endCursor': None}, 'nodes': []}
+    return {'number': number, 'title': f"PR {number}", 'url': f"https://github.com/o/r/pull/{number}",
+            'createdAt': '2025-03-01T00:00:00Z', 'mergedAt': '2025-03-02T00:00:00Z',
+            'author': {'login': 'dev'}, 'mergedBy': {'login': 'dev'}, 'reviews': empty, 'comments': empty}
+
+
+def answer_details(query, variables):
+    numbers = [int(number) for number in re.findall(r'pr(\d+): pullRequest', query)]
+    return {'data': {'repository': {f"pr{number}": pr_node(number) for number in numbers}}}
+
+
+@pytest.fixture
+def github(monkeypatch):
+    with FakeGitHub() as fake:
+        fake.graphql_handler = answer_details
+        fake.pages['/repos/o/r/pulls/comments'] = [[]]
+        client = GitHubClient('secret', api_url=fake.url,
+                              rate_limiter=RateLimiter(max_retries=MAX_RETRIES, transient_backoff=0))
+        monkeypatch.setattr(generator, '_github_client', client)
+        yield fake
+
+
+def fetch(**kwargs):
+    return {pr['number']: details for _, pr, details in
+            generator.iter_pr_details({'o/r': PRS}, None, page_size=1, concurrency=1, **kwargs)}
+
+
+def test_failed_detail_page_skipped(github, capsys):
+    # Every attempt at the first page fails
+    github.fail('/graphql', 502, times=MAX_RETRIES + 1)
+
+    details = fetch()
+
+    assert details[1] is None
+    assert details[2]['reviewComments'] == []
+    assert '跳过该页' in capsys.readouterr().out
+
+
+def test_failed_comment_listing_skipped(github):
+    github.fail('/repos/o/r/pulls/comments', 500, times=MAX_RETRIES + 1)
+
+    details = fetch()
+
+    # Left without reviewComments, so a cached run fetches them again
+    assert all('reviewComments' not in pr for pr in details.values())
+
+
+def test_failed_search_skipped(github, capsys):
+    github.fail('/search/issues', 503, times=MAX_RETRIES + 1)
+
+    assert generator.search_merged_prs('o/r', 'merged:2025-01-01..2025-01-31') == ([], False, 0)
+    assert 'GitHub搜索失败' in capsys.readouterr().out
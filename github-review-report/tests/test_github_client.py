@@ -0,0 +1,123 @@
+"""GitHubClient against the local fake GitHub API: paging, GraphQL, ETag revalidation and rate limits."""
+
+import pytest
+
+from fake_github import FakeGitHub
+from github_client import GitHubAPIError, GitHubClient
+from rate_limiter import RateLimiter
+from review_cache import ReviewCache
+
+COMMENTS_PATH = '/repos/o/r/pulls/comments'
+PAGES = [[{'id': 1}, {'id': 2}], [{'id': 3}, {'id': 4}], [{'id': 5}]]
+
+
+@pytest.fixture
+def github():
+    with FakeGitHub() as fake:
+        fake.pages[COMMENTS_PATH] = PAGES
+        yield fake
+
+
+def test_paginate_follows_link(github):
+    client = GitHubClient('secret', api_url=github.url)
+
+    items = client.rest_paginate('repos/o/r/pulls/comments', {'since': '2025-01-01T00:00:00Z'})
+
+    assert [item['id'] for item in items] == [1, 2, 3, 4, 5]
+    requests = github.requested('GET', COMMENTS_PATH)
+    assert len(requests) == 3
+    assert 'since=2025-01-01T00%3A00%3A00Z' in requests[0][1]
+    assert requests[0][2]['Authorization'] == 'bearer secret'
+    assert client.rest_paginate('repos/o/r/pulls/comments', max_items=3) == [{'id': 1}, {'id': 2}, {'id': 3}]
+
+
+def test_graphql(github):
+    github.graphql_handler = lambda query, variables: {'data': {'repository': {'name': variables['name']}}}
+    client = GitHubClient('secret', api_url=github.url)
+
+    body = client.graphql('query($name: String!) { repository { name } }', {'name': 'r'})
+
+    assert body == {'data': {'repository': {'name': 'r'}}}
+    assert client.rate_limiter.quota['graphql']['remaining'] == 4999
+
+
+def test_enterprise_graphql_url():
+    assert GitHubClient('secret', api_url='https://ghe.example/api/v3').graphql_url == 'https://ghe.example/api/graphql'
+
+
+def test_etag_revalidation(github, tmp_path):
+    cache = ReviewCache(str(tmp_path / 'cache.sqlite3'))
+    try:
+        first = GitHubClient('secret', api_url=github.url, http_cache=cache)
+        assert len(first.rest_paginate('repos/o/r/pulls/comments')) == 5
+        assert first.not_modified_count == 0
+
+        second = GitHubClient('secret', api_url=github.url, http_cache=cache)
+        assert [item['id'] for item in second.rest_paginate('repos/o/r/pulls/comments')] == [1, 2, 3, 4, 5]
+        # Every page answered 304 from the cached ETag, Link headers included
+        assert second.not_modified_count == 3
+        revalidations = github.requested('GET', COMMENTS_PATH)[3:]
+        assert all('If-None-Match' in headers for _, _, headers in revalidations)
+    finally:
+        cache.close()
+
+
+def test_rate_limit_retried(github):
+    github.rate_limit(COMMENTS_PATH, times=2)
+    github.fail('/graphql', 429, {'Retry-After': '0'}, '{"message": "secondary rate limit"}')
+    github.graphql_handler = lambda query, variables: {'data': {}}
+    client = GitHubClient('secret', api_url=github.url)
+
+    assert len(client.rest_paginate('repos/o/r/pulls/comments')) == 5
+    assert client.graphql('{ viewer { login } }') == {'data': {}}
+    assert len(github.requested('GET', COMMENTS_PATH)) == 5
+    assert len(github.requested('POST', '/graphql')) == 2
+
+
+def test_rate_limit_retries_exhausted(github):
+    github.rate_limit(COMMENTS_PATH, times=3)
+    client = GitHubClient('secret', api_url=github.url, rate_limiter=RateLimiter(max_retries=2))
+
+    with pytest.raises(GitHubAPIError) as error:
+        client.rest_paginate('repos/o/r/pulls/comments')
+    assert error.value.status_code == 403
+
+
+def test_not_found(github):
+    client = GitHubClient('secret', api_url=github.url)
+
+    with pytest.raises(GitHubAPIError) as error:
+        client.rest_get('repos/o/missing')
+    assert error.value.status_code == 404
+
+
+def test_server_errors_retried(github):
+    github.fail(COMMENTS_PATH, 502, times=2)
+    github.fail('/graphql', 503, {'Retry-After': '0'})
+    github.graphql_handler = lambda query, variables: {'data': {}}
+    client = GitHubClient('secret', api_url=github.url, rate_limiter=RateLimiter(transient_backoff=0))
+
+    assert len(client.rest_paginate('repos/o/r/pulls/comments')) == 5
+    assert client.graphql('{ viewer { login } }') == {'data': {}}
+    assert len(github.requested('GET', COMMENTS_PATH)) == 5
+
+
+def test_server_error_retries_exhausted(github):
+    github.fail(COMMENTS_PATH, 500, times=3)
+    client = GitHubClient('secret', api_url=github.url,
+                          rate_limiter=RateLimiter(max_retries=2, transient_backoff=0))
+
+    with pytest.raises(GitHubAPIError) as error:
+        client.rest_paginate('repos/o/r/pulls/comments')
+    assert error.value.status_code == 500
+    assert len(github.requested('GET', COMMENTS_PATH)) == 3
+
+
+def test_network_error_retried_then_raised():
+    with FakeGitHub() as fake:
+        url = fake.url
+    # Nothing listens on the port any more
+    client = GitHubClient('secret', api_url=url, rate_limiter=RateLimiter(max_retries=2, transient_backoff=0))
+
+    with pytest.raises(GitHubAPIError, match="Request failed"):
+        client.rest_get('repos/o/r')
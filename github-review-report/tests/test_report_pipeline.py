@@ -0,0 +1,164 @@
+"""Stage pipeline backpressure and failures, and resuming an interrupted report from its checkpoint."""
+
+import os
+import threading
+import time
+
+import pytest
+from openpyxl import load_workbook
+
+import generator
+from report_pipeline import run_pipeline
+from report_writer import PARTIAL_SUFFIX
+
+QUEUE_SIZE = 2
+PR_COUNT = 7
+# The interrupted run stops at this PR's second review, after checkpoints at PRs 2 and 4
+INTERRUPTED_PR = 5
+CHECKPOINT_INTERVAL = 2
+KEY = {'report': 'test'}
+
+
+class Crash(Exception):
+    """Stands in for the run being killed (KeyboardInterrupt would stop pytest itself)."""
+
+
+def counting_source(produced, closed):
+    try:
+        for number in range(1000):
+            produced.append(number)
+            yield number
+    finally:
+        closed.set()
+
+
+def test_bounded_queues_hold_back_the_source():
+    produced, closed = [], threading.Event()
+    items = run_pipeline(counting_source(produced, closed), [lambda items: (item * 2 for item in items)],
+                         queue_size=QUEUE_SIZE)
+
+    assert next(items) == 0
+    time.sleep(0.3)
+    # Two full queues plus an item in hand per thread, not the whole source
+    assert len(produced) <= 2 * QUEUE_SIZE + 3
+    items.close()
+    assert closed.wait(2)
+
+
+def test_stage_failure_reaches_consumer():
+    produced, closed = [], threading.Event()
+
+    def failing_stage(items):
+        for item in items:
+            if item == 3:
+                raise ValueError("stage failed")
+            yield item
+
+    received = []
+    errors = []
+
+    def consume():
+        try:
+            for item in run_pipeline(counting_source(produced, closed), [failing_stage, lambda items: items],
+                                     queue_size=QUEUE_SIZE):
+                received.append(item)
+        except ValueError as e:
+            errors.append(e)
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    consumer.join(5)
+
+    assert not consumer.is_alive()
+    assert received == [0, 1, 2]
+    assert [str(e) for e in errors] == ["stage failed"]
+    # The source upstream of the failure is stopped and closed as well
+    assert closed.wait(2)
+
+
+def pr(number):
+    return {'number': number, 'title': f"PR {number}", 'url': f"https://github.com/o/r/pull/{number}",
+            'createdAt': '2025-03-01T00:00:00Z', 'mergedAt': '2025-03-02T00:00:00Z',
+            'author': {'login': 'dev'}, 'mergedBy': {'login': 'lead'}}
+
+
+def details(number):
+    reviews = [{'id': f"r{number}-{index}", 'author': {'login': 'sourcery-ai'}, 'state': 'COMMENTED',
+                'submittedAt': f"2025-03-02T0{index}:00:00Z",
+                'body': f"PR {number} review {index}: 这里的内存在错误路径上没有释放, 请检查"}
+               for index in (1, 2)]
+    return {**pr(number), 'reviews': reviews, 'comments': {'nodes': []}, 'reviewComments': []}
+
+
+@pytest.fixture
+def fake_details(monkeypatch):
+    def iter_pr_details(todo, cache, **kwargs):
+        for repo, prs in todo.items():
+            for item in prs:
+                yield repo, item, details(item['number'])
+
+    monkeypatch.setattr(generator, 'iter_pr_details', iter_pr_details)
+
+
+def run_report(monkeypatch, output, output_format, resume=False, interrupt=False):
+    writer, checkpoint, state = generator.open_report(output, output_format, generator.TEMPLATE_PATH, KEY,
+                                                      resume=resume)
+    checkpoint.interval = CHECKPOINT_INTERVAL
+    build_review_row = generator.build_review_row
+
+    def interrupting(repo, module_name, pr, review):
+        if review['id'] == f"r{INTERRUPTED_PR}-2":
+            raise Crash
+        return build_review_row(repo, module_name, pr, review)
+
+    with monkeypatch.context() as patch:
+        if interrupt:
+            patch.setattr(generator, 'build_review_row', interrupting)
+        try:
+            generator.write_review_rows(writer, checkpoint, state,
+                                        {'o/r': [pr(number) for number in range(1, PR_COUNT + 1)]},
+                                        {'o/r': 'm'}, None, verbose=False)
+        except Crash:
+            # The process dies here: whatever was logged after the checkpoint is left on disk
+            (writer.partial if output_format == 'xlsx' else writer.file).close()
+            return checkpoint
+    writer.close()
+    checkpoint.remove()
+    return checkpoint
+
+
+def read_rows(output, output_format):
+    if output_format == 'xlsx':
+        return [row for row in load_workbook(output).worksheets[0].iter_rows(values_only=True)]
+    with open(output, encoding='utf-8-sig') as f:
+        return f.read()
+
+
+# The crashed run's write-only workbook is abandoned unsaved, and complains when collected
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnraisableExceptionWarning")
+@pytest.mark.parametrize('output_format', ['xlsx', 'jsonl', 'csv'])
+def test_resume_matches_uninterrupted_run(tmp_path, fake_details, monkeypatch, output_format):
+    expected_output = str(tmp_path / f"full.{output_format}")
+    run_report(monkeypatch, expected_output, output_format)
+
+    output = str(tmp_path / f"resumed.{output_format}")
+    checkpoint = run_report(monkeypatch, output, output_format, interrupt=True)
+
+    saved = checkpoint.load()
+    assert saved['done'] == {'o/r': [1, 2, 3, 4]}
+    # The first review of the interrupted PR was written after the checkpoint
+    log = output + PARTIAL_SUFFIX if output_format == 'xlsx' else output
+    with open(log, 'rb') as f:
+        assert len(f.read()) > saved['writer']['offset']
+
+    # Reopening cuts the log (or flat output) back to the checkpoint
+    writer, _, state = generator.open_report(output, output_format, generator.TEMPLATE_PATH, KEY, resume=True)
+    assert state['done'] == saved['done']
+    (writer.partial if output_format == 'xlsx' else writer.file).close()
+    assert os.path.getsize(log) == saved['writer']['offset']
+
+    checkpoint = run_report(monkeypatch, output, output_format, resume=True)
+
+    assert read_rows(output, output_format) == read_rows(expected_output, output_format)
+    assert not os.path.exists(output + PARTIAL_SUFFIX)
+    assert checkpoint.load() is None
@@ -0,0 +1,78 @@
+"""Template-styled xlsx report writing."""
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from report_writer import REPORT_COLUMNS, ReportTemplate, StreamingReportWriter
+
+SOURCES = ["commit log", "代码", "注释"]
+
+
+def list_validations(path, column):
+    ws = load_workbook(path).worksheets[0]
+    return [validation.formula1 for validation in ws.data_validations.dataValidation
+            if any(cell_range.min_col <= column <= cell_range.max_col for cell_range in validation.sqref.ranges)]
+
+
+def write_template(tmp_path, validation):
+    template = Workbook()
+    ws = template.active
+    ws.title = "问题管理"
+    ws.append(REPORT_COLUMNS)
+    ws.add_data_validation(validation)
+    template_path = str(tmp_path / 'template.xlsx')
+    template.save(template_path)
+    return template_path
+
+
+def write_report(tmp_path, template_validation):
+    template_path = write_template(tmp_path, template_validation)
+    output = str(tmp_path / 'report.xlsx')
+    writer = StreamingReportWriter(output, ReportTemplate(template_path), {'问题来源': SOURCES})
+    writer.append({'序号': 0, '问题来源': "代码"})
+    assert writer.close()
+    return output
+
+
+def test_fallback_list_despite_column_letter_substring(tmp_path):
+    column = REPORT_COLUMNS.index('问题来源') + 1
+    letter = get_column_letter(column)
+    # A validation on column A<letter> must not count as covering <letter>
+    other = DataValidation(type="list", formula1='"x,y"')
+    other.add(f"A{letter}2:A{letter}100")
+
+    output = write_report(tmp_path, other)
+
+    assert list_validations(output, column) == ['"' + ",".join(SOURCES) + '"']
+
+
+def test_template_validation_kept(tmp_path):
+    column = REPORT_COLUMNS.index('问题来源') + 1
+    letter = get_column_letter(column)
+    own = DataValidation(type="list", formula1='"a,b"')
+    own.add(f"{get_column_letter(column - 1)}2:{letter}100")
+
+    output = write_report(tmp_path, own)
+
+    assert list_validations(output, column) == ['"a,b"']
+
+
+def test_append_drops_stale_analytics(tmp_path, capsys):
+    import generator
+
+    template_path = write_template(tmp_path, DataValidation(type="list", formula1='"a,b"'))
+    output = str(tmp_path / 'report.xlsx')
+    writer = StreamingReportWriter(output, ReportTemplate(template_path))
+    writer.append({'序号': 0, '问题来源': "代码"})
+    writer.append_table(generator.ANALYTICS_SHEET, [{'范围': "全部", '评审数': 1}])
+    assert writer.close()
+
+    writer, _, _ = generator.open_report(output, 'xlsx', template_path, {}, append=True)
+    writer.append({'序号': 0, '问题来源': "注释"})
+    assert writer.close()
+
+    workbook = load_workbook(output)
+    assert generator.ANALYTICS_SHEET not in workbook.sheetnames
+    assert workbook.worksheets[0].max_row == 3
+    assert f"已删除过期的 {generator.ANALYTICS_SHEET}" in capsys.readouterr().out
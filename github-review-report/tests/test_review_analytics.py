@@ -0,0 +1,171 @@
+"""Review analytics: hand-computed percentiles per reviewer, repo and problem type, and the output shapes."""
+
+import json
+
+import pytest
+from openpyxl import load_workbook
+
+pytest.importorskip('numpy')
+
+import generator
+from report_writer import open_report_writer
+from review_analytics import ReviewAnalytics, analytics_table
+
+PERCENTILE_COLUMNS = [f"{label}P{p}(小时)" for label in ('首次Review', '合并', 'Review延迟') for p in (50, 90, 95)]
+LATENCY_KEYS = {'count', 'p50', 'p90', 'p95'}
+
+
+def at(hours):
+    """2025-03-01 plus whole hours in GitHub's time format."""
+    return f"2025-03-{1 + hours // 24:02d}T{hours % 24:02d}:00:00Z"
+
+
+def latency(count, p50=None, p90=None, p95=None):
+    return {'count': count, 'p50': p50, 'p90': p90, 'p95': p95}
+
+
+@pytest.fixture
+def analytics():
+    # Every PR is created at hour 0, so the times below are also the latencies
+    analytics = ReviewAnalytics()
+    analytics.add_pr('o/a', 1, at(0), at(2), at(10))
+    analytics.add_pr('o/a', 2, at(0), at(4), at(20))
+    # Merged without any review
+    analytics.add_pr('o/a', 3, at(0), None, at(30))
+    analytics.add_pr('o/b', 1, at(0), at(1), at(5))
+
+    analytics.add_review('o/a', 1, 'alice', '内存', at(2))
+    analytics.add_review('o/a', 1, 'bob', '日志', at(3))
+    analytics.add_review('o/a', 2, 'alice', '内存', at(4))
+    analytics.add_review('o/a', 2, 'alice', '日志', at(8))
+    analytics.add_review('o/b', 1, 'alice', '内存', at(1))
+    # No submission time: counted as a review, but not in any latency
+    analytics.add_review('o/b', 1, 'carol', '内存', None)
+    return analytics
+
+
+def test_overall(analytics):
+    overall = analytics.compute()['overall']
+
+    assert (overall['prs'], overall['reviewed_prs'], overall['reviews'], overall['reviewers']) == (4, 3, 6, 3)
+    # First reviews [1, 2, 4]: PR o/a#3 has none
+    assert overall['time_to_first_review_hours'] == latency(3, 2.0, 3.6, 3.8)
+    # Merges [5, 10, 20, 30]
+    assert overall['time_to_merge_hours'] == latency(4, 15.0, 27.0, 28.5)
+    # Reviews with a time [1, 2, 3, 4, 8]
+    assert overall['review_latency_hours'] == latency(5, 3.0, 6.4, 7.2)
+
+
+def test_by_reviewer(analytics):
+    by_reviewer = analytics.compute()['by_reviewer']
+
+    # alice [1, 2, 4, 8]
+    assert by_reviewer['alice'] == {'reviews': 4, 'prs': 3, 'repos': 2, 'review_latency_hours': latency(4, 3.0, 6.8, 7.4)}
+    assert by_reviewer['bob'] == {'reviews': 1, 'prs': 1, 'repos': 1, 'review_latency_hours': latency(1, 3.0, 3.0, 3.0)}
+    # carol's only review has no time: an empty latency group
+    assert by_reviewer['carol'] == {'reviews': 1, 'prs': 1, 'repos': 1, 'review_latency_hours': latency(0)}
+
+
+def test_by_repo(analytics):
+    by_repo = analytics.compute()['by_repo']
+
+    assert by_repo['o/a'] == {
+        'prs': 3, 'reviews': 4,
+        # [2, 4] without the unreviewed PR, merges [10, 20, 30], reviews [2, 3, 4, 8]
+        'time_to_first_review_hours': latency(2, 3.0, 3.8, 3.9),
+        'time_to_merge_hours': latency(3, 20.0, 28.0, 29.0),
+        'review_latency_hours': latency(4, 3.5, 6.8, 7.4),
+        'problem_types': {'内存': 2, '日志': 2},
+    }
+    assert by_repo['o/b'] == {
+        'prs': 1, 'reviews': 2,
+        'time_to_first_review_hours': latency(1, 1.0, 1.0, 1.0),
+        'time_to_merge_hours': latency(1, 5.0, 5.0, 5.0),
+        'review_latency_hours': latency(1, 1.0, 1.0, 1.0),
+        'problem_types': {'内存': 2},
+    }
+
+
+def test_by_problem_type(analytics):
+    by_type = analytics.compute()['by_problem_type']
+
+    # 内存 [1, 2, 4] plus carol's review without a time
+    assert by_type['内存'] == {'reviews': 4, 'share': 0.6667, 'prs': 3, 'review_latency_hours': latency(3, 2.0, 3.6, 3.8)}
+    assert by_type['日志'] == {'reviews': 2, 'share': 0.3333, 'prs': 2, 'review_latency_hours': latency(2, 5.5, 7.5, 7.75)}
+
+
+def test_pr_without_reviews():
+    analytics = ReviewAnalytics()
+    analytics.add_pr('o/r', 1, at(0), None, at(24))
+    result = analytics.compute()
+
+    overall = result['overall']
+    assert (overall['prs'], overall['reviewed_prs'], overall['reviews'], overall['reviewers']) == (1, 0, 0, 0)
+    assert overall['time_to_first_review_hours'] == latency(0)
+    assert overall['time_to_merge_hours'] == latency(1, 24.0, 24.0, 24.0)
+    assert result['by_repo']['o/r']['review_latency_hours'] == latency(0)
+    assert result['by_repo']['o/r']['problem_types'] == {}
+    assert result['by_reviewer'] == {} and result['by_problem_type'] == {}
+
+
+def test_no_data():
+    result = ReviewAnalytics().compute()
+
+    assert result['overall']['prs'] == 0
+    assert all(result['overall'][key] == latency(0) for key in
+               ('time_to_first_review_hours', 'time_to_merge_hours', 'review_latency_hours'))
+    assert result['by_repo'] == result['by_reviewer'] == result['by_problem_type'] == {}
+    assert [row['维度'] for row in analytics_table(result)] == ['全部']
+
+
+def test_json_shape(analytics):
+    result = json.loads(json.dumps(analytics.compute()))
+
+    assert set(result) == {'percentiles', 'overall', 'by_repo', 'by_reviewer', 'by_problem_type'}
+    assert result['percentiles'] == [50, 90, 95]
+    assert set(result['overall']) == {'prs', 'reviewed_prs', 'reviews', 'reviewers', 'time_to_first_review_hours',
+                                      'time_to_merge_hours', 'review_latency_hours'}
+    assert all(set(entry['review_latency_hours']) == LATENCY_KEYS for group in
+               ('by_repo', 'by_reviewer', 'by_problem_type') for entry in result[group].values())
+
+
+def test_table_rows(analytics):
+    rows = analytics_table(analytics.compute())
+
+    assert all(list(row) == ['维度', '名称', 'Review数', 'PR数', '占比'] + PERCENTILE_COLUMNS for row in rows)
+    assert [(row['维度'], row['名称'], row['Review数'], row['PR数']) for row in rows] == [
+        ('全部', '全部', 6, 4),
+        ('仓库', 'o/a', 4, 3),
+        ('仓库', 'o/b', 2, 1),
+        # Most reviews first
+        ('Reviewer', 'alice', 4, 3),
+        ('Reviewer', 'bob', 1, 1),
+        ('Reviewer', 'carol', 1, 1),
+        ('问题类型', '内存', 4, 3),
+        ('问题类型', '日志', 2, 2),
+        ('仓库问题类型', 'o/a / 内存', 2, None),
+        ('仓库问题类型', 'o/a / 日志', 2, None),
+        ('仓库问题类型', 'o/b / 内存', 2, None),
+    ]
+    assert [row['占比'] for row in rows if row['维度'] == '问题类型'] == [0.6667, 0.3333]
+    alice = rows[3]
+    assert (alice['Review延迟P50(小时)'], alice['Review延迟P90(小时)'], alice['首次ReviewP50(小时)']) == (3.0, 6.8, None)
+    assert rows[5]['Review延迟P50(小时)'] is None
+
+
+def test_write_analytics(analytics, tmp_path):
+    output = tmp_path / 'report.xlsx'
+    json_path = tmp_path / 'stats.json'
+    writer = open_report_writer(str(output), template_path=None)
+    writer.append({'序号': 1, '问题描述': '问题'})
+    generator.write_analytics(writer, analytics, str(json_path), {writer.default_sheet}, {'repo': 'o/a'})
+    writer.close()
+
+    saved = json.loads(json_path.read_text(encoding='utf-8'))
+    assert saved == {'repo': 'o/a', **analytics.compute()}
+
+    sheet = load_workbook(output)[generator.ANALYTICS_SHEET]
+    header, *values = sheet.iter_rows(values_only=True)
+    table = analytics_table(analytics.compute())
+    assert list(header) == list(table[0])
+    assert [list(row) for row in values] == [list(row.values()) for row in table]
@@ -0,0 +1,120 @@
+"""Keyword matching: priorities, ties, prefix and overlapping keywords, case handling."""
+
+import random
+import time
+
+import pytest
+
+from review_classifier import DEFAULT_PROBLEM_TYPE, KeywordMatcher, ReviewClassifier
+
+# Regression guard, not the target (see SKILL.md): 20k 300-character bodies take ~0.4 s
+BENCHMARK_BODIES = 20_000
+MAX_BENCHMARK_SECONDS = 2.0
+
+
+def rule(name, priority, keywords, problem_type=None):
+    return {'name': name, 'priority': priority, 'keywords': keywords, 'problem_type': problem_type}
+
+
+def best(matcher, text, category='type'):
+    match = matcher.scan(text).get(category)
+    return match and (match.rule, match.keyword)
+
+
+def test_priority_beats_position():
+    matcher = KeywordMatcher({'type': [rule('naming', 1, ['命名']), rule('memory', 5, ['内存'])]})
+
+    assert best(matcher, "命名不规范, 而且内存没有释放") == ('memory', '内存')
+
+
+def test_ties_go_to_the_keyword_listed_first():
+    matcher = KeywordMatcher({'type': [rule('format', 3, ['格式', '书写']), rule('naming', 3, ['命名'])]})
+
+    # Same priority: the earlier rule wins, and within a rule the earlier keyword
+    assert best(matcher, "命名和书写格式") == ('format', '格式')
+    assert best(matcher, "命名和书写") == ('format', '书写')
+    assert matcher.scan("命名和书写格式")['type'].position == 5
+
+
+def test_prefix_keywords():
+    # Listed first, the shorter keyword wins the tie at the same position
+    same_rule = KeywordMatcher({'type': [rule('security', 1, ['安全', '安全漏洞', '漏洞'])]})
+    assert best(same_rule, "存在安全漏洞") == ('security', '安全')
+
+    # The longest match's prefixes are hits too, in whichever rule ranks higher
+    split = [rule('vulnerability', 2, ['安全漏洞']), rule('security', 1, ['安全'])]
+    assert best(KeywordMatcher({'type': split}), "存在安全漏洞") == ('vulnerability', '安全漏洞')
+    split.reverse()
+    split[0]['priority'] = 3
+    assert best(KeywordMatcher({'type': split}), "存在安全漏洞") == ('security', '安全')
+
+
+def test_overlapping_keywords():
+    # "merge" starts inside the longer "force merge" match, which the scan steps over
+    matcher = KeywordMatcher({'invalid': [rule('merge-command', 2, ['merge']), rule('force', 1, ['force merge'])]})
+    assert best(matcher, "please force merge this", 'invalid') == ('merge-command', 'merge')
+
+    matcher = KeywordMatcher({'type': [rule('a', 1, ['ab']), rule('b', 2, ['bc'])]})
+    assert best(matcher, "xabcx") == ('b', 'bc')
+    # Lower-ranked keywords inside a match do not change the result
+    matcher = KeywordMatcher({'type': [rule('a', 2, ['ab']), rule('b', 1, ['bc'])]})
+    assert best(matcher, "xabcx") == ('a', 'ab')
+
+
+def test_categories_resolve_independently():
+    matcher = KeywordMatcher({'type': [rule('log', 1, ['日志'], 9)], 'invalid': [rule('approval', 1, ['lgtm'])]})
+
+    hits = matcher.scan("LGTM, 日志可以")
+
+    assert (hits['type'].rule, hits['type'].value) == ('log', 9)
+    assert hits['invalid'].keyword == 'lgtm'
+
+
+def test_duplicate_and_empty_keywords_rejected():
+    with pytest.raises(ValueError, match="more than one rule"):
+        KeywordMatcher({'type': [rule('a', 1, ['Merge']), rule('b', 2, ['merge'])]})
+    with pytest.raises(ValueError, match="empty keyword"):
+        KeywordMatcher({'type': [rule('a', 1, [''])]})
+
+
+def test_case_handling():
+    classifier = ReviewClassifier({
+        'problem_types': [rule('memory', 1, ['Memory'], 12)],
+        'invalid_reviews': [rule('approval', 1, ['LGTM'])],
+        'impact_keywords': [rule('bug', 1, ['Bug'])],
+    })
+
+    # Review rules ignore case
+    result = classifier.classify("memory leak, lgtm otherwise")
+    assert result.problem_type == 12
+    assert result.invalid_rule.rule == 'approval'
+    assert classifier.classify("nothing here").problem_type == DEFAULT_PROBLEM_TYPE
+    # Impact keywords are matched case-sensitively
+    assert classifier.find_impact("a bug here") is None
+    assert classifier.find_impact("a Bug here").keyword == 'Bug'
+
+
+def test_default_rules():
+    classifier = ReviewClassifier.from_file()
+
+    assert classifier.classify("这里存在内存泄漏").problem_rule.rule == 'memory'
+    assert classifier.classify("Ready to merge").invalid_rule.rule == 'merge-command'
+    # merge is listed first in its rule, so it wins over the longer /forcemerge it is part of
+    assert classifier.classify("请检查 /forcemerge").invalid_rule.keyword == 'merge'
+
+
+def test_throughput():
+    rng = random.Random(1)
+    words = "please check the return value before using this pointer and free the buffer".split()
+    chunks = ["这里的函数", "需要检查返回值", "否则可能崩溃", "命名不太规范", "内存", "日志", "lgtm"]
+    pieces = [word + " " for word in words] + chunks
+    bodies = ["".join(rng.choices(pieces, k=60))[:300] for _ in range(BENCHMARK_BODIES)]
+    classifier = ReviewClassifier.from_file()
+
+    start = time.perf_counter()
+    for body in bodies:
+        classifier.classify(body)
+    elapsed = time.perf_counter() - start
+
+    print(f"{BENCHMARK_BODIES} bodies of ~300 characters in {elapsed:.2f} s")
+    assert elapsed < MAX_BENCHMARK_SECONDS
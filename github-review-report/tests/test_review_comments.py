@@ -0,0 +1,66 @@
+"""Inline review threads from the REST pulls/comments listing."""
+
+import json
+import subprocess
+
+import generator
+
+
+SOURCERY_COMMENT = "Potential memory leak: the buffer allocated here is never freed on the error path."
+
+
+class FakeClient:
+    def __init__(self, items):
+        self.items = items
+
+    def rest_paginate(self, path, params):
+        return self.items
+
+
+def comment(login):
+    return {
+        'id': 11, 'in_reply_to_id': None, 'body': SOURCERY_COMMENT, 'path': 'src/main.cpp', 'line': 42,
+        'created_at': '2025-03-02T10:00:00Z', 'html_url': 'https://github.com/o/r/pull/7#discussion_r11',
+        'pull_request_url': 'https://api.github.com/repos/o/r/pulls/7', 'user': {'login': login},
+    }
+
+
+def test_bot_thread_produces_row(monkeypatch):
+    monkeypatch.setattr(generator, '_github_client', FakeClient([comment('sourcery-ai[bot]')]))
+
+    comments = generator.list_review_comments('o/r', '2025-01-01T00:00:00Z')
+    assert comments[7][0]['author'] == {'login': 'sourcery-ai'}
+
+    pr = {'number': 7, 'url': 'https://github.com/o/r/pull/7', 'createdAt': '2025-03-01T00:00:00Z',
+          'mergedAt': '2025-03-03T00:00:00Z', 'author': {'login': 'dev'}, 'reviewComments': comments[7]}
+    threads = generator.extract_review_threads(pr)
+    assert len(threads) == 1
+
+    row = generator.build_review_row('o/r', 'm', pr, threads[0])
+    assert row['提出人'] == 'sourcery-ai'
+    assert row['问题描述'].startswith('[src/main.cpp:42]')
+
+
+def test_user_login_unchanged(monkeypatch):
+    monkeypatch.setattr(generator, '_github_client', FakeClient([comment('octo[bot]x')]))
+
+    comments = generator.list_review_comments('o/r', '2025-01-01T00:00:00Z')
+    assert comments[7][0]['author'] == {'login': 'octo[bot]x'}
+
+
+def test_gh_listing_paced_on_core_quota(monkeypatch):
+    # Without an in-process client the listing runs `gh api <path> --paginate`, a REST call
+    monkeypatch.setattr(generator, '_github_client', None)
+    resources = []
+    monkeypatch.setattr(generator._rate_limiter, 'wait', resources.append)
+    outputs = {'api': json.dumps(comment('sourcery-ai[bot]')) + '\n', 'pr': '[]'}
+    monkeypatch.setattr(generator.subprocess, 'run', lambda cmd, **kwargs: subprocess.CompletedProcess(
+        cmd, 0, stdout=outputs[cmd[1]], stderr=''))
+
+    comments = generator.list_review_comments('o/r', '2025-01-01T00:00:00Z')
+    assert comments[7][0]['path'] == 'src/main.cpp'
+    assert resources == ['core']
+
+    # gh pr list searches through GraphQL
+    generator.run_gh_command(['pr', 'list'], json_fields='number')
+    assert resources == ['core', 'graphql']
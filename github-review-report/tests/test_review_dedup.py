@@ -0,0 +1,75 @@
+"""Duplicate grouping and how classification is shared within a group."""
+
+import generator
+from review_dedup import ReviewDeduplicator
+
+TEMPLATE = ("Please double check the handling in this function, the current code path {} when the configuration "
+            "file cannot be opened and the caller retries later, which happens on every login of a new user "
+            "session and also during the nightly synchronization job that the daemon schedules for all accounts "
+            "on the machine")
+
+
+def test_exact_and_near_duplicates():
+    groups = ReviewDeduplicator()
+    first = TEMPLATE.format("looks wrong")
+    exact = first.upper().replace(' ', '  ')
+    near = TEMPLATE.format("looks broken")
+
+    group = groups.add(first, ('o/r', 1))
+    assert groups.add(exact, ('o/r', 2)) is group
+    assert groups.add(near, ('o/r', 3)) is group
+    # A body that normalizes to a near-duplicate joins the same group
+    assert groups.add(near.upper(), ('o/r', 4)) is group
+    assert groups.stats() == {'reviews': 4, 'bodies': 4, 'groups': 1, 'near_duplicates': 1}
+
+
+def test_near_duplicate_classified_on_its_own():
+    groups = ReviewDeduplicator()
+    plain = TEMPLATE.format("looks wrong")
+    # Same template, but 内存 (memory) decides the problem type
+    memory = TEMPLATE.format("looks wrong 内存")
+    for number, body in enumerate((plain, memory, plain.upper())):
+        groups.add(body, ('o/r', number))
+    assert groups.group_of(memory) is groups.group_of(plain)
+
+    reviews = [generator._review_candidate('sourcery-ai', body, 'COMMENTED', groups)
+               for body in (plain, memory, plain.upper())]
+
+    assert [review['problem_type'] for review in reviews] == [15, 12, 15]
+    # Summaries are still shared through the group
+    assert reviews[1]['group'] is reviews[0]['group']
+
+
+def candidates(bodies, groups=None):
+    for number, body in enumerate(bodies):
+        if groups:
+            groups.add(body, ('o/r', number))
+    return [generator._review_candidate('sourcery-ai', body, 'COMMENTED', groups) for body in bodies]
+
+
+def test_keyword_in_normalized_away_text():
+    # Normalization replaces the URLs, so these pairs share a group, but the URL holds the keyword
+    pointer = ['这里的指针需要检查 https://example.com/guide', '这里的指针需要检查 https://example.com/内存/guide']
+    merge = ['这里需要检查 https://github.com/o/r/pull/1/files', '这里需要检查 https://github.com/o/r/pull/1/merge']
+
+    for bodies in (pointer, merge):
+        groups = ReviewDeduplicator()
+        with_dedup = candidates(bodies, groups)
+        assert groups.group_of(bodies[0]) is groups.group_of(bodies[1])
+        assert [review and review['problem_type'] for review in with_dedup] == \
+            [review and review['problem_type'] for review in candidates(bodies)]
+    assert [review['problem_type'] for review in candidates(pointer, ReviewDeduplicator())] == [7, 12]
+    # .../merge is a merge command: dropped, with or without dedup
+    assert candidates(merge, ReviewDeduplicator())[1] is None
+
+
+def test_same_text_shares_classification(monkeypatch):
+    calls = []
+    classify = generator.get_review_classifier().classify
+    monkeypatch.setattr(generator.get_review_classifier(), 'classify', lambda body: calls.append(body) or classify(body))
+    body = TEMPLATE.format("looks wrong 内存")
+
+    reviews = candidates([body, f"  {body.upper()}\n", body], ReviewDeduplicator())
+
+    assert [review['problem_type'] for review in reviews] == [12, 12, 12]
+    assert calls == [body]
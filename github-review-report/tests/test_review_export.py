@@ -0,0 +1,111 @@
+"""Export round trips: Parquet/Arrow row groups and types, jsonl/csv columns and ISO timestamps."""
+
+import csv
+import json
+
+import pytest
+
+from review_export import EXPORT_COLUMNS, RAW_FIELDS, ReviewExporter
+
+COLUMNAR = ('parquet', 'arrow')
+ROW_GROUP_SIZE = 2
+TIMESTAMPS = [name for name, kind in RAW_FIELDS.items() if kind == 'timestamp']
+
+
+def record(number):
+    return {
+        '问题描述': f"问题 {number}", '提出人': 'sourcery-ai', 'repo': 'o/r', 'pr_number': number,
+        'pr_title': f"PR {number}", 'review_id': f"r{number}", 'problem_type_id': 12, 'replies': 0,
+        'pr_created_at': '2025-03-01T08:00:00Z', 'pr_merged_at': '2025-03-02T09:30:00Z',
+        # Missing times are '' in the report data
+        'review_submitted_at': '' if number == 3 else f"2025-03-0{number}T10:00:00Z",
+    }
+
+
+def export(path, count=5):
+    exporter = ReviewExporter(str(path), row_group_size=ROW_GROUP_SIZE)
+    for number in range(1, count + 1):
+        exporter.append(record(number))
+    assert exporter.close() == count
+    return exporter
+
+
+@pytest.fixture
+def pa():
+    return pytest.importorskip('pyarrow')
+
+
+def check_table(pa, table):
+    assert table.column_names == EXPORT_COLUMNS
+    assert table.schema.field('pr_number').type == pa.int64()
+    assert table.schema.field('pr_merged_at').type == pa.timestamp('ms', tz='UTC')
+    rows = table.to_pylist()
+    assert [row['pr_number'] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0]['pr_merged_at'].isoformat() == '2025-03-02T09:30:00+00:00'
+    assert rows[2]['review_submitted_at'] is None
+    assert rows[4]['问题描述'] == "问题 5"
+
+
+def test_parquet_round_trip(tmp_path, pa):
+    import pyarrow.parquet as pq
+
+    export(tmp_path / 'reviews.parquet')
+
+    parquet = pq.ParquetFile(tmp_path / 'reviews.parquet')
+    assert [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)] == [2, 2, 1]
+    check_table(pa, parquet.read())
+
+
+def test_arrow_round_trip(tmp_path, pa):
+    export(tmp_path / 'reviews.arrow')
+
+    with pa.memory_map(str(tmp_path / 'reviews.arrow')) as source:
+        reader = pa.ipc.open_file(source)
+        assert [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)] == [2, 2, 1]
+        check_table(pa, reader.read_all())
+
+
+def test_jsonl_round_trip(tmp_path):
+    export(tmp_path / 'reviews.jsonl')
+
+    with open(tmp_path / 'reviews.jsonl', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert all(list(row) == EXPORT_COLUMNS for row in rows)
+    assert [row['pr_number'] for row in rows] == [1, 2, 3, 4, 5]
+    assert {name: rows[0][name] for name in TIMESTAMPS} == {
+        'pr_created_at': '2025-03-01T08:00:00Z', 'pr_merged_at': '2025-03-02T09:30:00Z',
+        'review_submitted_at': '2025-03-01T10:00:00Z'}
+
+
+def test_csv_round_trip(tmp_path):
+    export(tmp_path / 'reviews.csv')
+
+    with open(tmp_path / 'reviews.csv', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    assert reader.fieldnames == EXPORT_COLUMNS
+    assert [row['pr_number'] for row in rows] == ['1', '2', '3', '4', '5']
+    assert rows[1]['review_submitted_at'] == '2025-03-02T10:00:00Z'
+    assert rows[2]['review_submitted_at'] == ''
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'arrow', 'jsonl', 'csv'])
+def test_close_is_idempotent(tmp_path, extension):
+    if extension in COLUMNAR:
+        pytest.importorskip('pyarrow')
+    path = tmp_path / f"reviews.{extension}"
+    exporter = export(path)
+    content = path.read_bytes()
+
+    assert exporter.close() == 5
+    assert path.read_bytes() == content
+
+
+def test_empty_export_has_schema(tmp_path, pa):
+    import pyarrow.parquet as pq
+
+    export(tmp_path / 'empty.parquet', count=0)
+
+    table = pq.read_table(tmp_path / 'empty.parquet')
+    assert table.num_rows == 0
+    assert table.column_names == EXPORT_COLUMNS
@@ -0,0 +1,34 @@
+"""Startup benchmark: the CLI loads no heavy dependency and starts close to a bare interpreter."""
+
+import os
+import subprocess
+import sys
+import time
+
+SKILL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'pyarrow', 'requests')
+# Allowed --help overhead over a bare interpreter start; importing generator takes ~30 ms
+MAX_STARTUP_OVERHEAD = 0.5
+
+
+def best_time(args, runs=3):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=SKILL_DIR, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_import_loads_no_heavy_modules():
+    code = f"import sys, generator; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=SKILL_DIR, check=True,
+                            capture_output=True, text=True)
+    assert result.stdout.strip() == ''
+
+
+def test_help_starts_fast():
+    bare = best_time([sys.executable, '-c', 'pass'])
+    cli = best_time([sys.executable, 'generator.py', '--help'])
+    print(f"interpreter {bare * 1000:.0f} ms, generator.py --help {cli * 1000:.0f} ms")
+    assert cli - bare < MAX_STARTUP_OVERHEAD
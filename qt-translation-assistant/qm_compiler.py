@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+In-process Qt .qm compiler for TS files.
+
+Mirrors what `lrelease` (Qt 6, default options) writes: language, dependencies,
+the sorted (hash, offset) table, message records and numerus rules, so the
+translate step can emit .qm files without spawning one lrelease per file.
+
+Usage:
+    python qm_compiler.py file_zh_CN.ts [file_de.ts ...]
+"""
+
+import os
+import struct
+import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+
+QM_MAGIC = bytes([
+    0x3C, 0xB8, 0x64, 0x18, 0xCA, 0xEF, 0x9C, 0x95,
+    0xCD, 0x21, 0x1C, 0xBF, 0x60, 0xA1, 0xBD, 0xDD,
+])
+
+# Section tags
+TAG_CONTEXTS = 0x2f
+TAG_HASHES = 0x42
+TAG_MESSAGES = 0x69
+TAG_NUMERUS_RULES = 0x88
+TAG_DEPENDENCIES = 0x96
+TAG_LANGUAGE = 0xa7
+
+# Message record tags
+TAG_END = 1
+TAG_TRANSLATION = 3
+TAG_SOURCE_TEXT = 6
+TAG_CONTEXT = 7
+TAG_COMMENT = 8
+
+# Length variants inside one translation are joined with this character
+BINARY_VARIANT_SEPARATOR = '\u009c'
+
+# Numerus rule opcodes (qtbase numerus.cpp)
+Q_EQ = 0x01
+Q_LT = 0x02
+Q_LEQ = 0x03
+Q_BETWEEN = 0x04
+Q_NOT = 0x08
+Q_MOD_10 = 0x10
+Q_MOD_100 = 0x20
+Q_AND = 0xFD
+Q_OR = 0xFE
+Q_NEWRULE = 0xFF
+Q_NEQ = Q_NOT | Q_EQ
+Q_GEQ = Q_NOT | Q_LT
+Q_NOT_BETWEEN = Q_NOT | Q_BETWEEN
+
+NUMERUS_RULES = {
+    'japanese': [],
+    'english': [Q_EQ, 1],
+    'french': [Q_LEQ, 1],
+    'latvian': [Q_MOD_10 | Q_EQ, 1, Q_AND, Q_MOD_100 | Q_NEQ, 11, Q_NEWRULE,
+                Q_NEQ, 0],
+    'icelandic': [Q_MOD_10 | Q_EQ, 1, Q_AND, Q_MOD_100 | Q_NEQ, 11],
+    'irish': [Q_EQ, 1, Q_NEWRULE,
+              Q_EQ, 2],
+    'gaelic': [Q_EQ, 1, Q_OR, Q_EQ, 11, Q_NEWRULE,
+               Q_EQ, 2, Q_OR, Q_EQ, 12, Q_NEWRULE,
+               Q_BETWEEN, 3, 19],
+    'slovak': [Q_EQ, 1, Q_NEWRULE,
+               Q_BETWEEN, 2, 4],
+    'macedonian': [Q_MOD_10 | Q_EQ, 1, Q_NEWRULE,
+                   Q_MOD_10 | Q_EQ, 2],
+    'lithuanian': [Q_MOD_10 | Q_EQ, 1, Q_AND, Q_MOD_100 | Q_NEQ, 11, Q_NEWRULE,
+                   Q_MOD_10 | Q_NEQ, 0, Q_AND, Q_MOD_100 | Q_NOT_BETWEEN, 10, 19],
+    'russian': [Q_MOD_10 | Q_EQ, 1, Q_AND, Q_MOD_100 | Q_NEQ, 11, Q_NEWRULE,
+                Q_MOD_10 | Q_BETWEEN, 2, 4, Q_AND, Q_MOD_100 | Q_NOT_BETWEEN, 10, 19],
+    'polish': [Q_EQ, 1, Q_NEWRULE,
+               Q_MOD_10 | Q_BETWEEN, 2, 4, Q_AND, Q_MOD_100 | Q_NOT_BETWEEN, 10, 19],
+    'romanian': [Q_EQ, 1, Q_NEWRULE,
+                 Q_EQ, 0, Q_OR, Q_MOD_100 | Q_BETWEEN, 1, 19],
+    'slovenian': [Q_MOD_100 | Q_EQ, 1, Q_NEWRULE,
+                  Q_MOD_100 | Q_EQ, 2, Q_NEWRULE,
+                  Q_MOD_100 | Q_BETWEEN, 3, 4],
+    'maltese': [Q_EQ, 1, Q_NEWRULE,
+                Q_EQ, 0, Q_OR, Q_MOD_100 | Q_BETWEEN, 1, 10, Q_NEWRULE,
+                Q_MOD_100 | Q_BETWEEN, 11, 19],
+    'welsh': [Q_EQ, 0, Q_NEWRULE,
+              Q_EQ, 1, Q_NEWRULE,
+              Q_BETWEEN, 2, 5, Q_NEWRULE,
+              Q_EQ, 6],
+    'arabic': [Q_EQ, 0, Q_NEWRULE,
+               Q_EQ, 1, Q_NEWRULE,
+               Q_EQ, 2, Q_NEWRULE,
+               Q_MOD_100 | Q_BETWEEN, 3, 10, Q_NEWRULE,
+               Q_MOD_100 | Q_GEQ, 11],
+}
+
+# ISO 639 codes per rule set, in the same lookup order as qtbase's numerusTable
+NUMERUS_LANGUAGES = [
+    ('japanese', {'bi', 'my', 'zh', 'dz', 'fj', 'gn', 'hu', 'id', 'ja', 'jv', 'ko', 'ms',
+                  'na', 'om', 'fa', 'su', 'tt', 'th', 'bo', 'tr', 'vi', 'yo', 'za'}),
+    ('english', {'ab', 'aa', 'af', 'sq', 'am', 'as', 'ay', 'az', 'ba', 'eu', 'bn', 'bg',
+                 'km', 'ca', 'kw', 'co', 'da', 'nl', 'en', 'eo', 'et', 'fo', 'fi',
+                 'fur', 'fy', 'gl', 'ka', 'de', 'el', 'kl', 'gu', 'ha', 'he', 'hi',
+                 'ia', 'ie', 'it', 'kn', 'ks', 'kk', 'rw', 'ky', 'ku', 'rn', 'lo', 'la',
+                 'ln', 'lb', 'mg', 'ml', 'mr', 'mn', 'ne', 'nso', 'nb', 'no', 'nn',
+                 'oc', 'or', 'ps', 'pt', 'pa', 'qu', 'rm', 'st', 'tn', 'sn', 'sd', 'si',
+                 'ss', 'so', 'es', 'sw', 'sv', 'tg', 'ta', 'te', 'to', 'ts', 'tk', 'ug',
+                 'ur', 'uz', 'vo', 'wo', 'xh', 'yi', 'zu'}),
+    ('french', {'hy', 'br', 'fr', 'fil', 'tl', 'ti', 'wa'}),
+    ('latvian', {'lv'}),
+    ('icelandic', {'is'}),
+    ('irish', {'dv', 'iu', 'ik', 'ga', 'gv', 'mi', 'se', 'sm', 'sa'}),
+    ('gaelic', {'gd'}),
+    ('slovak', {'sk', 'cs'}),
+    ('macedonian', {'mk'}),
+    ('lithuanian', {'lt'}),
+    ('russian', {'bs', 'be', 'hr', 'ru', 'sr', 'uk'}),
+    ('polish', {'pl'}),
+    ('romanian', {'mo', 'ro'}),
+    ('slovenian', {'sl'}),
+    ('maltese', {'mt'}),
+    ('welsh', {'cy'}),
+    ('arabic', {'ar'}),
+]
+
+# (language, country) pairs that override the language-only lookup
+NUMERUS_COUNTRY_OVERRIDES = {
+    ('pt', 'BR'): 'french',
+}
+
+# QLocale's default country for bare language codes that have an override
+DEFAULT_COUNTRIES = {
+    'pt': 'BR',
+}
+
+
+def get_numerus_rules(language_code: str) -> Optional[List[int]]:
+    """Return the numerus rule bytes for a TS language code, None if Qt knows none."""
+    if not language_code:
+        return None
+    parts = language_code.replace('-', '_').split('_')
+    language = parts[0].lower()
+    country = parts[1].upper() if len(parts) > 1 else DEFAULT_COUNTRIES.get(language, '')
+    override = NUMERUS_COUNTRY_OVERRIDES.get((language, country))
+    if override:
+        return NUMERUS_RULES[override]
+    for rule_name, languages in NUMERUS_LANGUAGES:
+        if language in languages:
+            return NUMERUS_RULES[rule_name]
+    return None
+
+
+def numerus_form_count(rules: Optional[List[int]]) -> int:
+    if not rules:
+        return 1
+    return rules.count(Q_NEWRULE) + 2
+
+
+def elf_hash(data: bytes) -> int:
+    h = 0
+    for byte in data:
+        if byte == 0:
+            break
+        h = ((h << 4) + byte) & 0xFFFFFFFF
+        g = h & 0xF0000000
+        if g:
+            h ^= g >> 24
+        h &= ~g & 0xFFFFFFFF
+    return h or 1
+
+
+def _qbytearray(data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + data
+
+
+def _qstring(text: Optional[str]) -> bytes:
+    # Qt serializes a null QString (what the TS reader yields for empty text) as 0xFFFFFFFF
+    if not text:
+        return b'\xff\xff\xff\xff'
+    data = text.encode('utf-16-be')
+    return struct.pack('>I', len(data)) + data
+
+
+def _element_text(element: Optional[ET.Element]) -> str:
+    """Collect element text the way the TS reader does, expanding <byte value=.../>."""
+    if element is None:
+        return ''
+    parts = [element.text or '']
+    for child in element:
+        if child.tag == 'byte':
+            value = child.get('value', '')
+            if value.startswith('x'):
+                parts.append(chr(int(value[1:], 16)))
+            elif value:
+                parts.append(chr(int(value)))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def _translation_text(element: ET.Element) -> str:
+    variants = element.findall('lengthvariant')
+    if variants:
+        return BINARY_VARIANT_SEPARATOR.join(_element_text(v) for v in variants)
+    return _element_text(element)
+
+
+def parse_ts_messages(ts_content: str) -> Tuple[str, List[str], List[Dict]]:
+    """Parse TS XML into (language, dependencies, message records)."""
+    root = ET.fromstring(ts_content)
+    language = root.get('language', '')
+    dependencies = [d.get('catalog', '') for d in root.iter('dependency')]
+
+    messages = []
+    for context in root.iter('context'):
+        context_name = _element_text(context.find('name'))
+        for message in context.iter('message'):
+            translation = message.find('translation')
+            translation_type = translation.get('type', '') if translation is not None else 'unfinished'
+            numerus = message.get('numerus') == 'yes'
+            if translation is None:
+                translations = []
+            elif numerus:
+                translations = [_translation_text(f) for f in translation.findall('numerusform')]
+            else:
+                translations = [_translation_text(translation)]
+            messages.append({
+                'context': context_name,
+                'source': _element_text(message.find('source')),
+                'comment': _element_text(message.find('comment')),
+                'translations': translations,
+                'type': translation_type,
+                'numerus': numerus,
+            })
+    return language, dependencies, messages
+
+
+def compile_messages(language: str, dependencies: List[str], messages: List[Dict]) -> bytes:
+    """Build .qm bytes from parsed TS message records."""
+    rules = get_numerus_rules(language)
+    plural_count = numerus_form_count(rules)
+
+    # Duplicates keep the first occurrence, as lrelease does
+    stripped_keys = {(m['context'], m['source']) for m in messages if not m['comment']}
+    records: Dict[Tuple[bytes, bytes, bytes], List[str]] = {}
+    for m in messages:
+        if m['type'] in ('obsolete', 'vanished'):
+            continue
+        translations = list(m['translations'])
+        if m['type'] == 'unfinished' and not (translations[0] if translations else ''):
+            continue
+
+        count = plural_count if m['numerus'] else 1
+        translations = (translations + [''] * count)[:count]
+
+        context = m['context'].encode('utf-8')
+        source = m['source'].encode('utf-8')
+        comment = m['comment'].encode('utf-8')
+        force_comment = (not comment or not context
+                         or (m['context'], m['source']) in stripped_keys)
+        if not force_comment and (context, source, b'') not in records:
+            records[(context, source, b'')] = translations
+            continue
+        records.setdefault((context, source, comment), translations)
+
+    message_data = bytearray()
+    offsets = []
+    for key in sorted(records):
+        context, source, comment = key
+        offsets.append((elf_hash(source + comment), len(message_data)))
+        for translation in records[key]:
+            message_data += bytes([TAG_TRANSLATION]) + _qstring(translation)
+        message_data += bytes([TAG_COMMENT]) + _qbytearray(comment)
+        message_data += bytes([TAG_SOURCE_TEXT]) + _qbytearray(source)
+        message_data += bytes([TAG_CONTEXT]) + _qbytearray(context)
+        message_data += bytes([TAG_END])
+
+    offset_data = b''.join(struct.pack('>II', h, o) for h, o in sorted(offsets))
+    dependency_data = b''.join(_qstring(d) for d in dependencies)
+
+    out = bytearray(QM_MAGIC)
+    sections = [
+        (TAG_LANGUAGE, language.encode('utf-8')),
+        (TAG_DEPENDENCIES, dependency_data),
+        (TAG_HASHES, offset_data),
+        (TAG_MESSAGES, bytes(message_data)),
+        (TAG_NUMERUS_RULES, bytes(rules or [])),
+    ]
+    for tag, data in sections:
+        if data:
+            out += struct.pack('>BI', tag, len(data)) + data
+    return bytes(out)
+
+
+def compile_ts_file(ts_file_path: str, qm_file_path: Optional[str] = None) -> str:
+    """Compile one TS file to .qm next to it (or at qm_file_path) and return the path."""
+    with open(ts_file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    qm_file_path = qm_file_path or os.path.splitext(ts_file_path)[0] + '.qm'
+    data = compile_messages(*parse_ts_messages(content))
+    with open(qm_file_path, 'wb') as f:
+        f.write(data)
+    return qm_file_path
+
+
+def compile_ts_files(ts_file_paths: List[str], max_workers: Optional[int] = None) -> List[str]:
+    """Compile several TS files across a process pool."""
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(compile_ts_file, ts_file_paths))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        sys.exit(1)
+    for qm_file in compile_ts_files(sys.argv[1:]):
+        print(f"Generated: {qm_file}")
+
+
+if __name__ == "__main__":
+    main()
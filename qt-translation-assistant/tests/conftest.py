@@ -0,0 +1,6 @@
+"""Shared setup: translate.py is imported as a top-level module, as the skill runs it."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
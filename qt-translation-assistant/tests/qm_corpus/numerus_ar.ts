@@ -0,0 +1,19 @@
+<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE TS>
+<TS version="2.1" language="ar">
+<context>
+    <name>Trash</name>
+    <message numerus="yes">
+        <source>Delete %n file(s)?</source>
+        <comment>confirmation dialog</comment>
+        <translation>
+            <numerusform>حذف %n ملفات؟</numerusform>
+            <numerusform>حذف ملف واحد؟</numerusform>
+            <numerusform>حذف ملفين؟</numerusform>
+            <numerusform>حذف %n ملفات؟</numerusform>
+            <numerusform>حذف %n ملفًا؟</numerusform>
+            <numerusform>حذف %n ملف؟</numerusform>
+        </translation>
+    </message>
+</context>
+</TS>
@@ -0,0 +1,30 @@
+<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE TS>
+<TS version="2.1" language="ru">
+<context>
+    <name>Downloads</name>
+    <message numerus="yes">
+        <source>%n item(s) remaining</source>
+        <translation>
+            <numerusform>Осталось %n элемент</numerusform>
+            <numerusform>Осталось %n элемента</numerusform>
+            <numerusform>Осталось %n элементов</numerusform>
+        </translation>
+    </message>
+    <message>
+        <source>Cancel</source>
+        <translation>Отмена</translation>
+    </message>
+    <message>
+        <source>Cancel</source>
+        <translation>Отмена</translation>
+    </message>
+</context>
+<context>
+    <name>Settings</name>
+    <message>
+        <source>Cancel</source>
+        <translation>Отменить</translation>
+    </message>
+</context>
+</TS>
@@ -0,0 +1,48 @@
+<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE TS>
+<TS version="2.1" language="fr">
+<context>
+    <name></name>
+    <message>
+        <source>Global string</source>
+        <translation>Chaîne globale</translation>
+    </message>
+</context>
+<context>
+    <name>MainWindow</name>
+    <message numerus="yes">
+        <source>%n window(s)</source>
+        <translation>
+            <numerusform>%n fenêtre</numerusform>
+            <numerusform>%n fenêtres</numerusform>
+        </translation>
+    </message>
+    <message>
+        <source>Unfinished text</source>
+        <translation type="unfinished">Texte inachevé</translation>
+    </message>
+    <message>
+        <source>Empty unfinished</source>
+        <translation type="unfinished"></translation>
+    </message>
+    <message>
+        <source>Old text</source>
+        <translation type="obsolete">Ancien texte</translation>
+    </message>
+    <message>
+        <source>Vanished text</source>
+        <translation type="vanished">Texte disparu</translation>
+    </message>
+    <message>
+        <source>Save the current document</source>
+        <translation variants="yes">
+            <lengthvariant>Enregistrer le document actuel</lengthvariant>
+            <lengthvariant>Enregistrer</lengthvariant>
+        </translation>
+    </message>
+    <message>
+        <source>&amp;File</source>
+        <translation>&amp;Fichier</translation>
+    </message>
+</context>
+</TS>
@@ -0,0 +1,93 @@
+"""Record/replay cassettes and their interaction with run history."""
+
+import json
+import re
+
+import translate
+from translate import LLMCassette, QtTranslationAssistant, TranslationWorker
+
+TS = ('<TS version="2.1" language="zh_CN">\n<context>\n    <name>Main</name>\n'
+      '    <message>\n        <source>Open file</source>\n'
+      '        <translation type="unfinished"></translation>\n    </message>\n</context>\n</TS>\n')
+
+
+def test_replay_skips_history(tmp_path, monkeypatch):
+    def fake_post(self, prompt):
+        return json.dumps([{'source': 'Open file', 'translation': '打开文件'}], ensure_ascii=False), 'stop'
+
+    monkeypatch.setattr(TranslationWorker, '_post_completion', fake_post)
+    config = tmp_path / 'config.json'
+    config.write_text('{}', encoding='utf-8')
+    history = tmp_path / 'history.jsonl'
+    cassette_path = str(tmp_path / 'run.cassette.gz')
+    ts_file = tmp_path / 'app_zh_CN.ts'
+
+    ts_file.write_text(TS, encoding='utf-8')
+    cassette = LLMCassette(cassette_path, mode='record')
+    QtTranslationAssistant(config_path=str(config), batch_size=20, max_workers=1, history_path=str(history),
+                           cassette=cassette).translate_single_file(str(ts_file))
+    cassette.close()
+    assert len(history.read_text(encoding='utf-8').splitlines()) == 1
+
+    ts_file.write_text(TS, encoding='utf-8')
+    monkeypatch.delattr(TranslationWorker, '_post_completion')
+    cassette = LLMCassette(cassette_path, mode='replay')
+    assistant = QtTranslationAssistant(config_path=str(config), batch_size=20, max_workers=1,
+                                       history_path=str(history), cassette=cassette)
+    assert assistant.translate_single_file(str(ts_file))['count'] == 1
+    assert '打开文件' in ts_file.read_text(encoding='utf-8')
+    assert len(history.read_text(encoding='utf-8').splitlines()) == 1
+
+
+def test_replay_reproduces_tuned_run(tmp_path, monkeypatch, capsys):
+    def fake_post(self, prompt):
+        strings = re.findall(r'^\d+\. (.*)$', prompt, re.MULTILINE)
+        items = [{'source': s, 'translation': f"译{s}"} for s in strings]
+        if len(strings) > 10:
+            # Cut off inside the fourth item
+            text = json.dumps(items[:4], ensure_ascii=False)
+            return text[:text.rfind('{') + 5], 'length'
+        return json.dumps(items, ensure_ascii=False), 'stop'
+
+    messages = ''.join(f"    <message>\n        <source>String {i}</source>\n"
+                       f"        <translation type=\"unfinished\"></translation>\n    </message>\n"
+                       for i in range(60))
+    ts = f"<TS version=\"2.1\" language=\"zh_CN\">\n<context>\n    <name>Main</name>\n{messages}</context>\n</TS>\n"
+    recorded_dir, replay_dir = tmp_path / 'checkout', tmp_path / 'ci' / 'checkout'
+    replay_dir.mkdir(parents=True)
+    recorded_dir.mkdir()
+    for directory in (recorded_dir, replay_dir):
+        (directory / 'app_zh_CN.ts').write_text(ts, encoding='utf-8')
+
+    # History tunes the recording to 30 x 2 workers, capped to 15 by an earlier truncation
+    history = tmp_path / 'history.jsonl'
+    history.write_text(json.dumps({
+        'timestamp': 0, 'hour': translate.current_hour(), 'file': str(recorded_dir / 'app_zh_CN.ts'),
+        'language': 'zh_CN', 'batch_size': 30, 'max_workers': 2, 'strings': 60, 'elapsed': 1.0,
+        'strings_per_sec': 60.0, 'requests': 2, 'latency': 1.0, 'errors': 0, 'truncations': 1}) + '\n',
+        encoding='utf-8')
+    monkeypatch.setattr(translate, 'EXPLORATION_RATE', 0.0)
+    monkeypatch.setattr(TranslationWorker, '_post_completion', fake_post)
+    config = tmp_path / 'config.json'
+    config.write_text('{}', encoding='utf-8')
+    cassette_path = str(tmp_path / 'run.cassette.gz')
+
+    cassette = LLMCassette(cassette_path, mode='record')
+    QtTranslationAssistant(config_path=str(config), history_path=str(history),
+                           cassette=cassette).translate_single_file(str(recorded_dir / 'app_zh_CN.ts'))
+    cassette.close()
+    assert 'Batch size: 15, workers: 2' in capsys.readouterr().out
+
+    # Elsewhere, with no config and default parameters, from a cassette alone
+    monkeypatch.delattr(TranslationWorker, '_post_completion')
+    cassette = LLMCassette(cassette_path, mode='replay')
+    assert cassette.recorded_parameters('app_zh_CN.ts', 'zh_CN') == (15, 2)
+    QtTranslationAssistant(config_path=str(tmp_path / 'missing.json'), history_path=None,
+                           cassette=cassette).translate_single_file(str(replay_dir / 'app_zh_CN.ts'))
+
+    out = capsys.readouterr().out
+    assert 'Batch size: 15, workers: 2' in out
+    assert 'No cassette entry' not in out
+    replayed = (replay_dir / 'app_zh_CN.ts').read_text(encoding='utf-8')
+    assert 'unfinished' not in replayed
+    assert replayed == (recorded_dir / 'app_zh_CN.ts').read_text(encoding='utf-8')
@@ -0,0 +1,21 @@
+"""Exit codes of the --check pre-commit mode."""
+
+from translate import check_unfinished
+
+FINISHED = '<message><source>Open</source><translation>打开</translation></message>\n'
+UNFINISHED = '<message><source>Save</source>\n<translation type="unfinished"></translation>\n</message>\n'
+
+
+def test_counts(tmp_path):
+    (tmp_path / 'app_zh_CN.ts').write_text(FINISHED, encoding='utf-8')
+    assert check_unfinished([str(tmp_path)]) == 0
+    (tmp_path / 'app_de.ts').write_text(UNFINISHED, encoding='utf-8')
+    assert check_unfinished([str(tmp_path)]) == 1
+
+
+def test_invalid_paths(tmp_path, capsys):
+    (tmp_path / 'notes.txt').write_text('', encoding='utf-8')
+    assert check_unfinished([str(tmp_path / 'typo_dir')]) == 2
+    assert check_unfinished([str(tmp_path / 'missing.ts')]) == 2
+    assert check_unfinished([str(tmp_path / 'notes.txt')]) == 2
+    assert 'missing.ts' in capsys.readouterr().err
@@ -0,0 +1,61 @@
+"""Truncated completions shrink the batches of the same file, within a run and across runs."""
+
+import json
+import re
+
+import translate
+from translate import QtTranslationAssistant, TranslationWorker
+
+STRING_COUNT = 40
+# Largest request the fake model answers without hitting max_tokens
+MAX_COMPLETE = 10
+
+
+def write_ts(path):
+    messages = ''.join(
+        f"    <message>\n        <source>String {i}</source>\n"
+        f"        <translation type=\"unfinished\"></translation>\n    </message>\n"
+        for i in range(STRING_COUNT))
+    path.write_text(f"<TS version=\"2.1\" language=\"zh_CN\">\n<context>\n    <name>Main</name>\n"
+                    f"{messages}</context>\n</TS>\n", encoding='utf-8')
+
+
+def run(tmp_path, monkeypatch, sizes):
+    def fake_call(self, prompt):
+        strings = re.findall(r'^\d+\. (.*)$', prompt, re.MULTILINE)
+        sizes.append(len(strings))
+        items = [{'source': s, 'translation': f"译{s}"} for s in strings]
+        if len(strings) > MAX_COMPLETE:
+            # Cut off inside the sixth item
+            text = json.dumps(items[:6], ensure_ascii=False)
+            return text[:text.rfind('{') + 5], 'length'
+        return json.dumps(items, ensure_ascii=False), 'stop'
+
+    monkeypatch.setattr(TranslationWorker, '_call_llm_api', fake_call)
+    monkeypatch.setattr(translate, 'EXPLORATION_RATE', 0.0)
+    config = tmp_path / 'config.json'
+    config.write_text('{}', encoding='utf-8')
+    ts_file = tmp_path / 'app_zh_CN.ts'
+    write_ts(ts_file)
+    assistant = QtTranslationAssistant(config_path=str(config), max_workers=1,
+                                       history_path=str(tmp_path / 'history.jsonl'))
+    result = assistant.translate_single_file(str(ts_file))
+    assert result['count'] == STRING_COUNT
+    assert 'unfinished' not in ts_file.read_text(encoding='utf-8')
+    return assistant.history.load()[-1]
+
+
+def test_truncation_shrinks_batches(tmp_path, monkeypatch):
+    first_sizes = []
+    first = run(tmp_path, monkeypatch, first_sizes)
+    assert first['batch_size'] == translate.DEFAULT_BATCH_SIZE
+    assert first['truncations'] > 0
+    # The first truncated request continues with the recovered count; queued batches are split
+    assert first_sizes[0] == translate.DEFAULT_BATCH_SIZE
+    assert max(first_sizes[1:]) <= translate.DEFAULT_BATCH_SIZE // 2
+
+    second_sizes = []
+    second = run(tmp_path, monkeypatch, second_sizes)
+    assert second['batch_size'] == translate.DEFAULT_BATCH_SIZE // 2
+    assert second['truncations'] == 0
+    assert max(second_sizes) == MAX_COMPLETE
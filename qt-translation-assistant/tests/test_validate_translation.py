@@ -0,0 +1,33 @@
+"""Placeholder, accelerator and markup checks of validate_translation."""
+
+import pytest
+
+from translate import validate_translation
+
+
+@pytest.mark.parametrize("source, translation", [
+    ("100% done", "完成 100%"),
+    ("Battery 50% saved", "节省 50% 电量"),
+    ("%1 of %2 files", "%2 个文件中的 %1 个"),
+    ("%n item(s)", "%n 项"),
+    ("%d files, %.1f MB", "%d 个文件, %.1f MB"),
+    ("R&D", "研发"),
+    ("Q&A", "问答"),
+    ("Tom & Jerry", "猫和老鼠"),
+    ("&File", "文件(&F)"),
+    ("E&xit", "退出(&X)"),
+    ("<b>Bold</b> text", "<b>粗体</b>文本"),
+])
+def test_valid(source, translation):
+    assert validate_translation(source, translation) is None
+
+
+@pytest.mark.parametrize("source, translation, error", [
+    ("Save", "   ", "empty translation"),
+    ("%1 of %2 files", "%1 个文件", "placeholder mismatch"),
+    ("%d files", "个文件", "placeholder mismatch"),
+    ("&File", "文件", "accelerator mismatch"),
+    ("<b>Bold</b> text", "粗体文本", "markup mismatch"),
+])
+def test_mismatch(source, translation, error):
+    assert validate_translation(source, translation) == error
@@ -1,56 +1,304 @@
 #!/usr/bin/env python3
 import os
+import hashlib
+import html
 import json
+import random
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from pathlib import Path
-from typing import Dict, List
+import sys
+from collections import deque
+from typing import Dict, List, Optional, Tuple
 import time
 import threading
 
 
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_MAX_WORKERS = 3
+
+# Bounds and step sizes for auto-tuning from run history
+MIN_BATCH_SIZE = 5
+MAX_BATCH_SIZE = 60
+BATCH_SIZE_STEP = 5
+MIN_WORKERS = 1
+MAX_WORKERS = 8
+EXPLORATION_RATE = 0.2
+HISTORY_WINDOW = 50
+
+# Qt %1/%L1/%n arguments, printf conversions and escaped percent signs. The printf
+# space flag is left out so prose like "100% done" is not read as "% d"
+PLACEHOLDER_PATTERN = re.compile(
+    r'%%|%L?\d{1,2}|%L?n|%(?:\d+\$)?[-+#0]*\d*(?:\.\d+)?(?:hh|h|ll|l|L|z|j|t)?[diouxXeEfgGcsp]')
+# Mnemonic markers: a single & followed by a visible character (&& is a literal ampersand),
+# except between two capitals as in abbreviations like R&D or Q&A
+ACCELERATOR_PATTERN = re.compile(r'(?<!&)&(?=[^\s&])(?!(?<=[A-Z]&)[A-Z])')
+TAG_PATTERN = re.compile(r'<\s*(/?)\s*([a-zA-Z][a-zA-Z0-9]*)\b[^<>]*>')
+
+
+def validate_translation(source: str, translation: str) -> Optional[str]:
+    """Return a description of the first placeholder/markup mismatch, or None if valid."""
+    source = html.unescape(source)
+    translation = html.unescape(translation)
+
+    if source.strip() and not translation.strip():
+        return "empty translation"
+    if sorted(PLACEHOLDER_PATTERN.findall(source)) != sorted(PLACEHOLDER_PATTERN.findall(translation)):
+        return "placeholder mismatch"
+    source_plain = source.replace('&&', '')
+    translation_plain = translation.replace('&&', '')
+    # Only menu and label strings carry accelerators; a translation may drop a stray & of plain text
+    source_accelerators = len(ACCELERATOR_PATTERN.findall(source_plain))
+    if source_accelerators and source_accelerators != len(ACCELERATOR_PATTERN.findall(translation_plain)):
+        return "accelerator mismatch"
+    source_tags = [(c, t.lower()) for c, t in TAG_PATTERN.findall(source)]
+    translation_tags = [(c, t.lower()) for c, t in TAG_PATTERN.findall(translation)]
+    if source_tags != translation_tags:
+        return "markup mismatch"
+    return None
+
+
+class LLMCassette:
+    """
+    Gzip-compressed JSON-lines recording of LLM request/response pairs keyed by prompt hash.
+
+    Next to the requests it records how each file was batched (batch size,
+    workers and in-run splits), so a replay rebuilds the same prompts however
+    the defaults or the run history have changed since.
+    """
+
+    def __init__(self, cassette_path: str, mode: str = 'replay', realtime: bool = False):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.cassette_path = cassette_path
+        self.mode = mode
+        self.realtime = realtime
+        self.lock = threading.Lock()
+        self.entries: Dict[str, deque] = {}
+        # (file, language) -> recorded batching: batch_size, max_workers and split batches
+        self.plans: Dict[Tuple[str, str], Dict] = {}
+        self.file = None
+
+        import gzip
+
+        if mode == 'record':
+            self.file = gzip.open(cassette_path, 'at', encoding='utf-8')
+        else:
+            if not os.path.exists(cassette_path):
+                raise FileNotFoundError(f"Cassette file not found: {cassette_path}")
+            with gzip.open(cassette_path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    kind = entry.get('kind')
+                    if kind == 'parameters':
+                        self.plans[(entry['file'], entry['language'])] = {
+                            'batch_size': entry['batch_size'], 'max_workers': entry['max_workers'],
+                            'chunk_sizes': {}}
+                    elif kind == 'chunk_size':
+                        plan = self.plans.get((entry['file'], entry['language']))
+                        if plan:
+                            plan['chunk_sizes'][entry['batch']] = entry['chunk_size']
+                    else:
+                        self.entries.setdefault(entry['key'], deque()).append(entry)
+
+    @staticmethod
+    def prompt_key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    def record(self, prompt: str, response_text: str, finish_reason: str, latency: float):
+        entry = {
+            'key': self.prompt_key(prompt),
+            'timestamp': time.time(),
+            'latency': round(latency, 4),
+            'prompt': prompt,
+            'response': response_text,
+            'finish_reason': finish_reason,
+        }
+        self._write(entry)
+
+    def record_parameters(self, source_file: str, language: str, batch_size: int, max_workers: int):
+        self._write({'kind': 'parameters', 'file': source_file, 'language': language,
+                     'batch_size': batch_size, 'max_workers': max_workers})
+
+    def record_chunk_size(self, source_file: str, language: str, batch: int, chunk_size: int):
+        """Record that batch (its index in the file) was split into requests of chunk_size strings."""
+        self._write({'kind': 'chunk_size', 'file': source_file, 'language': language,
+                     'batch': batch, 'chunk_size': chunk_size})
+
+    def recorded_parameters(self, source_file: str, language: str) -> Optional[Tuple[int, int]]:
+        """(batch_size, max_workers) the recording used for the file, None if it has none."""
+        plan = self.plans.get((source_file, language))
+        return (plan['batch_size'], plan['max_workers']) if plan else None
+
+    def recorded_chunk_size(self, source_file: str, language: str, batch: int, batch_length: int) -> int:
+        """Request size the recording used for batch: its recorded split, else the whole batch."""
+        return self.plans[(source_file, language)]['chunk_sizes'].get(batch, batch_length)
+
+    def _write(self, entry: Dict):
+        with self.lock:
+            self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.file.flush()
+
+    def replay(self, prompt: str) -> Tuple[str, str]:
+        key = self.prompt_key(prompt)
+        with self.lock:
+            recorded = self.entries.get(key)
+            if not recorded:
+                raise Exception(f"No cassette entry for prompt {key[:12]}")
+            # Repeated prompts (retries) are served in recorded order, the last one sticks
+            entry = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        if self.realtime:
+            time.sleep(entry['latency'])
+        return entry['response'], entry['finish_reason']
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
 class TranslationWorker:
-    def __init__(self, config: dict, max_retries: int = 2):
+    def __init__(self, config: dict, max_retries: int = 2,
+                 cassette: Optional[LLMCassette] = None):
         self.config = config
         self.max_retries = max_retries
+        self.cassette = cassette
+        self.truncation_counts: Dict[Tuple[str, str], int] = {}
+        self.stats = {'requests': 0, 'latency': 0.0, 'errors': 0, 'truncations': 0}
+        self.lock = threading.Lock()
 
     def translate_batch(self, strings_list: List[str], target_language: str,
-                        source_file: str = "") -> List[Dict[str, str]]:
+                        source_file: str = "",
+                        contexts: Optional[List[Tuple[str, str]]] = None) -> List[Dict[str, str]]:
+        import requests
+
         if not strings_list:
             return []
 
-        prompt = self._build_translation_prompt(strings_list, target_language, source_file)
-
-        for attempt in range(self.max_retries):
-            try:
-                response_text = self._call_llm_api(prompt)
-                results = self._parse_translation_response(response_text, strings_list)
+        translated: Dict[int, Dict[str, str]] = {}
+        revalidated: set = set()
+        pending = list(range(len(strings_list)))
+        chunk_size = len(strings_list)
+        attempt = 0
 
-                if len(results) == len(strings_list):
-                    return results
-                else:
-                    print(f"  Warning: Result count mismatch (expected {len(strings_list)}, got {len(results)})")
+        while pending and attempt < self.max_retries:
+            request_indices = pending[:chunk_size]
+            request_strings = [strings_list[i] for i in request_indices]
+            request_contexts = [contexts[i] for i in request_indices] if contexts else None
+            prompt = self._build_translation_prompt(request_strings, target_language,
+                                                    source_file, request_contexts)
 
+            request_start = time.time()
+            try:
+                response_text, finish_reason = self._call_llm_api(prompt)
+                self._record_request(time.time() - request_start)
             except requests.exceptions.RequestException as e:
+                self._record_request(time.time() - request_start, error=True)
                 if attempt < self.max_retries - 1:
                     print(f"  Network error, retrying {attempt + 1}/{self.max_retries}: {str(e)}")
                     time.sleep(2 ** attempt)
                 else:
                     print(f"  Translation failed, using original: {str(e)}")
+                attempt += 1
+                continue
             except Exception as e:
+                self._record_request(time.time() - request_start, error=True)
                 print(f"  Translation error: {str(e)}")
+                attempt += 1
+                continue
 
-        return [{'source': s, 'translation': s} for s in strings_list]
+            if finish_reason == 'length':
+                # Completion hit max_tokens: keep the complete items and continue
+                # with only the remaining strings instead of retrying the whole batch
+                self._record_truncation(source_file, target_language)
+                recovered = self._recover_complete_items(response_text)[:len(request_indices)]
+                requeue = self._accept_results(request_indices, recovered, strings_list,
+                                               translated, revalidated)
+                pending = pending[len(recovered):] + requeue
+                print(f"  Warning: Response truncated, recovered {len(recovered)}/{len(request_indices)} items")
+                if recovered:
+                    chunk_size = len(recovered)
+                else:
+                    chunk_size = max(1, len(request_indices) // 2)
+                    attempt += 1
+                continue
+
+            results = self._parse_translation_response(response_text, request_strings)
+            if len(results) == len(request_strings):
+                requeue = self._accept_results(request_indices, results, strings_list,
+                                               translated, revalidated)
+                pending = pending[len(request_indices):] + requeue
+            else:
+                print(f"  Warning: Result count mismatch (expected {len(request_strings)}, got {len(results)})")
+                with self.lock:
+                    self.stats['errors'] += 1
+                attempt += 1
+
+        return [translated.get(i, {'source': s, 'translation': s}) for i, s in enumerate(strings_list)]
+
+    def _accept_results(self, indices: List[int], results: List[Dict[str, str]],
+                        strings_list: List[str], translated: Dict[int, Dict[str, str]],
+                        revalidated: set) -> List[int]:
+        """Store validated results and return the indices that get one targeted retry."""
+        requeue = []
+        for index, result in zip(indices, results):
+            source = strings_list[index]
+            problem = validate_translation(source, str(result.get('translation', '')))
+            if problem and index not in revalidated:
+                revalidated.add(index)
+                requeue.append(index)
+                print(f"  Warning: {problem}, retrying: {source[:40]}")
+                continue
+            if problem:
+                print(f"  Warning: {problem} after retry, keeping original: {source[:40]}")
+                result = {'source': source, 'translation': source}
+            translated[index] = result
+        return requeue
+
+    def suggested_batch_size(self, source_file: str, target_language: str, batch_size: int) -> int:
+        """Halve the batch size for every truncation seen for this file and language in this run."""
+        with self.lock:
+            count = self.truncation_counts.get((source_file, target_language), 0)
+        return max(1, batch_size >> count)
+
+    def snapshot_stats(self) -> Dict:
+        with self.lock:
+            return dict(self.stats)
+
+    def _record_request(self, latency: float, error: bool = False):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['latency'] += latency
+            if error:
+                self.stats['errors'] += 1
+
+    def _record_truncation(self, source_file: str, target_language: str):
+        with self.lock:
+            key = (source_file, target_language)
+            self.truncation_counts[key] = self.truncation_counts.get(key, 0) + 1
+            self.stats['truncations'] += 1
 
     def _build_translation_prompt(self, strings_list: List[str], target_language: str,
-                                   source_file: str) -> str:
+                                   source_file: str,
+                                   contexts: Optional[List[Tuple[str, str]]] = None) -> str:
         prompt = f"""Translate the following strings to {target_language} language.
 Source file: {source_file if source_file else 'Unknown'}
 
 String list:
 """
 
+        # Strings arrive grouped by (context, comment); emit each header once per run
+        current_context = None
         for i, string in enumerate(strings_list, 1):
+            if contexts:
+                context = contexts[i - 1]
+                if context != current_context:
+                    current_context = context
+                    context_name, comment = context
+                    prompt += f"\n[Context: {context_name or 'Unknown'}]"
+                    if comment:
+                        prompt += f" (Note: {comment})"
+                    prompt += "\n"
             prompt += f"\n{i}. {string}\n"
 
         example = [{"source": strings_list[0], "translation": "..."}] if strings_list else []
@@ -61,12 +309,23 @@ Return the results strictly in the following JSON format, do not add any other t
 
 Important notes:
 - Maintain accuracy and terminology consistency
+- Use the [Context: ...] headers (UI class names) only as hints, do not translate them
 - Ensure correct JSON format
 - Do not add explanations or other content outside JSON
 """
         return prompt
 
-    def _call_llm_api(self, prompt: str) -> str:
+    def _call_llm_api(self, prompt: str) -> Tuple[str, str]:
+        if self.cassette and self.cassette.mode == 'replay':
+            return self.cassette.replay(prompt)
+
+        start_time = time.time()
+        response_text, finish_reason = self._post_completion(prompt)
+        if self.cassette:
+            self.cassette.record(prompt, response_text, finish_reason, time.time() - start_time)
+        return response_text, finish_reason
+
+    def _post_completion(self, prompt: str) -> Tuple[str, str]:
         import requests
         
         headers = {
@@ -80,7 +339,7 @@ Important notes:
                 {'role': 'user', 'content': prompt}
             ],
             'temperature': self.config.get('temperature', 0.3),
-            'max_tokens': 4000
+            'max_tokens': self.config.get('max_tokens', 4000)
         }
 
         response = requests.post(
@@ -92,7 +351,8 @@ Important notes:
 
         if response.status_code == 200:
             result = response.json()
-            return result['choices'][0]['message']['content'].strip()
+            choice = result['choices'][0]
+            return choice['message']['content'].strip(), choice.get('finish_reason') or ''
         else:
             print(f"  API Response: {response.text}")
             raise Exception(f"API call failed: {response.status_code} - {response.text}")
@@ -118,21 +378,159 @@ Important notes:
         print("  Warning: Unable to parse translation response")
         return [{'source': s, 'translation': s} for s in original_strings]
 
+    def _recover_complete_items(self, response_text: str) -> List[Dict[str, str]]:
+        """Decode the complete objects of a JSON array that was cut off mid-way."""
+        start = response_text.find('[')
+        if start == -1:
+            return []
+
+        decoder = json.JSONDecoder()
+        results = []
+        pos = start + 1
+        while pos < len(response_text):
+            while pos < len(response_text) and response_text[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(response_text) or response_text[pos] == ']':
+                break
+            try:
+                item, pos = decoder.raw_decode(response_text, pos)
+            except json.JSONDecodeError:
+                break
+            if not (isinstance(item, dict) and 'source' in item and 'translation' in item):
+                break
+            results.append(item)
+        return results
+
 
 class TranslationBatch:
-    def __init__(self, items: List[Dict], target_language: str, source_file: str):
+    def __init__(self, items: List[Dict], target_language: str, source_file: str, index: int = 0):
         self.items = items
         self.target_language = target_language
         self.source_file = source_file
+        # Position among the file's batches
+        self.index = index
+
+
+def current_hour() -> int:
+    return time.localtime().tm_hour
+
+
+class RunHistory:
+    """Per-file run statistics stored as JSON lines, used to auto-tune batch size and workers."""
+
+    def __init__(self, history_path: str):
+        self.history_path = history_path
+
+    def load(self) -> List[Dict]:
+        if not os.path.exists(self.history_path):
+            return []
+        records = []
+        with open(self.history_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return records
+
+    def append(self, record: Dict):
+        with open(self.history_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def choose_parameters(self, language: str, default_batch_size: int,
+                          default_max_workers: int) -> Tuple[int, int]:
+        records = [r for r in self.load() if r.get('language') == language]
+        if not records:
+            return default_batch_size, default_max_workers
+
+        # Prefer runs from the same part of the day, the shared gateway load varies
+        time_slot = current_hour() // 6
+        same_slot = [r for r in records if r.get('hour', 0) // 6 == time_slot]
+        if same_slot:
+            records = same_slot
+
+        scores: Dict[Tuple[int, int], List[float]] = {}
+        for r in records[-HISTORY_WINDOW:]:
+            error_rate = min(1.0, (r['errors'] + r['truncations']) / max(1, r['requests']))
+            key = (r['batch_size'], r['max_workers'])
+            scores.setdefault(key, []).append(r['strings_per_sec'] * (1 - error_rate))
+
+        best = max(scores, key=lambda k: sum(scores[k]) / len(scores[k]))
+        if random.random() < EXPLORATION_RATE:
+            return self._explore(*best)
+        return best
+
+    def truncation_batch_size(self, source_file: str, language: str) -> Optional[int]:
+        """Batch size cap for a file, halved after every run of it that hit truncation (None if none did)."""
+        limit = None
+        for r in self.load():
+            if r.get('file') == source_file and r.get('language') == language and r.get('truncations'):
+                limit = max(1, r['batch_size'] // 2)
+        return limit
+
+    def _explore(self, batch_size: int, max_workers: int) -> Tuple[int, int]:
+        """Move one parameter a single bounded step away from the best known setting."""
+        if random.random() < 0.5:
+            batch_size += random.choice((-BATCH_SIZE_STEP, BATCH_SIZE_STEP))
+            batch_size = min(MAX_BATCH_SIZE, max(MIN_BATCH_SIZE, batch_size))
+        else:
+            max_workers += random.choice((-1, 1))
+            max_workers = min(MAX_WORKERS, max(MIN_WORKERS, max_workers))
+        return batch_size, max_workers
+
+    def print_report(self):
+        records = self.load()
+        if not records:
+            print(f"No run history found: {self.history_path}")
+            return
+
+        by_language: Dict[str, List[Dict]] = {}
+        for r in records:
+            by_language.setdefault(r.get('language', 'unknown'), []).append(r)
+
+        print("=" * 70)
+        print("Auto-tuning Report")
+        print("=" * 70)
+        for language in sorted(by_language):
+            runs = sorted(by_language[language], key=lambda r: r['timestamp'])
+            print(f"\n[{language}] {len(runs)} runs")
+            print(f"  {'Time':<17} {'Batch':>5} {'Workers':>7} {'Strings':>7} "
+                  f"{'Str/sec':>8} {'Latency':>8} {'Errors':>6}")
+            for r in runs:
+                when = time.strftime('%Y-%m-%d %H:%M', time.localtime(r['timestamp']))
+                latency = r['latency'] / max(1, r['requests'])
+                print(f"  {when:<17} {r['batch_size']:>5} {r['max_workers']:>7} {r['strings']:>7} "
+                      f"{r['strings_per_sec']:>8.1f} {latency:>7.2f}s {r['errors'] + r['truncations']:>6}")
+
+            window = max(1, min(5, len(runs) // 2))
+            first = sum(r['strings_per_sec'] for r in runs[:window]) / window
+            last = sum(r['strings_per_sec'] for r in runs[-window:]) / window
+            print(f"  Strings/sec: first {window} runs avg {first:.1f} -> last {window} runs avg {last:.1f}")
+        print("=" * 70)
 
 
 class QtTranslationAssistant:
     def __init__(self, config_path: str = "qt_translation_config.json",
-                 batch_size: int = 20, max_workers: int = 3):
-        self.config = self.load_config(config_path)
+                 batch_size: Optional[int] = None, max_workers: Optional[int] = None,
+                 history_path: Optional[str] = "qt_translation_history.jsonl",
+                 cassette: Optional[LLMCassette] = None, compile_qm: bool = False):
+        self.compile_qm = compile_qm
+        if cassette and cassette.mode == 'replay' and not os.path.exists(config_path):
+            # Replays are served from the cassette, no API credentials needed
+            self.config = {}
+        else:
+            self.config = self.load_config(config_path)
+        # Explicit values are fixed, None means auto-tune from history
         self.batch_size = batch_size
         self.max_workers = max_workers
-        self.translator = TranslationWorker(self.config)
+        # Replays run as fast as the cassette allows, their throughput would mislead the tuner
+        replaying = cassette is not None and cassette.mode == 'replay'
+        self.history = RunHistory(history_path) if history_path and not replaying else None
+        self.cassette = cassette
+        self.translator = TranslationWorker(self.config, cassette=cassette)
         self.lock = threading.Lock()
 
     def load_config(self, config_path: str) -> dict:
@@ -141,19 +539,40 @@ class QtTranslationAssistant:
         with open(config_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
-    def find_unfinished_translations(self, ts_file_path: str) -> List[Dict]:
+    @staticmethod
+    def find_unfinished_translations(ts_file_path: str) -> List[Dict]:
         results = []
         
         with open(ts_file_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
 
         current_source = None
+        current_context = ''
+        current_comment = ''
+        in_context = False
         
         for line_num, line in enumerate(lines, 1):
+            if '<context>' in line:
+                in_context = True
+                current_context = ''
+            if in_context:
+                name_match = re.search(r'<name>([^<]*)</name>', line)
+                if name_match:
+                    current_context = name_match.group(1)
+                    in_context = False
+                    continue
+            if '<message' in line:
+                current_comment = ''
+
             source_match = re.search(r'<source>([^<]+)</source>', line)
             if source_match:
                 current_source = source_match.group(1)
                 continue
+
+            comment_match = re.search(r'<comment>([^<]*)</comment>', line)
+            if comment_match:
+                current_comment = comment_match.group(1)
+                continue
             
             if current_source and '<translation' in line:
                 has_unfinished_marker = False
@@ -167,7 +586,9 @@ class QtTranslationAssistant:
                             'translation': '',
                             'line_number': line_num,
                             'end_line_number': line_num,
-                            'file_path': ts_file_path
+                            'file_path': ts_file_path,
+                            'context': current_context,
+                            'comment': current_comment
                         })
                     else:
                         end_line_num = line_num
@@ -181,14 +602,17 @@ class QtTranslationAssistant:
                                 'translation': '',
                                 'line_number': line_num,
                                 'end_line_number': end_line_num,
-                                'file_path': ts_file_path
+                                'file_path': ts_file_path,
+                                'context': current_context,
+                                'comment': current_comment
                             })
                     current_source = None
 
         return results
 
-    def get_language_from_filename(self, filename: str) -> str:
-        name = Path(filename).stem
+    @staticmethod
+    def get_language_from_filename(filename: str) -> str:
+        name = os.path.splitext(os.path.basename(filename))[0]
         if '_' in name:
             parts = name.split('_')
             if len(parts) >= 2:
@@ -224,8 +648,30 @@ class QtTranslationAssistant:
                 'count': len(translation_results)
             }
 
-        batches = self._create_batches(unfinished_items, ts_file_path, language_code)
-        translation_results = self._translate_batches_parallel(batches)
+        # Prompts name the file without its directory, so a recording replays from any checkout
+        source_name = os.path.basename(ts_file_path)
+        recorded = self._replay_plan(source_name, language_code)
+        if recorded:
+            batch_size, max_workers = recorded
+        else:
+            batch_size, max_workers = self._select_parameters(language_code)
+            if self.history:
+                # Earlier runs of this file that hit max_tokens keep its batches smaller
+                limit = self.history.truncation_batch_size(os.path.abspath(ts_file_path), language_code)
+                if limit and limit < batch_size:
+                    batch_size = limit
+            if self.cassette and self.cassette.mode == 'record':
+                self.cassette.record_parameters(source_name, language_code, batch_size, max_workers)
+        print(f"  Batch size: {batch_size}, workers: {max_workers}")
+
+        stats_before = self.translator.snapshot_stats()
+        start_time = time.time()
+        batches = self._create_batches(unfinished_items, source_name, language_code, batch_size)
+        translation_results = self._translate_batches_parallel(batches, max_workers)
+        elapsed = time.time() - start_time
+        self._record_run(ts_file_path, language_code, batch_size, max_workers, len(translation_results),
+                         elapsed, stats_before)
+
         self.write_translations_back(ts_file_path, unfinished_items, translation_results)
         print(f"  Translation complete: {len(translation_results)} strings")
         
@@ -236,20 +682,73 @@ class QtTranslationAssistant:
             'language': language_code
         }
 
+    def _replay_plan(self, source_file: str, language: str) -> Optional[Tuple[int, int]]:
+        """Recorded (batch_size, max_workers) of the file when replaying a cassette that has them."""
+        if not self.cassette or self.cassette.mode != 'replay':
+            return None
+        return self.cassette.recorded_parameters(source_file, language)
+
+    def _select_parameters(self, language: str) -> Tuple[int, int]:
+        batch_size = self.batch_size or DEFAULT_BATCH_SIZE
+        max_workers = self.max_workers or DEFAULT_MAX_WORKERS
+        if self.history and (self.batch_size is None or self.max_workers is None):
+            tuned_batch_size, tuned_max_workers = self.history.choose_parameters(
+                language, batch_size, max_workers)
+            batch_size = self.batch_size or tuned_batch_size
+            max_workers = self.max_workers or tuned_max_workers
+        return batch_size, max_workers
+
+    def _record_run(self, source_file: str, language: str, batch_size: int, max_workers: int, count: int,
+                    elapsed: float, stats_before: Dict):
+        if not self.history or count == 0:
+            return
+        stats_after = self.translator.snapshot_stats()
+        self.history.append({
+            'timestamp': time.time(),
+            'hour': current_hour(),
+            'file': os.path.abspath(source_file),
+            'language': language,
+            'batch_size': batch_size,
+            'max_workers': max_workers,
+            'strings': count,
+            'elapsed': round(elapsed, 3),
+            'strings_per_sec': round(count / elapsed, 3) if elapsed > 0 else 0.0,
+            'requests': stats_after['requests'] - stats_before['requests'],
+            'latency': round(stats_after['latency'] - stats_before['latency'], 3),
+            'errors': stats_after['errors'] - stats_before['errors'],
+            'truncations': stats_after['truncations'] - stats_before['truncations'],
+        })
+
     def _create_batches(self, items: List[Dict], source_file: str,
-                        target_language: str) -> List[TranslationBatch]:
+                        target_language: str, batch_size: int) -> List[TranslationBatch]:
+        # Group by <context><name> and disambiguation comment so related strings
+        # share one prompt header, then pack small groups together up to batch_size
+        groups: Dict[Tuple[str, str], List[Dict]] = {}
+        for item in items:
+            key = (item.get('context', ''), item.get('comment', ''))
+            groups.setdefault(key, []).append(item)
+
         batches = []
-        for i in range(0, len(items), self.batch_size):
-            batch_items = items[i:i + self.batch_size]
-            batch = TranslationBatch(batch_items, target_language, source_file)
-            batches.append(batch)
+        current_items: List[Dict] = []
+        for group_items in groups.values():
+            for i in range(0, len(group_items), batch_size):
+                chunk = group_items[i:i + batch_size]
+                if current_items and len(current_items) + len(chunk) > batch_size:
+                    batches.append(TranslationBatch(current_items, target_language, source_file, len(batches)))
+                    current_items = []
+                current_items.extend(chunk)
+        if current_items:
+            batches.append(TranslationBatch(current_items, target_language, source_file, len(batches)))
         return batches
 
-    def _translate_batches_parallel(self, batches: List[TranslationBatch]) -> List[Dict]:
+    def _translate_batches_parallel(self, batches: List[TranslationBatch],
+                                    max_workers: int) -> List[Dict]:
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
         all_results = []
         total_batches = len(batches)
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_batch = {
                 executor.submit(self._translate_single_batch, batch): batch
                 for batch in batches
@@ -273,7 +772,23 @@ class QtTranslationAssistant:
 
     def _translate_single_batch(self, batch: TranslationBatch) -> List[Dict]:
         strings_list = [item['source'] for item in batch.items]
-        results = self.translator.translate_batch(strings_list, batch.target_language, batch.source_file)
+        contexts = [(item.get('context', ''), item.get('comment', '')) for item in batch.items]
+        if self._replay_plan(batch.source_file, batch.target_language):
+            # Which batches were split depended on the recording's timing: split the same ones
+            chunk_size = self.cassette.recorded_chunk_size(batch.source_file, batch.target_language,
+                                                           batch.index, len(strings_list))
+        else:
+            # Truncations earlier in this run split the batches still queued for the file
+            chunk_size = self.translator.suggested_batch_size(batch.source_file, batch.target_language,
+                                                              len(strings_list))
+            if chunk_size < len(strings_list) and self.cassette and self.cassette.mode == 'record':
+                self.cassette.record_chunk_size(batch.source_file, batch.target_language, batch.index,
+                                                chunk_size)
+        results = []
+        for start in range(0, len(strings_list), chunk_size):
+            results.extend(self.translator.translate_batch(
+                strings_list[start:start + chunk_size], batch.target_language,
+                batch.source_file, contexts[start:start + chunk_size]))
 
         if len(results) != len(strings_list):
             print(f"  Warning: Batch result count mismatch")
@@ -350,6 +865,9 @@ class QtTranslationAssistant:
         print(f"  Wrote {modified_count} translations back to file")
 
     def process_directory(self, directory_path: str) -> dict:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from pathlib import Path
+
         ts_files = list(Path(directory_path).glob('*.ts'))
         print(f"\nFound {len(ts_files)} TS files")
 
@@ -364,15 +882,25 @@ class QtTranslationAssistant:
             'translated_files': [],
             'skipped_files': [],
             'failed_files': [],
+            'compiled_files': [],
             'total_strings': 0,
             'files_detail': []
         }
 
         start_time = time.time()
 
+        # .qm compilation runs in a process pool while the next files are translated
+        qm_executor = ProcessPoolExecutor() if self.compile_qm else None
+        qm_futures = {}
+        if qm_executor:
+            from qm_compiler import compile_ts_file
+
         for ts_file in filtered_files:
             result = self.translate_single_file(str(ts_file))
             report['total_strings'] += result['count']
+
+            if qm_executor and result['status'] in ('completed', 'skipped'):
+                qm_futures[qm_executor.submit(compile_ts_file, str(ts_file))] = ts_file.name
             
             if result['status'] == 'completed':
                 report['translated_files'].append(ts_file.name)
@@ -386,6 +914,15 @@ class QtTranslationAssistant:
             else:
                 report['failed_files'].append(ts_file.name)
 
+        if qm_executor:
+            for future in as_completed(qm_futures):
+                try:
+                    future.result()
+                    report['compiled_files'].append(qm_futures[future])
+                except Exception as e:
+                    print(f"  QM compilation failed for {qm_futures[future]}: {str(e)}")
+            qm_executor.shutdown()
+
         elapsed = time.time() - start_time
 
         print("\n" + "=" * 50)
@@ -396,6 +933,8 @@ class QtTranslationAssistant:
         print(f"  Skipped (no translation needed): {len(report['skipped_files'])}")
         print(f"  Failed: {len(report['failed_files'])}")
         print(f"  Total strings translated: {report['total_strings']}")
+        if self.compile_qm:
+            print(f"  QM files generated: {len(report['compiled_files'])}")
         print(f"  Time elapsed: {elapsed:.2f} seconds")
         if report['total_strings'] > 0:
             print(f"  Average speed: {report['total_strings']/elapsed:.1f} strings/sec")
@@ -414,30 +953,109 @@ class QtTranslationAssistant:
         return report
 
 
+def check_unfinished(paths: List[str]) -> int:
+    """Count unfinished translations per file and language without loading config or HTTP."""
+    ts_files = []
+    invalid = False
+    for path in paths:
+        if os.path.isdir(path):
+            ts_files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                   if name.endswith('.ts')))
+        elif path.endswith('.ts') and os.path.isfile(path):
+            ts_files.append(path)
+        else:
+            # A misspelled path must not pass the gate
+            print(f"Error: Not a TS file or directory: {path}", file=sys.stderr)
+            invalid = True
+    if invalid:
+        return 2
+
+    per_language: Dict[str, int] = {}
+    for ts_file in ts_files:
+        with open(ts_file, 'rb') as f:
+            data = f.read()
+        # Cheap prefilter: most committed files have nothing left to translate
+        if b'unfinished' not in data:
+            continue
+        count = len(QtTranslationAssistant.find_unfinished_translations(ts_file))
+        if count:
+            language = QtTranslationAssistant.get_language_from_filename(ts_file)
+            per_language[language] = per_language.get(language, 0) + count
+            print(f"{ts_file}: {count} unfinished ({language})")
+
+    if not per_language:
+        return 0
+    print("Unfinished translations by language:")
+    for language in sorted(per_language):
+        print(f"  {language}: {per_language[language]}")
+    return 1
+
+
 def main():
+    if '--check' in sys.argv[1:]:
+        # Fast path for pre-commit/CI gates: skip argparse and every other module
+        sys.exit(check_unfinished([a for a in sys.argv[1:] if a != '--check']))
+
     import argparse
 
     parser = argparse.ArgumentParser(description='Qt Translation Assistant (Parallel)')
-    parser.add_argument('path', help='TS file or directory path')
+    parser.add_argument('path', nargs='?', help='TS file or directory path')
+    parser.add_argument('--check', action='store_true',
+                        help='Only count unfinished translations in the given TS files/directories; '
+                             'exits 1 if any are found, 2 on an invalid path (no config needed)')
     parser.add_argument('--config', default='qt_translation_config.json',
                         help='Config file path')
-    parser.add_argument('--batch-size', type=int, default=20,
-                        help='Number of strings per batch (default 20)')
-    parser.add_argument('--max-workers', type=int, default=3,
-                        help='Number of parallel workers (default 3)')
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Number of strings per batch (default: auto-tuned from history, 20 without history)')
+    parser.add_argument('--max-workers', type=int, default=None,
+                        help='Number of parallel workers (default: auto-tuned from history, 3 without history)')
+    parser.add_argument('--history', default='qt_translation_history.jsonl',
+                        help='Run history file used for auto-tuning (default qt_translation_history.jsonl)')
+    parser.add_argument('--no-history', action='store_true',
+                        help='Do not read or record run history')
+    parser.add_argument('--tuning-report', action='store_true',
+                        help='Show how auto-tuned parameters affected strings/sec over time and exit')
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument('--record', metavar='CASSETTE',
+                                help='Record every LLM request/response to a gzip cassette file')
+    cassette_group.add_argument('--replay', metavar='CASSETTE',
+                                help='Serve LLM responses from a cassette file instead of the API')
+    parser.add_argument('--qm', action='store_true',
+                        help='Also compile each TS file to .qm in-process (no lrelease needed)')
+    parser.add_argument('--replay-realtime', action='store_true',
+                        help='Reproduce the recorded latencies when replaying (default: as fast as possible)')
 
     args = parser.parse_args()
 
+    if args.tuning_report:
+        RunHistory(args.history).print_report()
+        return
+
+    if not args.path:
+        parser.error('the following arguments are required: path')
+
+    cassette = None
     try:
+        if args.record:
+            cassette = LLMCassette(args.record, mode='record')
+        elif args.replay:
+            cassette = LLMCassette(args.replay, mode='replay', realtime=args.replay_realtime)
+
         assistant = QtTranslationAssistant(
             config_path=args.config,
             batch_size=args.batch_size,
-            max_workers=args.max_workers
+            max_workers=args.max_workers,
+            history_path=None if args.no_history else args.history,
+            cassette=cassette,
+            compile_qm=args.qm
         )
 
         if os.path.isfile(args.path):
             result = assistant.translate_single_file(args.path)
             print(f"\nResult: {result['status']} - {result['count']} strings")
+            if args.qm:
+                from qm_compiler import compile_ts_file
+                print(f"Generated: {compile_ts_file(args.path)}")
         elif os.path.isdir(args.path):
             assistant.process_directory(args.path)
         else:
@@ -450,6 +1068,9 @@ def main():
         print(f"Error: {str(e)}")
         import traceback
         traceback.print_exc()
+    finally:
+        if cassette:
+            cassette.close()
 
 
 if __name__ == "__main__":